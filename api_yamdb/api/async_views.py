@@ -0,0 +1,148 @@
+"""
+Асинхронный путь обслуживания для ASGI (api_yamdb.asgi).
+
+Горячие эндпоинты чтения объявлены асинхронными представлениями: запрос не
+занимает общий поток, в котором Django 3.2 выполняет синхронный код,
+а блокирующая работа с ORM идёт в ограниченном пуле из ASYNC_DB_THREADS
+потоков. Пул ограничивает и число соединений с базой на воркер.
+"""
+import asyncio
+import functools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.urls import URLPattern
+from rest_framework.permissions import SAFE_METHODS
+
+from .export import export_reviews, export_titles
+from .metrics import current_timer
+from .replicas import current_replica
+from .views import CommentViewSet, ReviewsViewSet, TitleViewSet
+
+POOLED_VIEWS = (TitleViewSet, ReviewsViewSet, CommentViewSet,
+                export_titles.cls, export_reviews.cls)
+
+# Переменные контекста запроса, которые нужны коду в потоке пула.
+REQUEST_CONTEXT = (current_timer, current_replica)
+
+# Выгрузка до SPOOL_MAX_SIZE байт держится в памяти, больше — на диске.
+SPOOL_MAX_SIZE = 1024 * 1024
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+executor = ThreadPoolExecutor(max_workers=settings.ASYNC_DB_THREADS,
+                              thread_name_prefix='yamdb-db')
+
+
+def request_context():
+    return [(var, var.get()) for var in REQUEST_CONTEXT]
+
+
+def call_with(values, func, *args):
+    """
+    Вызывает func со значениями переменных контекста запроса. Остальной
+    контекст остаётся контекстом потока, поэтому соединения с базой
+    принадлежат потоку, как в синхронном воркере.
+    """
+    tokens = [var.set(value) for var, value in values]
+    try:
+        return func(*args)
+    finally:
+        for (var, _), token in zip(values, tokens):
+            var.reset(token)
+
+
+def call_blocking(values, func):
+    # Как request_started/request_finished в синхронном обработчике.
+    close_old_connections()
+    try:
+        return call_with(values, func)
+    finally:
+        close_old_connections()
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Выполняет блокирующий вызов в пуле потоков ORM."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(
+        call_blocking, request_context(),
+        functools.partial(func, *args, **kwargs)
+    ))
+
+
+def spool(content):
+    """
+    Django 3.2 читает потоковый ответ синхронно в цикле событий, где ORM
+    запрещён. Поэтому выгрузка целиком пишется во временный файл в потоке
+    пула, вместе с остальной работой запроса: курсор не переходит между
+    потоками, а число соединений с базой ограничено пулом. Цикл событий
+    потом только читает файл.
+    """
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        for chunk in content:
+            file.write(chunk)
+    finally:
+        close = getattr(content, 'close', None)
+        if close is not None:
+            close()
+    file.seek(0)
+    return file
+
+
+def read_spooled(file):
+    try:
+        yield from iter(lambda: file.read(SPOOL_CHUNK_SIZE), b'')
+    finally:
+        file.close()
+
+
+def respond(view, request, *args, **kwargs):
+    """
+    Вызывает синхронное представление и готовит ответ целиком, чтобы
+    обработчик не переходил ради render() в общий синхронный поток.
+    """
+    response = view(request, *args, **kwargs)
+    if response.streaming:
+        response.streaming_content = read_spooled(
+            spool(response.streaming_content)
+        )
+        return response
+    if not callable(getattr(response, 'render', None)):
+        return response
+    response.render()
+    rendered = HttpResponse(response.content, status=response.status_code,
+                            headers=dict(response.items()))
+    rendered.cookies = response.cookies
+    return rendered
+
+
+def pooled(view):
+    """
+    Асинхронное представление, выполняющее чтения view в пуле потоков.
+    Запросы на запись идут, как у синхронного представления, в общий
+    поток: их транзакции и on_commit не должны делить соединения пула.
+    """
+    @functools.wraps(view)
+    async def pooled_view(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return await sync_to_async(respond, thread_sensitive=True)(
+                view, request, *args, **kwargs
+            )
+        return await run_blocking(respond, view, request, *args, **kwargs)
+    # Атрибуты DRF (cls, actions, csrf_exempt) копирует functools.wraps.
+    return pooled_view
+
+
+def pooled_patterns(patterns):
+    """Асинхронные копии маршрутов с представлениями из POOLED_VIEWS."""
+    return [
+        URLPattern(pattern.pattern, pooled(pattern.callback),
+                   pattern.default_args, pattern.name)
+        for pattern in patterns
+        if isinstance(pattern, URLPattern)
+        and getattr(pattern.callback, 'cls', pattern.callback) in POOLED_VIEWS
+    ]
@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import User
+
+# Клеймы токена для клиентов. Права берутся не из них, а из STATE_FIELDS.
+USER_CLAIMS = ('username', 'role', 'is_superuser')
+
+# Поля пользователя, от которых зависят аутентификация и права.
+STATE_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
+
+def state_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def get_auth_cache():
+    """
+    Кэш состояния пользователей. Если он в памяти процесса, запись живёт
+    AUTH_STATE_TIMEOUT — несколько секунд: сброс в одном воркере
+    остальные не видят.
+    """
+    return caches[settings.AUTH_CACHE_ALIAS]
+
+
+def user_state(user_id):
+    """
+    Текущие STATE_FIELDS пользователя или None, если его нет. Источник —
+    БД; кэш только избавляет от запроса, и вытесненная запись означает
+    чтение из БД, а не доверие токену.
+    """
+    cache = get_auth_cache()
+    state = cache.get(state_key(user_id))
+    if state is not None:
+        return tuple(state) or None
+    state = (User.objects.filter(pk=user_id)
+             .values_list(*STATE_FIELDS).first())
+    cache.set(state_key(user_id), state or (), settings.AUTH_STATE_TIMEOUT)
+    return state
+
+
+def forget_user(user_id):
+    """
+    Сбрасывает кэш состояния пользователя сразу и после фиксации
+    транзакции: запрос, прочитавший старое состояние до фиксации, мог
+    успеть положить его в кэш.
+    """
+    cache = get_auth_cache()
+    cache.delete(state_key(user_id))
+    transaction.on_commit(lambda: cache.delete(state_key(user_id)))
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с ролью и именем пользователя в клеймах."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая собирает пользователя из STATE_FIELDS
+    (user_state) вместо загрузки всей строки. Пока состояние в кэше,
+    запросов к БД нет; удалённый или неактивный пользователь не проходит,
+    а новая роль действует без перевыпуска токена.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+        state = user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed('User not found',
+                                       code='user_not_found')
+        username, role, is_superuser, is_active = state
+        if not is_active:
+            raise AuthenticationFailed('User is inactive',
+                                       code='user_inactive')
+        return User(id=user_id, username=username, role=role,
+                    is_superuser=is_superuser)
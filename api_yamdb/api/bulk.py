@@ -0,0 +1,270 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import prefetch_related_objects
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+
+from .cache import INVALIDATES, invalidate
+from .fields import BulkSlugRelatedField, SlugManyRelatedField
+
+NOT_FOUND = 'Объект не найден.'
+REPEATED = 'Объект указан в запросе повторно.'
+
+
+def non_field_error(message):
+    return serializers.ValidationError(
+        {api_settings.NON_FIELD_ERRORS_KEY: [message]}
+    )
+
+
+def check_size(data):
+    if not isinstance(data, list):
+        raise non_field_error('Ожидается список объектов.')
+    if len(data) > settings.API_BULK_MAX_ITEMS:
+        raise non_field_error(
+            f'Не больше {settings.API_BULK_MAX_ITEMS} объектов за запрос.'
+        )
+
+
+def get_lookup_field(model, lookup_field):
+    """Поле модели и ключ элемента запроса для lookup_field вьюсета."""
+    if lookup_field == 'pk':
+        return model._meta.pk, 'id'
+    return model._meta.get_field(lookup_field), lookup_field
+
+
+def resolve_lookups(queryset, field, values):
+    """
+    Находит объекты по значениям уникального поля одним запросом.
+    Возвращает объекты по порядку значений (None для ненайденных)
+    и ошибки по элементам.
+    """
+    keys = []
+    for value in values:
+        try:
+            keys.append(field.to_python(value))
+        except DjangoValidationError:
+            keys.append(None)
+    objects = queryset.in_bulk(
+        {key for key in keys if key is not None}, field_name=field.name
+    )
+    errors = []
+    seen = set()
+    for key in keys:
+        if key not in objects:
+            errors.append([NOT_FOUND])
+        elif key in seen:
+            errors.append([REPEATED])
+        else:
+            errors.append([])
+        seen.add(key)
+    return [objects.get(key) for key in keys], errors
+
+
+def preload_slugs(serializer, items):
+    """Разрешает слаги каждого поля-связи по всему пакету одним запросом."""
+    for name, field in serializer.fields.items():
+        if isinstance(field, SlugManyRelatedField):
+            field = field.child_relation
+        elif not isinstance(field, BulkSlugRelatedField) or field.read_only:
+            continue
+        slugs = set()
+        for item in items:
+            value = item.get(name) if isinstance(item, dict) else None
+            values = value if isinstance(value, list) else [value]
+            slugs.update(slug for slug in values if isinstance(slug, str))
+        field.preload(slugs)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    Список объектов для пакетной записи. Без instance создаёт объекты,
+    с queryset в instance изменяет найденные по lookup-полю вьюсета.
+    Ошибки возвращаются списком по элементам, как в ListSerializer.
+    """
+
+    def __init__(self, *args, lookup_field='pk', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model = self.child.Meta.model
+        self.lookup_field, self.lookup_key = get_lookup_field(self.model,
+                                                              lookup_field)
+        self.instances = []
+
+    def to_internal_value(self, data):
+        check_size(data)
+        preload_slugs(self.child, data)
+        unique = self.take_unique_validators()
+        if self.instance is None:
+            self.instances = [None] * len(data)
+            errors = [{} for _ in data]
+        else:
+            self.instances, errors = self.find_instances(data)
+        validated = []
+        for index, item in enumerate(data):
+            try:
+                validated.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                validated.append(None)
+                errors[index] = {**exc.detail, **errors[index]}
+        if self.instance is None:
+            self.check_unique(unique, validated, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def take_unique_validators(self):
+        """
+        Убирает поштучные UniqueValidator у полей элемента: уникальность
+        всего пакета проверяется в check_unique одним запросом на поле.
+        """
+        unique = []
+        for name, field in self.child.fields.items():
+            validators = [validator for validator in field.validators
+                          if not isinstance(validator, UniqueValidator)]
+            if len(validators) != len(field.validators):
+                field.validators = validators
+                unique.append(name)
+        return unique
+
+    def find_instances(self, data):
+        values = [item.get(self.lookup_key) if isinstance(item, dict)
+                  else None for item in data]
+        instances, lookup_errors = resolve_lookups(self.instance,
+                                                   self.lookup_field, values)
+        errors = [{self.lookup_key: messages} if messages else {}
+                  for messages in lookup_errors]
+        return instances, errors
+
+    def check_unique(self, fields, validated, errors):
+        for name in fields:
+            values = [attrs.get(name) if attrs else None
+                      for attrs in validated]
+            existing = set(self.model._default_manager.filter(
+                **{f'{name}__in': {value for value in values if value}}
+            ).values_list(name, flat=True))
+            seen = set()
+            for index, value in enumerate(values):
+                if value in existing or value in seen:
+                    errors[index].setdefault(name, []).append(
+                        f'Значение {value} уже занято.'
+                    )
+                if value is not None:
+                    seen.add(value)
+
+    def pop_relations(self, validated_data):
+        names = [field.name for field in self.model._meta.many_to_many]
+        return [{name: attrs.pop(name) for name in names if name in attrs}
+                for attrs in validated_data]
+
+    def create(self, validated_data):
+        relations = self.pop_relations(validated_data)
+        objects = [self.model(**attrs) for attrs in validated_data]
+        if connection.features.can_return_rows_from_bulk_insert:
+            self.model._default_manager.bulk_create(
+                objects, batch_size=settings.API_BULK_BATCH_SIZE
+            )
+        else:
+            # Без RETURNING bulk_create не вернёт id для связей M2M.
+            for obj in objects:
+                obj.save()
+        self.set_relations(objects, relations, replace=False)
+        return objects
+
+    def update(self, instance, validated_data):
+        relations = self.pop_relations(validated_data)
+        # bulk_update не вызывает pre_save, поля auto_now заполняются здесь.
+        auto_now = [field for field in self.model._meta.concrete_fields
+                    if getattr(field, 'auto_now', False)]
+        fields = {field.name for field in auto_now}
+        for obj, attrs in zip(self.instances, validated_data):
+            for name, value in attrs.items():
+                setattr(obj, name, value)
+                fields.add(name)
+            for field in auto_now:
+                field.pre_save(obj, add=False)
+        if fields:
+            self.model._default_manager.bulk_update(
+                self.instances, fields,
+                batch_size=settings.API_BULK_BATCH_SIZE
+            )
+        self.set_relations(self.instances, relations, replace=True)
+        return self.instances
+
+    def set_relations(self, objects, relations, replace):
+        """Записывает связи M2M всего пакета одним INSERT на поле."""
+        for field in self.model._meta.many_to_many:
+            through = field.remote_field.through
+            source = field.m2m_column_name()
+            target = field.m2m_reverse_name()
+            changed = [(obj, related[field.name])
+                       for obj, related in zip(objects, relations)
+                       if field.name in related]
+            if replace and changed:
+                through.objects.filter(**{
+                    f'{source}__in': [obj.pk for obj, _ in changed]
+                }).delete()
+            through.objects.bulk_create(
+                [through(**{source: obj.pk, target: pk})
+                 for obj, targets in changed
+                 for pk in {target_obj.pk for target_obj in targets}],
+                batch_size=settings.API_BULK_BATCH_SIZE
+            )
+        prefetch_related_objects(
+            objects, *(field.name for field in self.model._meta.many_to_many)
+        )
+
+
+class BulkModelMixin:
+    """
+    Пакетные операции на {prefix}/bulk/: POST создаёт список объектов,
+    PATCH изменяет объекты, найденные по lookup-полю в элементах,
+    DELETE удаляет объекты по списку значений lookup-поля.
+    Пакет записывается в одной транзакции целиком или не записывается.
+    """
+
+    @action(detail=False, methods=('post', 'patch', 'delete'),
+            url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+        partial = request.method == 'PATCH'
+        serializer = BulkListSerializer(
+            self.get_bulk_queryset() if partial else None,
+            data=request.data, partial=partial,
+            child=self.get_serializer(partial=partial),
+            lookup_field=self.lookup_field,
+            context=self.get_serializer_context(),
+        )
+        serializer.is_valid(raise_exception=True)
+        self.write(lambda: self.bulk_saved(serializer.save()))
+        return Response(serializer.data, status=(
+            status.HTTP_200_OK if partial else status.HTTP_201_CREATED
+        ))
+
+    def bulk_destroy(self, request):
+        check_size(request.data)
+        queryset = self.get_bulk_queryset()
+        field, _ = get_lookup_field(queryset.model, self.lookup_field)
+        objects, errors = resolve_lookups(queryset, field, request.data)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        self.write(queryset.filter(pk__in=[obj.pk for obj in objects]).delete)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def bulk_saved(self, objects):
+        """Вызывается в транзакции пакета после записи объектов."""
+
+    def get_bulk_queryset(self):
+        return self.get_queryset().model._default_manager.all()
+
+    def write(self, operation):
+        try:
+            with transaction.atomic():
+                operation()
+        except IntegrityError:
+            raise non_field_error('Пакет конфликтует с данными в базе.')
+        invalidate(*INVALIDATES[self.get_queryset().model])
@@ -0,0 +1,147 @@
+import hashlib
+import time
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+from reviews.models import Category, Genre, Review, Title
+
+from .replicas import reads_from_replica
+
+# Какие закэшированные разделы API устаревают при изменении модели.
+INVALIDATES = {
+    Title: ('titles',),
+    Review: ('titles',),
+    Genre: ('genres', 'titles'),
+    Category: ('categories', 'titles'),
+}
+
+STATS_KEYS = {True: 'api:stats:hit', False: 'api:stats:miss'}
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def generation_key(scope):
+    return f'api:generation:{scope}'
+
+
+def new_generation():
+    """Поколение раздела: время создания и случайная часть."""
+    return f'{time.time():.0f}:{uuid.uuid4().hex}'
+
+
+def generation_age(generation):
+    try:
+        return time.time() - float(generation.split(':', 1)[0])
+    except ValueError:
+        return float('inf')
+
+
+def get_generation(cache, scope):
+    """
+    Текущее поколение раздела. Если ключ вытеснен, заводится новое
+    случайное поколение, чтобы не воскресить старые записи.
+    """
+    key = generation_key(scope)
+    generation = cache.get(key)
+    if generation is not None:
+        return generation
+    cache.add(key, new_generation(), timeout=None)
+    return cache.get(key)
+
+
+def invalidate(*scopes):
+    """Делает недоступными все ответы перечисленных разделов."""
+    cache = get_cache()
+    cache.set_many(
+        {generation_key(scope): new_generation() for scope in scopes},
+        timeout=None
+    )
+
+
+def replica_may_lag(generation):
+    """Чтение с реплики вскоре после смены поколения раздела."""
+    return (reads_from_replica() and generation_age(generation)
+            < settings.REPLICA_STICKY_SECONDS)
+
+
+def user_class(user):
+    """Класс пользователя, от которого зависят права на чтение."""
+    if not user.is_authenticated:
+        return 'anon'
+    if user.is_superuser:
+        return 'admin'
+    return user.role
+
+
+def response_key(request, scope, generation):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    raw = f'{request.path}?{query}'.encode()
+    return (f'api:response:{scope}:{generation}:{user_class(request.user)}:'
+            f'{hashlib.md5(raw).hexdigest()}')
+
+
+def record(cache, hit):
+    key = STATS_KEYS[hit]
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+
+def stats():
+    """Счётчики попаданий и промахов кэша ответов."""
+    values = get_cache().get_many(STATS_KEYS.values())
+    hits = values.get(STATS_KEYS[True], 0)
+    misses = values.get(STATS_KEYS[False], 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses,
+            'hit_rate': hits / total if total else 0.0}
+
+
+class CachedReadMixin:
+    """
+    Кэширует ответы list/retrieve в кэше API_CACHE_ALIAS.
+    Ключ — путь, query string, класс пользователя и поколение раздела
+    cache_scope, которое сдвигается сигналами при изменении данных.
+    """
+
+    cache_scope = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request,
+                                    *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        generation = get_generation(cache, self.cache_scope)
+        key = response_key(request, self.cache_scope, generation)
+        data = cache.get(key)
+        record(cache, data is not None)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = handler(request, *args, **kwargs)
+        if self.cacheable(response, generation):
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def cacheable(self, response, generation):
+        """
+        Ответ, прочитанный с реплики сразу после изменения раздела, может
+        не содержать этого изменения и не кэшируется.
+        """
+        if response.status_code != status.HTTP_200_OK:
+            return False
+        return not replica_may_lag(generation)
@@ -0,0 +1,146 @@
+"""
+Сжатие ответов API и статики.
+
+CompressionMiddleware сжимает JSON-ответы от API_COMPRESS_MIN_SIZE байт
+кодировкой, выбранной по Accept-Encoding: brotli (если установлен пакет
+brotli) или gzip. CompressedManifestStaticFilesStorage при collectstatic
+даёт файлам имена с хешем содержимого и кладёт рядом их .gz и .br,
+которые nginx отдаёт без сжатия на лету.
+"""
+import gzip
+import io
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .metrics import registry
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Кодировки в порядке предпочтения сервера при равных q.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Типы статики, которые имеет смысл сжимать заранее.
+COMPRESSIBLE_STATIC = ('.css', '.js', '.svg', '.yaml', '.json', '.txt',
+                       '.html', '.map', '.xml')
+
+
+def gzip_compress(content, level):
+    # mtime=0: одинаковый файл на каждом collectstatic.
+    buffer = io.BytesIO()
+    with gzip.GzipFile(mode='wb', compresslevel=level, fileobj=buffer,
+                       mtime=0) as file:
+        file.write(content)
+    return buffer.getvalue()
+
+
+def compress(content, encoding, best=False):
+    """
+    Сжимает content. best — максимальное сжатие для статики, иначе
+    быстрое для ответов API.
+    """
+    if encoding == 'br':
+        return brotli.compress(content, quality=11 if best else 5)
+    return gzip_compress(content, 9 if best else 6)
+
+
+def parse_accept_encoding(header):
+    """Кодировки из Accept-Encoding с их q: {'gzip': 1.0, '*': 0.5}."""
+    accepted = {}
+    for item in header.split(','):
+        name, *params = item.split(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    """Кодировка с наибольшим q > 0 или None, если сжимать нельзя."""
+    accepted = parse_accept_encoding(header)
+    default = accepted.get('*', 0.0)
+    qualities = [(accepted.get(encoding, default), encoding)
+                 for encoding in ENCODINGS]
+    quality, encoding = max(qualities, key=lambda item: item[0])
+    return encoding if quality > 0 else None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает JSON-ответы от API_COMPRESS_MIN_SIZE байт. Короткие ответы
+    (токены, ошибки) не сжимаются: выигрыша почти нет, а сжатие ответов
+    с секретами облегчает атаки вида BREACH.
+    """
+
+    def process_response(self, request, response):
+        if (response.streaming or response.has_header('Content-Encoding')
+                or not response.get('Content-Type', '').startswith(
+                    'application/json')
+                or len(response.content) < settings.API_COMPRESS_MIN_SIZE):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING',
+                                                    ''))
+        if encoding is None:
+            return response
+        compressed = compress(response.content, encoding)
+        saved = len(response.content) - len(compressed)
+        if saved <= 0:
+            return response
+        registry.inc('yamdb_compression_saved_bytes_total',
+                     (('encoding', encoding),), saved)
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # Как GZipMiddleware: сжатое тело уже не совпадает байт в байт.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return response
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хешем содержимого в имени (redoc.3f2a1b9c8d7e.yaml) и
+    сжатыми копиями .gz и .br таких файлов. Имена с хешем не меняются,
+    поэтому nginx отдаёт их с Cache-Control: immutable. При DEBUG
+    шаблоны получают исходные имена, и collectstatic не нужен.
+    """
+
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE_STATIC):
+                self.save_compressed(name)
+
+    def save_compressed(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        for encoding in ENCODINGS:
+            compressed = compress(content, encoding, best=True)
+            if len(compressed) >= len(content):
+                continue
+            path = f'{name}{SUFFIXES[encoding]}'
+            if self.exists(path):
+                self.delete(path)
+            self._save(path, ContentFile(compressed))
@@ -0,0 +1,206 @@
+import csv
+import io
+from collections import defaultdict
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.decorators import (api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from reviews.models import Review, Title
+
+from .throttling import ExportThrottle
+
+# Строк в одной пачке: столько объектов читается из курсора за раз
+# и столько строк уходит клиенту одним куском ответа.
+CHUNK_SIZE = 1000
+
+TITLE_COLUMNS = ('id', 'name', 'year', 'description', 'category', 'genre',
+                 'rating', 'rating_count', 'updated')
+REVIEW_COLUMNS = ('id', 'title', 'author', 'text', 'score', 'pub_date',
+                  'updated')
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def title_rows(queryset):
+    """Произведения в порядке изменения; жанры — один запрос на пачку."""
+    titles = (queryset.select_related('category').order_by('updated', 'id')
+              .iterator(chunk_size=CHUNK_SIZE))
+    for chunk in chunks(titles, CHUNK_SIZE):
+        genres = defaultdict(list)
+        for title_id, slug in (
+            Title.genre.through.objects
+            .filter(title_id__in=[title.pk for title in chunk])
+            .order_by('genre__slug').values_list('title_id', 'genre__slug')
+        ):
+            genres[title_id].append(slug)
+        for title in chunk:
+            yield {
+                'id': title.pk,
+                'name': title.name,
+                'year': title.year,
+                'description': title.description,
+                'category': title.category and title.category.slug,
+                'genre': genres[title.pk],
+                'rating': title.rating,
+                'rating_count': title.rating_count,
+                'updated': title.updated,
+            }
+
+
+def review_rows(queryset):
+    reviews = (queryset.select_related('author').order_by('updated', 'id')
+               .iterator(chunk_size=CHUNK_SIZE))
+    for review in reviews:
+        yield {
+            'id': review.pk,
+            'title': review.title_id,
+            'author': review.author.username,
+            'text': review.text,
+            'score': review.score,
+            'pub_date': review.pub_date,
+            'updated': review.updated,
+        }
+
+
+def ndjson_lines(rows, columns):
+    for chunk in chunks(rows, CHUNK_SIZE):
+        yield ''.join(f'{encoder.encode(row)}\n' for row in chunk)
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ','.join(value)
+    if isinstance(value, (str, int, float)):
+        return value
+    return encoder.default(value)
+
+
+def csv_lines(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in chunks(rows, CHUNK_SIZE):
+        for row in chunk:
+            writer.writerow([csv_value(row[column]) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Пустая выгрузка: только заголовок.
+        yield buffer.getvalue()
+
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_lines),
+    'csv': ('text/csv', csv_lines),
+}
+
+
+def parse_since(request):
+    """Граница выгрузки ?since= в ISO 8601; наивное время — в TIME_ZONE."""
+    value = request.GET.get('since')
+    if value is None:
+        return None
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        since = None
+    if since is None:
+        raise ValueError('Ожидается дата и время в формате ISO 8601.')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_response(name, export_format, rows, columns):
+    content_type, render = FORMATS[export_format]
+    response = StreamingHttpResponse(
+        render(rows, columns), content_type=f'{content_type}; charset=utf-8'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{export_format}"'
+    )
+    return response
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """
+    Формат выгрузки задаёт путь, поэтому Accept: text/csv не приводит
+    к 406: рендерер DRF нужен только для ответов с ошибкой.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            return renderers[0], renderers[0].media_type
+
+
+def export_view(func):
+    """
+    Выгрузка — представление DRF: только для вошедших пользователей
+    и с отдельным пределом частоты, потому что каждая выгрузка читает
+    всю таблицу.
+    """
+    view = api_view(['GET'])(
+        permission_classes([IsAuthenticated])(
+            throttle_classes([ExportThrottle])(func)
+        )
+    )
+    view.cls.content_negotiation_class = ExportContentNegotiation
+    return view
+
+
+def filtered(request, queryset):
+    """Применяет ?since=; объекты с updated == since попадают повторно."""
+    since = parse_since(request)
+    if since is None:
+        return queryset
+    return queryset.filter(updated__gte=since)
+
+
+@export_view
+def export_titles(request, export_format):
+    """Потоковая выгрузка произведений с рейтингом, жанрами и категорией."""
+    try:
+        titles = filtered(request, Title.objects.all())
+    except ValueError as error:
+        return Response({'since': [str(error)]}, status=400)
+    return export_response('titles', export_format, title_rows(titles),
+                           TITLE_COLUMNS)
+
+
+@export_view
+def export_reviews(request, export_format):
+    """Потоковая выгрузка отзывов всего каталога или ?title=<id>."""
+    try:
+        reviews = filtered(request, Review.objects.all())
+    except ValueError as error:
+        return Response({'since': [str(error)]}, status=400)
+    title_id = request.GET.get('title')
+    if title_id is not None:
+        if not title_id.isdigit():
+            return Response(
+                {'title': ['Ожидается id произведения.']}, status=400
+            )
+        reviews = reviews.filter(title_id=title_id)
+    return export_response('reviews', export_format, review_rows(reviews),
+                           REVIEW_COLUMNS)
@@ -0,0 +1,60 @@
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class SlugManyRelatedField(serializers.ManyRelatedField):
+    """Список слагов, который разрешается одним запросом к БД."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        relation = self.child_relation
+        if not all(isinstance(item, str) for item in data):
+            relation.fail('invalid')
+        objects = relation.preloaded
+        if objects is None:
+            objects = relation.get_queryset().in_bulk(
+                set(data), field_name=relation.slug_field
+            )
+        for item in data:
+            if item not in objects:
+                relation.fail('does_not_exist',
+                              slug_name=relation.slug_field,
+                              value=smart_str(item))
+        return [objects[item] for item in data]
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который при many=True не делает запрос на слаг.
+    После preload() слаги ищутся среди заранее загруженных объектов.
+    """
+
+    preloaded = None
+
+    def preload(self, slugs):
+        """Загружает объекты для всех слагов пакета одним запросом."""
+        self.preloaded = self.get_queryset().in_bulk(
+            set(slugs), field_name=self.slug_field
+        )
+
+    def to_internal_value(self, data):
+        if self.preloaded is None:
+            return super().to_internal_value(data)
+        if not isinstance(data, str):
+            self.fail('invalid')
+        if data not in self.preloaded:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        return self.preloaded[data]
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return SlugManyRelatedField(**list_kwargs)
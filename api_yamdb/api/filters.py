@@ -1,13 +1,80 @@
+from difflib import SequenceMatcher
+
+from django.contrib.postgres.lookups import PostgresOperatorLookup
+from django.db import connection
+from django.db.models import Case, CharField, FloatField, Func, Q, Value, When
 from django_filters import rest_framework
 from reviews.models import Title
 
+# Минимальное сходство, при котором опечатка ещё считается совпадением.
+# На PostgreSQL порог задаёт pg_trgm.word_similarity_threshold (0.6).
+FALLBACK_SIMILARITY = 0.7
+
+
+@CharField.register_lookup
+class TrigramWordSimilar(PostgresOperatorLookup):
+    """name %> запрос: запрос похож на какое-то слово из названия."""
+    lookup_name = 'trigram_word_similar'
+    postgres_operator = '%%>'
+
+
+class TrigramWordSimilarity(Func):
+    """word_similarity(запрос, поле) из pg_trgm."""
+    function = 'WORD_SIMILARITY'
+    output_field = FloatField()
+
+    def __init__(self, expression, string, **extra):
+        super().__init__(Value(string), expression, **extra)
+
+
+def search_titles_fallback(queryset, value):
+    """
+    Поиск без pg_trgm: подстрока без учёта регистра или близкое
+    по SequenceMatcher название или слово из него.
+    Полный перебор — только для разработки.
+    """
+    value = value.lower()
+    ranks = {}
+    for pk, name in queryset.values_list('pk', 'name').order_by():
+        name = name.lower()
+        rank = max(SequenceMatcher(None, value, part).ratio()
+                   for part in [name, *name.split()])
+        if value in name or rank >= FALLBACK_SIMILARITY:
+            ranks[pk] = rank
+    return queryset.filter(pk__in=ranks).annotate(
+        rank=Case(
+            *(When(pk=pk, then=Value(rank)) for pk, rank in ranks.items()),
+            default=Value(0.0), output_field=FloatField(),
+        )
+    ).order_by('-rank', '-rating')
+
+
+def search_titles(queryset, value):
+    """Поиск произведений по названию с ранжированием и опечатками."""
+    if connection.vendor != 'postgresql':
+        return search_titles_fallback(queryset, value)
+    return queryset.filter(
+        Q(name__icontains=value) | Q(name__trigram_word_similar=value)
+    ).annotate(
+        rank=TrigramWordSimilarity('name', value)
+    ).order_by('-rank', '-rating')
+
 
 class TitleFilter(rest_framework.FilterSet):
     category = rest_framework.CharFilter(field_name='category__slug')
     genre = rest_framework.CharFilter(field_name='genre__slug')
     name = rest_framework.CharFilter(field_name='name', lookup_expr='contains')
     year = rest_framework.NumberFilter()
+    rating_min = rest_framework.NumberFilter(field_name='rating',
+                                             lookup_expr='gte')
+    rating_max = rest_framework.NumberFilter(field_name='rating',
+                                             lookup_expr='lte')
+    search = rest_framework.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year',)
+        fields = ('category', 'genre', 'name', 'year',
+                  'rating_min', 'rating_max', 'search',)
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import Review
+
+from .loadtest import percentile
+
+SERVERS = {
+    'wsgi': ('api_yamdb.wsgi:application',),
+    'asgi': ('api_yamdb.asgi:application',
+             '--worker-class', 'uvicorn.workers.UvicornWorker'),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def tree_rss(pid):
+    """RSS процесса и всех его потомков, байт (Linux, /proc)."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as file:
+                # Имя процесса в скобках может содержать пробелы.
+                parent = int(file.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        pending += children.get(current, [])
+        try:
+            with open(f'/proc/{current}/status') as file:
+                for line in file:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+async def read_response(reader):
+    """Статус ответа и можно ли переиспользовать соединение."""
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+    status_line, *lines = head.split('\r\n')
+    headers = {}
+    for line in lines:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip().lower()
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        size = None
+        while size != 0:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+    else:
+        await reader.read()
+        return int(status_line.split()[1]), False
+    return int(status_line.split()[1]), headers.get('connection') != 'close'
+
+
+async def connection(port, paths, deadline, rand, results):
+    """Одно клиентское соединение: запросы подряд, keep-alive по ответу."""
+    reader = writer = None
+    while time.monotonic() < deadline:
+        request = (f'GET {rand.choice(paths)} HTTP/1.1\r\n'
+                   f'Host: 127.0.0.1\r\n\r\n').encode()
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1',
+                                                               port)
+            writer.write(request)
+            status, keep_alive = await read_response(reader)
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            status, keep_alive = 'error', False
+        results.append((time.perf_counter() - started, status))
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(pid, port, paths, concurrency, duration, seed):
+    results, samples = [], []
+    deadline = time.monotonic() + duration
+    clients = [
+        asyncio.ensure_future(connection(port, paths, deadline,
+                                         random.Random(seed + index),
+                                         results))
+        for index in range(concurrency)
+    ]
+    while time.monotonic() < deadline:
+        samples.append(tree_rss(pid))
+        await asyncio.sleep(0.2)
+    await asyncio.gather(*clients)
+    return results, samples
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает WSGI (gunicorn, синхронные воркеры) и ASGI '
+            '(gunicorn + uvicorn, api_yamdb.asgi) на эндпоинтах чтения: '
+            'пропускная способность, задержки и память сервера на одно '
+            'одновременное соединение. Серверы запускаются с текущими '
+            'настройками и базой.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', nargs='+', type=int,
+                            default=[10, 50, 200],
+                            help='числа одновременных соединений')
+        parser.add_argument('--duration', type=float, default=10,
+                            help='длительность замера, секунд')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='воркеров gunicorn в обоих режимах')
+        parser.add_argument('--modes', nargs='+', choices=SERVERS,
+                            default=list(SERVERS))
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench_asgi.json')
+
+    def handle(self, *args, **options):
+        paths = self.read_paths()
+        report = {
+            'config': {key: options[key] for key in
+                       ('concurrency', 'duration', 'workers')},
+            'async_db_threads': settings.ASYNC_DB_THREADS,
+            'results': [],
+        }
+        self.stdout.write(
+            f"{'режим':<6}{'соедин.':>8}{'RPS':>9}{'p50':>9}{'p95':>9}"
+            f"{'ошибок':>8}{'RSS, МБ':>9}{'КБ/соед.':>10}"
+        )
+        for mode in options['modes']:
+            server, port = self.start(mode, options['workers'])
+            try:
+                # Прогрев одним соединением: соединения с базой, кэш
+                # ответов, ленивые импорты. Память после него — исходная.
+                asyncio.run(run_load(server.pid, port, paths, 1, 1,
+                                     options['seed']))
+                idle = tree_rss(server.pid)
+                for concurrency in options['concurrency']:
+                    row = self.measure(server.pid, port, paths, concurrency,
+                                       options, idle)
+                    row['mode'] = mode
+                    report['results'].append(row)
+                    self.print_row(row)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Результаты сохранены в {options['output']}"
+        ))
+
+    def read_paths(self):
+        reviews = list(Review.objects.values_list('title_id', 'pk')[:100])
+        if not reviews:
+            raise CommandError('Каталог пуст: загрузите данные '
+                               '(manage.py import_csv)')
+        paths = ['/api/v1/titles/']
+        for title_id, review_id in reviews:
+            paths += [
+                f'/api/v1/titles/{title_id}/',
+                f'/api/v1/titles/{title_id}/reviews/',
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            ]
+        return paths
+
+    def start(self, mode, workers):
+        port = free_port()
+        server = subprocess.Popen(
+            (sys.executable, '-m', 'gunicorn', *SERVERS[mode],
+             '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+             '--log-level', 'warning'),
+            cwd=settings.BASE_DIR
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), 1).close()
+                return server, port
+            except OSError:
+                time.sleep(0.2)
+        server.kill()
+        raise CommandError(f'{mode}: сервер не запустился')
+
+    def measure(self, pid, port, paths, concurrency, options, idle):
+        results, samples = asyncio.run(run_load(
+            pid, port, paths, concurrency, options['duration'],
+            options['seed']
+        ))
+        latencies = sorted(latency for latency, status in results
+                           if status == 200)
+        peak = max(samples)
+        return {
+            'concurrency': concurrency,
+            'requests': len(latencies),
+            'rps': len(latencies) / options['duration'],
+            'p50_ms': (percentile(latencies, 0.50) or 0) * 1000,
+            'p95_ms': (percentile(latencies, 0.95) or 0) * 1000,
+            'errors': len(results) - len(latencies),
+            'rss_idle': idle,
+            'rss_peak': peak,
+            'rss_per_connection': max(peak - idle, 0) / concurrency,
+        }
+
+    def print_row(self, row):
+        self.stdout.write(
+            f"{row['mode']:<6}{row['concurrency']:>8}{row['rps']:>9.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['errors']:>8}"
+            f"{row['rss_peak'] / 2 ** 20:>9.1f}"
+            f"{row['rss_per_connection'] / 1024:>10.1f}"
+        )
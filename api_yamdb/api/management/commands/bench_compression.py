@@ -0,0 +1,53 @@
+from api.compression import ENCODINGS, compress
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?page_size=5&ordering=name',
+    '/api/v1/leaderboards/?limit=50',
+)
+STATIC = (
+    'redoc.yaml',
+    'admin/css/base.css',
+    'rest_framework/js/jquery-3.5.1.min.js',
+)
+
+
+class Command(BaseCommand):
+    help = ('Показывает, сколько байт экономит сжатие на типичных ответах '
+            'API (как CompressionMiddleware) и на статике (как '
+            'collectstatic), для каждой доступной кодировки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', nargs='+', default=list(PATHS),
+                            help='пути API')
+        parser.add_argument('--static', nargs='+', default=list(STATIC),
+                            help='пути статики относительно STATIC_URL')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'ответ':<48}{'байт':>8}" + ''.join(
+            f'{encoding:>14}' for encoding in ENCODINGS
+        ))
+        client = Client()
+        for path in options['paths']:
+            response = client.get(path)
+            if response.status_code != 200:
+                raise CommandError(f'{path}: {response.status_code}')
+            self.print_row(path, response.content, best=False)
+        for path in options['static']:
+            filename = finders.find(path)
+            if filename is None:
+                raise CommandError(f'{path}: файл статики не найден')
+            with open(filename, 'rb') as file:
+                self.print_row(f'/static/{path}', file.read(), best=True)
+
+    def print_row(self, name, content, best):
+        cells = []
+        for encoding in ENCODINGS:
+            size = len(compress(content, encoding, best))
+            cells.append(f'{size:>7} {1 - size / len(content):>5.0%}')
+        self.stdout.write(f'{name:<48}{len(content):>8}' + ''.join(
+            f'{cell:>14}' for cell in cells
+        ))
@@ -0,0 +1,91 @@
+import json
+import timeit
+
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import (CommentsSerializer, ReviewsSerializer,
+                             TitlesGetSerializer)
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Comments, Review, Title
+
+
+def page(serializer_class, queryset, size):
+    """Данные страницы списка в том виде, в каком их рендерит API."""
+    return {
+        'count': size,
+        'next': 'http://testserver/api/v1/?page=2',
+        'previous': None,
+        'results': serializer_class(queryset[:size], many=True).data,
+    }
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время рендеринга ответов стандартным JSONRenderer '
+            'и FastJSONRenderer (orjson) на произведениях, отзывах и '
+            'комментариях из текущей базы и проверяет, что ответы '
+            'совпадают байт в байт.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int,
+                            default=[1, 5, 100],
+                            help='число объектов в ответе')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='повторов замера, берётся лучший')
+        parser.add_argument('--output', default='bench_json.json')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson не установлен: pip install orjson')
+        payloads = self.payloads(options['sizes'])
+        renderers = {'json': JSONRenderer(), 'orjson': FastJSONRenderer()}
+        report = []
+        self.stdout.write(f"{'ответ':<14}{'объектов':>9}{'байт':>9}"
+                          f"{'json, мкс':>11}{'orjson, мкс':>13}"
+                          f"{'ускорение':>11}")
+        for (name, size), data in payloads.items():
+            expected = renderers['json'].render(data)
+            if renderers['orjson'].render(data) != expected:
+                raise CommandError(f'{name}: ответы различаются')
+            row = {'payload': name, 'size': size, 'bytes': len(expected)}
+            for key, renderer in renderers.items():
+                row[f'{key}_us'] = self.measure(renderer, data,
+                                                options['repeat'])
+            report.append(row)
+            self.stdout.write(
+                f"{name:<14}{size:>9}{row['bytes']:>9}{row['json_us']:>11.1f}"
+                f"{row['orjson_us']:>13.1f}"
+                f"{row['json_us'] / row['orjson_us']:>10.1f}x"
+            )
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Результаты сохранены в {options['output']}"
+        ))
+
+    def payloads(self, sizes):
+        querysets = {
+            'titles': (TitlesGetSerializer, Title.objects.select_related(
+                'category').prefetch_related('genre').order_by('-rating')),
+            'reviews': (ReviewsSerializer,
+                        Review.objects.select_related('author')),
+            'comments': (CommentsSerializer,
+                         Comments.objects.select_related('author')),
+        }
+        payloads = {}
+        for name, (serializer_class, queryset) in querysets.items():
+            if not queryset.exists():
+                raise CommandError('Каталог пуст: загрузите данные '
+                                   '(manage.py import_csv)')
+            payloads[(f'{name}/{{id}}', 1)] = serializer_class(
+                queryset.first()
+            ).data
+            for size in sizes:
+                data = page(serializer_class, queryset, size)
+                payloads[(name, len(data['results']))] = data
+        return payloads
+
+    def measure(self, renderer, data, repeat):
+        """Лучшее среднее время одного рендеринга, микросекунд."""
+        timer = timeit.Timer(lambda: renderer.render(data))
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat, number)) / number * 1e6
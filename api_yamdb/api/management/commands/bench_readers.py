@@ -0,0 +1,140 @@
+import json
+import random
+import time
+import timeit
+
+from api.readers import CommentReader, ReviewReader, TitleReader
+from api.serializers import (CommentsSerializer, ReviewsSerializer,
+                             TitlesGetSerializer)
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Category, Comments, Genre, Review, Title
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает процессорное время страницы списка произведений, '
+            'отзывов и комментариев через сериализаторы DRF и через '
+            'быстрый путь чтения (api.readers), включая запросы к БД. '
+            'Данные создаются во временной транзакции и откатываются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int,
+                            default=[5, 50, 500],
+                            help='размеры страницы')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='повторов замера, берётся лучший')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench_readers.json')
+
+    def handle(self, *args, **options):
+        report = []
+        self.stdout.write(f"{'список':<10}{'размер':>8}{'DRF, мс':>10}"
+                          f"{'values, мс':>12}{'экономия':>10}")
+        with transaction.atomic():
+            querysets = self.populate(max(options['sizes']),
+                                      random.Random(options['seed']))
+            for name, (serializer_class, reader, queryset) in (
+                querysets.items()
+            ):
+                for size in options['sizes']:
+                    row = self.compare(name, serializer_class, reader,
+                                       queryset[:size], options['repeat'])
+                    row['size'] = size
+                    report.append(row)
+                    self.stdout.write(
+                        f"{name:<10}{size:>8}{row['serializer_ms']:>10.2f}"
+                        f"{row['reader_ms']:>12.2f}"
+                        f"{1 - row['reader_ms'] / row['serializer_ms']:>10.0%}"
+                    )
+            transaction.set_rollback(True)
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Результаты сохранены в {options['output']}"
+        ))
+
+    def populate(self, count, rand):
+        """Произведения, отзывы к одному и комментарии к одному отзыву."""
+        users = self.bulk_create(
+            User.objects.filter(username__startswith='bench-'), 'username',
+            (User(username=f'bench-{index}', email=f'bench-{index}@yamdb.ru')
+             for index in range(count))
+        )
+        category = Category.objects.create(name='Бенчмарк', slug='bench')
+        genres = self.bulk_create(
+            Genre.objects.filter(slug__startswith='bench-'), 'slug',
+            (Genre(name=f'Жанр {index}', slug=f'bench-{index}')
+             for index in range(5))
+        )
+        titles = self.bulk_create(
+            Title.objects.filter(category=category), 'name',
+            (Title(name=f'Произведение {index}', year=1900 + index % 120,
+                   description='Описание произведения ' * 5,
+                   category=category, rating=rand.uniform(1, 10))
+             for index in range(count))
+        )
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+            for title in titles for genre in rand.sample(genres, 3)
+        )
+        reviews = self.bulk_create(
+            Review.objects.filter(title=titles[0]), 'author_id',
+            (Review(title=titles[0], author=user, text='Текст отзыва ' * 20,
+                    score=rand.randint(1, 10))
+             for user in users)
+        )
+        Comments.objects.bulk_create(
+            Comments(review=reviews[0], author=user,
+                     text='Текст комментария ' * 5)
+            for user in users
+        )
+        return {
+            'titles': (TitlesGetSerializer, TitleReader(),
+                       Title.objects.filter(category=category)
+                       .select_related('category')
+                       .prefetch_related('genre').order_by('-rating')),
+            'reviews': (ReviewsSerializer, ReviewReader(),
+                        Review.objects.filter(title=titles[0])
+                        .select_related('author').order_by('-pub_date', 'id')),
+            'comments': (CommentsSerializer, CommentReader(),
+                         Comments.objects.filter(review=reviews[0])
+                         .select_related('author')
+                         .order_by('-pub_date', 'id')),
+        }
+
+    def bulk_create(self, queryset, key, objs):
+        """
+        bulk_create с первичными ключами. Базы, которые не возвращают их
+        из вставки (SQLite), перечитываются: queryset выбирает созданные
+        строки, key различает их.
+        """
+        objs = queryset.model.objects.bulk_create(objs)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            pks = dict(queryset.values_list(key, 'pk'))
+            for obj in objs:
+                obj.pk = pks[getattr(obj, key)]
+        return objs
+
+    def compare(self, name, serializer_class, reader, queryset, repeat):
+        def serialize():
+            return serializer_class(queryset.all(), many=True).data
+
+        def read():
+            return reader.represent(reader.read(queryset.all()))
+
+        renderer = JSONRenderer()
+        if renderer.render(serialize()) != renderer.render(read()):
+            raise CommandError(f'{name}: ответы различаются')
+        return {
+            'list': name,
+            'serializer_ms': self.measure(serialize, repeat),
+            'reader_ms': self.measure(read, repeat),
+        }
+
+    def measure(self, func, repeat):
+        """Лучшее процессорное время одного вызова, миллисекунд."""
+        timer = timeit.Timer(func, timer=time.process_time)
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat, number)) / number * 1000
@@ -0,0 +1,69 @@
+import random
+import statistics
+import time
+
+from api.filters import search_titles
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from reviews.models import Title
+
+WORDS = (
+    'побег', 'крестный', 'отец', 'война', 'мир', 'звезда', 'город', 'ночь',
+    'море', 'последний', 'герой', 'тайна', 'дорога', 'остров', 'король',
+    'песня', 'зима', 'сад', 'огонь', 'время',
+)
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержку поиска произведений на каталогах разного '
+            'размера; созданные данные откатываются')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int,
+                            default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--query', default='крестный')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rand = random.Random(options['seed'])
+        query = options['query']
+        typo = query[:-2] + query[-1] + query[-2]
+        self.stdout.write(f'СУБД: {connection.vendor}, запрос: {query!r}, '
+                          f'с опечаткой: {typo!r}')
+        self.stdout.write('размер\tcontains, мс\tsearch, мс\tопечатка, мс')
+        with transaction.atomic():
+            created = 0
+            for size in sorted(options['sizes']):
+                Title.objects.bulk_create(
+                    (Title(name=' '.join(rand.sample(WORDS, 3)).capitalize(),
+                           year=2000, description='')
+                     for _ in range(size - created)),
+                    batch_size=1000,
+                )
+                created = size
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE reviews_title')
+                titles = Title.objects.all()
+                timings = [
+                    self.measure(lambda: titles.filter(name__contains=query),
+                                 options['repeat']),
+                    self.measure(lambda: search_titles(titles, query),
+                                 options['repeat']),
+                    self.measure(lambda: search_titles(titles, typo),
+                                 options['repeat']),
+                ]
+                self.stdout.write('\t'.join(
+                    [str(size)] + [f'{value:.2f}' for value in timings]
+                ))
+            transaction.set_rollback(True)
+
+    def measure(self, build, repeat):
+        """Медиана времени получения первой страницы (5 записей), мс."""
+        results = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(build()[:5])
+            results.append((time.perf_counter() - started) * 1000)
+        return statistics.median(results)
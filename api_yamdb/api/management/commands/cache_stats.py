@@ -0,0 +1,22 @@
+from api.cache import get_cache, stats
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Показывает попадания и промахи кэша ответов API. Счётчики '
+            'хранятся в самом кэше, поэтому команде нужен общий с сервером '
+            'кэш (например, Redis): кэш в памяти процесса ей не виден.')
+
+    def handle(self, *args, **options):
+        if isinstance(get_cache(), LocMemCache):
+            raise CommandError(
+                'Кэш ответов хранится в памяти процессов сервера, и его '
+                'счётчики этой команде недоступны. Задайте общий кэш: '
+                'CACHE_BACKEND=django_redis.cache.RedisCache.'
+            )
+        values = stats()
+        self.stdout.write(
+            f"попаданий: {values['hits']}, промахов: {values['misses']}, "
+            f"доля попаданий: {values['hit_rate']:.1%}"
+        )
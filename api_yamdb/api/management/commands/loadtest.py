@@ -0,0 +1,337 @@
+import json
+import random
+import subprocess
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from api.authentication import RoleAccessToken
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from rest_framework.settings import api_settings
+from reviews.models import Category, Genre, Review, Title
+from tasks.models import Task
+from users.models import User
+
+USER_PREFIX = 'loadtest_'
+
+# Пределы, в которые упирается сам тест: все запросы идут с одного
+# адреса, а виртуальный пользователь пишет чаще раза в секунду.
+LOADTEST_THROTTLES = ('write_user', 'write_ip', 'auth_ip')
+
+# Сценарий и его доля в общем потоке запросов.
+MIX = (
+    ('browse_titles', 40),
+    ('retrieve_title', 10),
+    ('read_reviews', 15),
+    ('read_comments', 10),
+    ('signup_and_token', 5),
+    ('write_review', 10),
+    ('write_comment', 10),
+)
+
+
+def percentile(values, share):
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+    if not values:
+        return None
+    rank = max(1, round(share * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'), capture_output=True, text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Recorder:
+    """Собирает задержки и коды ответов по эндпоинтам из всех потоков."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, endpoint, latency, status):
+        with self.lock:
+            self.latencies[endpoint].append(latency)
+            self.statuses[endpoint][str(status)] += 1
+
+    def summary(self, duration):
+        result = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            statuses = dict(self.statuses[endpoint])
+            errors = sum(count for status, count in statuses.items()
+                         if not status.startswith('2'))
+            result[endpoint] = {
+                'requests': len(values),
+                'rps': len(values) / duration,
+                'p50_ms': percentile(values, 0.50) * 1000,
+                'p95_ms': percentile(values, 0.95) * 1000,
+                'p99_ms': percentile(values, 0.99) * 1000,
+                'errors': errors,
+                'statuses': statuses,
+            }
+        return result
+
+
+class Client:
+    """
+    Виртуальный пользователь: сессия HTTP, его токен и его отзывы
+    (id произведения -> id отзыва).
+    """
+
+    def __init__(self, base_url, recorder, catalog, token, rand):
+        self.base_url = base_url.rstrip('/') + '/api/v1'
+        self.recorder = recorder
+        self.catalog = catalog
+        self.rand = rand
+        self.reviews = {}
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def request(self, endpoint, method, path, authorized=True, **kwargs):
+        headers = {} if authorized else {'Authorization': None}
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.base_url + path, headers=headers, timeout=30,
+                **kwargs
+            )
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 'error'
+        self.recorder.add(endpoint, time.perf_counter() - started, status)
+        return response
+
+    def browse_titles(self):
+        params = self.rand.choice((
+            {},
+            {'page': self.rand.randint(1, 5)},
+            {'genre': self.rand.choice(self.catalog['genres'])},
+            {'category': self.rand.choice(self.catalog['categories'])},
+            {'year': self.rand.choice(self.catalog['years'])},
+            {'search': self.rand.choice(self.catalog['words'])},
+        ))
+        self.request('GET titles/', 'GET', '/titles/', authorized=False,
+                     params=params)
+
+    def retrieve_title(self):
+        title_id = self.rand.choice(self.catalog['titles'])
+        self.request('GET titles/{id}/', 'GET', f'/titles/{title_id}/',
+                     authorized=False)
+
+    def read_reviews(self):
+        title_id = self.rand.choice(self.catalog['titles'])
+        self.request('GET reviews/', 'GET', f'/titles/{title_id}/reviews/',
+                     authorized=False)
+
+    def read_comments(self):
+        title_id, review_id = self.rand.choice(self.catalog['reviews'])
+        self.request(
+            'GET comments/', 'GET',
+            f'/titles/{title_id}/reviews/{review_id}/comments/',
+            authorized=False
+        )
+
+    def signup_and_token(self):
+        username = f'{USER_PREFIX}{uuid.uuid4().hex[:12]}'
+        response = self.request(
+            'POST auth/signup/', 'POST', '/auth/signup/', authorized=False,
+            json={'username': username, 'email': f'{username}@yamdb.fake'}
+        )
+        if response is None or response.status_code != 200:
+            return
+        user = User.objects.get(username=username)
+        self.request(
+            'POST auth/token/', 'POST', '/auth/token/', authorized=False,
+            json={'username': username,
+                  'confirmation_code': default_token_generator.make_token(
+                      user)}
+        )
+
+    def write_review(self):
+        """
+        Один пользователь — один отзыв на произведение: на новое
+        произведение отзыв создаётся, на уже оценённое — меняется оценка.
+        Иначе сценарий мерил бы в основном отказы 400 на дубли.
+        """
+        title_id = self.rand.choice(self.catalog['titles'])
+        score = self.rand.randint(1, 10)
+        review_id = self.reviews.get(title_id)
+        if review_id is not None:
+            self.request(
+                'PATCH reviews/{id}/', 'PATCH',
+                f'/titles/{title_id}/reviews/{review_id}/',
+                json={'score': score}
+            )
+            return
+        response = self.request(
+            'POST reviews/', 'POST', f'/titles/{title_id}/reviews/',
+            json={'text': 'Нагрузочный отзыв', 'score': score}
+        )
+        if response is not None and response.status_code == 201:
+            self.reviews[title_id] = response.json()['id']
+
+    def write_comment(self):
+        title_id, review_id = self.rand.choice(self.catalog['reviews'])
+        self.request(
+            'POST comments/', 'POST',
+            f'/titles/{title_id}/reviews/{review_id}/comments/',
+            json={'text': 'Нагрузочный комментарий'}
+        )
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест API на запущенном сервере: смесь реальных '
+            'сценариев, RPS и p50/p95/p99 по эндпоинтам, отчёт в JSON. '
+            'Сервер должен работать с той же БД и SECRET_KEY.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--duration', type=float, default=30,
+                            help='длительность теста, секунд')
+        parser.add_argument('--concurrency', type=int, default=10,
+                            help='число виртуальных пользователей')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='loadtest.json',
+                            help='куда сохранить результаты')
+        parser.add_argument('--compare',
+                            help='JSON прошлого прогона для сравнения')
+        parser.add_argument('--keep-users', action='store_true',
+                            help='не удалять созданных пользователей')
+        parser.add_argument('--allow-throttling', action='store_true',
+                            help='запускать при включённых пределах '
+                                 'THROTTLE_*')
+
+    def handle(self, *args, **options):
+        if not options['allow_throttling']:
+            self.check_throttles()
+        catalog = self.load_catalog()
+        users = User.objects.bulk_create(
+            User(username=f'{USER_PREFIX}{uuid.uuid4().hex[:12]}',
+                 email=f'{USER_PREFIX}{i}_{uuid.uuid4().hex[:8]}@yamdb.fake')
+            for i in range(options['concurrency'])
+        )
+        users = User.objects.filter(
+            username__in=[user.username for user in users]
+        )
+        recorder = Recorder()
+        weights = [weight for _, weight in MIX]
+        deadline = time.monotonic() + options['duration']
+
+        def run(index, user):
+            rand = random.Random(options['seed'] + index)
+            client = Client(options['base_url'], recorder, catalog,
+                            RoleAccessToken.for_user(user), rand)
+            try:
+                while time.monotonic() < deadline:
+                    scenario, = rand.choices(MIX, weights)
+                    getattr(client, scenario[0])()
+            finally:
+                close_old_connections()
+
+        started = time.monotonic()
+        try:
+            with ThreadPoolExecutor(options['concurrency']) as pool:
+                for future in [pool.submit(run, index, user)
+                               for index, user in enumerate(users)]:
+                    future.result()
+        finally:
+            if not options['keep_users']:
+                User.objects.filter(username__startswith=USER_PREFIX).delete()
+                # Письма на адреса .fake зарегистрированным в тесте.
+                Task.objects.filter(
+                    name='send_mail',
+                    payload__recipient_list__0__startswith=USER_PREFIX,
+                    payload__recipient_list__0__endswith='@yamdb.fake',
+                ).delete()
+        duration = time.monotonic() - started
+        report = {
+            'commit': git_commit(),
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'config': {key: options[key] for key in
+                       ('base_url', 'duration', 'concurrency', 'seed')},
+            'total_rps': sum(map(len, recorder.latencies.values())) / duration,
+            'endpoints': recorder.summary(duration),
+        }
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        previous = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                previous = json.load(file)
+        self.print_report(report, previous)
+        self.stdout.write(self.style.SUCCESS(
+            f"Результаты сохранены в {options['output']}"
+        ))
+        failed = [endpoint for endpoint, row in report['endpoints'].items()
+                  if row['errors'] and not endpoint.startswith('GET')]
+        if failed:
+            raise CommandError(
+                f"Запросы на запись вернули не 2xx: {', '.join(failed)}. "
+                'Проверьте пределы THROTTLE_* и данные: такие замеры '
+                'не отражают скорость записи.'
+            )
+
+    def check_throttles(self):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        limited = [scope for scope in LOADTEST_THROTTLES if rates.get(scope)]
+        if limited:
+            variables = ', '.join(f'THROTTLE_{scope.upper()}'
+                                  for scope in limited)
+            raise CommandError(
+                f'Включены пределы {variables}: тест упрётся в них сам и '
+                'получит 429 вместо замеров. Запустите сервер и команду с '
+                f'пустыми {variables} или передайте --allow-throttling.'
+            )
+
+    def load_catalog(self):
+        catalog = {
+            'titles': list(Title.objects.values_list('pk', flat=True)),
+            'reviews': list(Review.objects.values_list('title_id', 'pk')),
+            'genres': list(Genre.objects.values_list('slug', flat=True)),
+            'categories': list(
+                Category.objects.values_list('slug', flat=True)
+            ),
+            'years': list(Title.objects.values_list('year', flat=True)
+                          .distinct()),
+        }
+        if not catalog['titles'] or not catalog['reviews']:
+            raise CommandError('Каталог пуст: загрузите данные '
+                               '(manage.py import_csv)')
+        catalog['words'] = [
+            word for name in Title.objects.values_list('name', flat=True)[:50]
+            for word in name.split() if len(word) > 3
+        ] or ['а']
+        catalog['genres'] = catalog['genres'] or ['']
+        catalog['categories'] = catalog['categories'] or ['']
+        return catalog
+
+    def print_report(self, report, previous=None):
+        before = previous['endpoints'] if previous else {}
+        self.stdout.write(
+            f"{'эндпоинт':<20}{'запросов':>9}{'RPS':>8}{'p50':>9}"
+            f"{'p95':>9}{'p99':>9}{'ошибок':>8}"
+        )
+        for endpoint, row in report['endpoints'].items():
+            line = (
+                f"{endpoint:<20}{row['requests']:>9}{row['rps']:>8.1f}"
+                f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+                f"{row['p99_ms']:>9.1f}{row['errors']:>8}"
+            )
+            if endpoint in before:
+                change = row['p95_ms'] / before[endpoint]['p95_ms'] - 1
+                line += f'  p95 {change:+.0%}'
+            self.stdout.write(line)
+        self.stdout.write(f"всего RPS: {report['total_rps']:.1f}")
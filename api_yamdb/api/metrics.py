@@ -0,0 +1,375 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from .renderers import FastJSONRenderer
+
+# Верхние границы корзин гистограмм, секунд.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    'yamdb_http_requests_total': (
+        'counter', 'Число HTTP-запросов по маршруту, методу и статусу.'),
+    'yamdb_http_request_duration_seconds': (
+        'histogram', 'Длительность обработки запроса.'),
+    'yamdb_db_queries_total': (
+        'counter', 'Число SQL-запросов.'),
+    'yamdb_db_query_duration_seconds_total': (
+        'counter', 'Суммарное время SQL-запросов.'),
+    'yamdb_serialization_duration_seconds': (
+        'histogram', 'Время сериализации ответа DRF: to_representation '
+                     'и рендеринг.'),
+    'yamdb_compression_saved_bytes_total': (
+        'counter', 'Байт, сэкономленных сжатием ответов API.'),
+    'yamdb_pagination_counts_total': (
+        'counter', 'Подсчёты числа объектов списков по способу.'),
+    'yamdb_throttle_requests_total': (
+        'counter', 'Проверки ограничения частоты по правилу и результату.'),
+}
+
+# Счётчик SQL-запросов текущего HTTP-запроса; None вне запросов.
+current_timer = ContextVar('current_timer', default=None)
+
+# Файл с суммой метрик завершившихся воркеров и блокировка его записи.
+ARCHIVE = 'archive.json'
+ARCHIVE_LOCK = 'archive.lock'
+
+
+def read_snapshot(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshot(path, snapshot):
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump(snapshot, file)
+    os.replace(f'{path}.tmp', path)
+
+
+def worker_alive(filename):
+    """Жив ли процесс, записавший файл <pid>-<время>.json."""
+    try:
+        os.kill(int(filename.split('-', 1)[0]), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+def archive_dead(directory):
+    """
+    Переносит метрики завершившихся воркеров в ARCHIVE и удаляет их
+    файлы: файлы не копятся после перезапусков, а счётчики не убывают.
+    Перенос идёт под блокировкой, чтобы два воркера не учли файл дважды.
+    """
+    dead = [filename for filename in os.listdir(directory)
+            if filename.endswith('.json') and filename != ARCHIVE
+            and not worker_alive(filename)]
+    if not dead:
+        return
+    with open(os.path.join(directory, ARCHIVE_LOCK), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        # Другой воркер мог перенести эти файлы, пока мы ждали блокировку.
+        paths = [path for path in (os.path.join(directory, filename)
+                                   for filename in dead)
+                 if os.path.exists(path)]
+        if not paths:
+            return
+        archive = os.path.join(directory, ARCHIVE)
+        counters, histograms = merge(
+            snapshot for snapshot in map(read_snapshot, [archive] + paths)
+            if snapshot is not None
+        )
+        write_snapshot(archive, {
+            'counters': [[name, list(labels), value] for
+                         (name, labels), value in counters.items()],
+            'histograms': [[name, list(labels), values] for
+                           (name, labels), values in histograms.items()],
+        })
+        for path in paths:
+            os.remove(path)
+
+
+class Registry:
+    """
+    Метрики одного процесса. При заданном METRICS_DIR процесс не чаще
+    раза в METRICS_FLUSH_INTERVAL секунд сбрасывает их в свой файл,
+    а /metrics суммирует файлы всех воркеров gunicorn и ARCHIVE.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.filename = f'{os.getpid()}-{time.time_ns()}.json'
+        self.flushed = time.monotonic()
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[(name, labels)] += value
+
+    def observe(self, name, labels, value):
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                # Счётчики корзин, затем сумма и количество наблюдений.
+                histogram = self.histograms[(name, labels)] = (
+                    [0] * (len(BUCKETS) + 1) + [0.0, 0]
+                )
+            histogram[bisect_left(BUCKETS, value)] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for
+                             (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(values)] for
+                               (name, labels), values in
+                               self.histograms.items()],
+            }
+
+    def maybe_flush(self, force=False):
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.flushed < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.flushed = now
+        os.makedirs(directory, exist_ok=True)
+        write_snapshot(os.path.join(directory, self.filename),
+                       self.snapshot())
+
+    def collect(self):
+        """Метрики всех процессов (или только текущего без METRICS_DIR)."""
+        directory = settings.METRICS_DIR
+        if not directory:
+            return [self.snapshot()]
+        self.maybe_flush(force=True)
+        archive_dead(directory)
+        snapshots = []
+        for filename in os.listdir(directory):
+            if filename.endswith('.json'):
+                snapshot = read_snapshot(os.path.join(directory, filename))
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+        return snapshots
+
+
+registry = Registry()
+
+
+def format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def format_labels(labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels)
+
+
+def merge(snapshots):
+    """Суммирует снимки метрик нескольких процессов."""
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, values in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            previous = histograms.get(key, [0] * len(values))
+            histograms[key] = [a + b for a, b in zip(previous, values)]
+    return counters, histograms
+
+
+def histogram_lines(name, labels, values):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(BUCKETS + ('+Inf',), values):
+        cumulative += count
+        bucket_labels = format_labels(labels + (('le', bound),))
+        lines.append(f'{name}_bucket{{{bucket_labels}}} {cumulative}')
+    lines.append(f'{name}_sum{{{format_labels(labels)}}} '
+                 f'{format_value(values[-2])}')
+    lines.append(f'{name}_count{{{format_labels(labels)}}} {values[-1]}')
+    return lines
+
+
+def render_metrics(snapshots):
+    counters, histograms = merge(snapshots)
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{{{format_labels(labels)}}} '
+                             f'{format_value(value)}')
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric == name:
+                lines += histogram_lines(name, labels, values)
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Метрики в текстовом формате Prometheus."""
+    return HttpResponse(render_metrics(registry.collect()),
+                        content_type='text/plain; version=0.0.4')
+
+
+def route_name(view_func, method):
+    """Имя маршрута вида TitleViewSet.list или user_registration."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', 'unknown')
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(method.lower())
+    if action is None:
+        return view_class.__name__
+    return f'{view_class.__name__}.{action}'
+
+
+class QueryTimer:
+    """execute_wrapper, считающий число и время SQL-запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+def timed_execute(execute, sql, params, many, context):
+    """
+    execute_wrapper каждого соединения: передаёт запрос счётчику текущего
+    HTTP-запроса. Через ContextVar запросы учитываются и тогда, когда
+    представление выполняется в другом потоке (ASGI).
+    """
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(connection):
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, timed_execute)
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Собирает метрики запроса по маршруту DRF-действия. Работает и в WSGI,
+    и в ASGI без перехода в поток синхронного кода.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        started, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        self.finish(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        self.finish(request, response, started)
+        return response
+
+    def start(self, request):
+        request.metrics_timer = QueryTimer()
+        request.metrics_serialization = 0.0
+        return time.perf_counter(), current_timer.set(request.metrics_timer)
+
+    def finish(self, request, response, started):
+        match = getattr(request, 'resolver_match', None)
+        route = (('route', route_name(match.func, request.method)
+                  if match else 'unmatched'),)
+        timer = request.metrics_timer
+        registry.inc('yamdb_http_requests_total', route + (
+            ('method', request.method), ('status', response.status_code)
+        ))
+        registry.observe('yamdb_http_request_duration_seconds', route,
+                         time.perf_counter() - started)
+        registry.inc('yamdb_db_queries_total', route, timer.count)
+        registry.inc('yamdb_db_query_duration_seconds_total', route,
+                     timer.duration)
+        if request.metrics_serialization:
+            registry.observe('yamdb_serialization_duration_seconds', route,
+                             request.metrics_serialization)
+        registry.maybe_flush()
+
+
+def add_serialization_time(request, seconds):
+    """Прибавляет время ко времени сериализации запроса Django или DRF."""
+    request = getattr(request, '_request', request)
+    request.metrics_serialization = (
+        getattr(request, 'metrics_serialization', 0.0) + seconds
+    )
+
+
+@contextmanager
+def timed_serialization(request):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if request is not None:
+            add_serialization_time(request, time.perf_counter() - started)
+
+
+class TimedSerializationMixin:
+    """
+    Вьюсет учитывает в метрике сериализации to_representation своих
+    сериализаторов. Оборачивается только корневой сериализатор, поэтому
+    вложенные поля не считаются дважды.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        represent = serializer.to_representation
+
+        def timed_representation(instance):
+            with timed_serialization(self.request):
+                return represent(instance)
+
+        serializer.to_representation = timed_representation
+        return serializer
+
+
+class TimedJSONRenderer(FastJSONRenderer):
+    """FastJSONRenderer, который отмечает время рендеринга в метриках."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed_serialization((renderer_context or {}).get('request')):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
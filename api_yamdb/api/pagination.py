@@ -1,5 +1,244 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+import json
+from collections import OrderedDict
 
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
 
-class PagePaginations(PageNumberPagination):
+from .cache import get_cache, get_generation, replica_may_lag
+from .metrics import registry
+
+
+def table_estimate(queryset):
+    """Число строк таблицы по статистике PostgreSQL или None."""
+    connection = connections[queryset.db]
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples FROM pg_class '
+                       'WHERE oid = %s::regclass', [table])
+        row = cursor.fetchone()
+    # -1: таблицу ещё не анализировали.
+    return None if row is None or row[0] < 0 else int(row[0])
+
+
+def compile_query(queryset):
+    """SQL запроса без сортировки или None, если он заведомо пуст."""
+    query = queryset.order_by().query
+    try:
+        return query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return None
+
+
+def plan_estimate(queryset):
+    """Число строк запроса по оценке планировщика PostgreSQL (EXPLAIN)."""
+    sql, params = compile_query(queryset)
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_count(queryset):
+    """
+    Число объектов и признак оценки. До EXACT_COUNT_THRESHOLD объектов
+    число точное: COUNT(*) ограничен LIMIT и не читает больше строк.
+    Больше — оценка PostgreSQL: для запроса без фильтров статистика
+    таблицы, иначе план запроса. На других СУБД число всегда точное.
+    """
+    threshold = settings.EXACT_COUNT_THRESHOLD
+    count = queryset.order_by().values('pk')[:threshold + 1].count()
+    if count <= threshold:
+        return count, False
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.count(), False
+    estimate = None
+    if not queryset.query.where and not queryset.query.distinct:
+        estimate = table_estimate(queryset)
+    if estimate is None:
+        estimate = plan_estimate(queryset)
+    return max(estimate, count), True
+
+
+def count_key(compiled, scope, generation):
+    raw = repr(compiled).encode()
+    return (f'api:count:{scope}:{generation}:'
+            f'{hashlib.md5(raw).hexdigest()}')
+
+
+def count_objects(queryset, scope=None):
+    """
+    estimate_count с кэшем на поколение раздела scope (api.cache): число
+    общее для всех страниц и сортировок и сбрасывается вместе с ответами
+    раздела при изменении данных.
+    """
+    compiled = compile_query(queryset)
+    if compiled is None:
+        return 0, False
+    if scope is None:
+        count, estimated = estimate_count(queryset)
+    else:
+        cache = get_cache()
+        generation = get_generation(cache, scope)
+        key = count_key(compiled, scope, generation)
+        cached = cache.get(key)
+        if cached is not None:
+            registry.inc('yamdb_pagination_counts_total',
+                         (('method', 'cache'),))
+            return tuple(cached)
+        count, estimated = estimate_count(queryset)
+        if not replica_may_lag(generation):
+            cache.set(key, (count, estimated), settings.API_CACHE_TIMEOUT)
+    registry.inc('yamdb_pagination_counts_total',
+                 (('method', 'estimate' if estimated else 'exact'),))
+    return count, estimated
+
+
+def ordering_columns(paginator):
+    """
+    Колонки, по которым paginator сортирует и строит курсор. Их нужно
+    читать, даже если клиент не выбрал эти поля в ?fields=.
+    """
+    ordering = getattr(paginator, 'ordering', None) or ()
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    return tuple(column.lstrip('-') for column in ordering)
+
+
+class EstimatedPage(Page):
+    """Страница, которая знает, есть ли следующая, без точного числа."""
+
+    def __init__(self, object_list, number, paginator, next_exists):
+        super().__init__(object_list, number, paginator)
+        self.next_exists = next_exists
+
+    def has_next(self):
+        return self.next_exists
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator с числом объектов из count_objects. Если число оценено,
+    страницы за ним не отбрасываются: следующая страница есть, если
+    прочиталась лишняя строка, а на последней странице число становится
+    точным.
+    """
+
+    def __init__(self, object_list, per_page, scope=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+        self.estimated = False
+
+    @cached_property
+    def count(self):
+        count, self.estimated = count_objects(self.object_list, self.scope)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.estimated or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        next_exists = len(rows) > self.per_page
+        if next_exists:
+            self.count = max(self.count, bottom + len(rows))
+        else:
+            self.count = bottom + len(rows)
+            self.estimated = False
+        return EstimatedPage(rows[:self.per_page], number, self, next_exists)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Постраничная пагинация без полного COUNT(*) на больших списках.
+    Поле count_estimated ответа — оценено ли count. Ответы вьюсетов с
+    cache_scope кэшируют число на поколение раздела.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_scope = getattr(view, 'cache_scope', None)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        # PageNumberPagination создаёт пагинатор через этот атрибут.
+        return EstimatedCountPaginator(object_list, per_page,
+                                       scope=self.count_scope)
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_estimated', paginator.estimated),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_estimated'] = {
+            'type': 'boolean',
+        }
+        return response_schema
+
+
+class PagePaginations(EstimatedCountPagination):
     page_size = 5
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсорная пагинация по (-pub_date, id) без COUNT(*) и OFFSET."""
+
+    page_size = 5
+    ordering = ('-pub_date', 'id')
+
+
+class PageOrCursorPagination(PagePaginations):
+    """
+    Постраничная пагинация, которую клиент может сменить на курсорную
+    параметром ?pagination=cursor.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_pagination_class = PubDateCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    @property
+    def ordering(self):
+        # Курсор выбирается в paginate_queryset, а колонки нужны раньше.
+        return self.cursor_pagination_class.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.mode_query_param)
+        if mode == self.cursor_mode:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
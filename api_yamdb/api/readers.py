@@ -0,0 +1,179 @@
+"""
+Быстрый путь чтения для list и retrieve.
+
+Сериализаторы DRF собирают на каждую строку экземпляр модели и проходят
+по всем полям. Читателям (Reader) достаточно values() с нужными
+колонками: строки превращаются в словари той же формы, что дают
+TitlesGetSerializer, ReviewsSerializer и CommentsSerializer, а совпадение
+ответов проверяет api.tests.test_readers. При ?fields= читатель читает
+только колонки выбранных полей: колонка name или name__* относится к полю
+ответа name.
+"""
+from collections import defaultdict
+
+from rest_framework import serializers
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from reviews.models import Title
+
+from .metrics import timed_serialization
+from .pagination import ordering_columns
+
+# Поле без сериализатора: формат и часовой пояс — из настроек DRF.
+datetime_field = serializers.DateTimeField()
+
+
+def integer(value):
+    """Как serializers.IntegerField: None остаётся None."""
+    return None if value is None else int(value)
+
+
+def pair(name, slug):
+    """Жанр или категория: как GenresSerializer и CategoriesSerializer."""
+    return {'name': name, 'slug': slug}
+
+
+class Reader:
+    """
+    Читает колонки fields и строит из строк ответ сериализатора. output —
+    поля ответа, выбранные клиентом, или None для всех полей; keep —
+    колонки, которые читаются всегда, например для курсора пагинации.
+    """
+    fields = ()
+
+    def __init__(self, output=None, keep=()):
+        self.output = output
+        fields = self.fields
+        if output is not None:
+            fields = tuple(
+                column for column in fields
+                if column == 'id' or column.split('__', 1)[0] in output
+            )
+        self.fields = fields + tuple(column for column in keep
+                                     if column not in fields)
+
+    def wants(self, name):
+        return self.output is None or name in self.output
+
+    def read(self, queryset):
+        return queryset.prefetch_related(None).values(*self.fields)
+
+    def represent(self, rows):
+        if self.output is None:
+            return [self.represent_row(row) for row in rows]
+        # Непрочитанные колонки — None, лишние поля ответа отбрасываются.
+        blank = dict.fromkeys(type(self).fields)
+        output = self.output
+        return [
+            {name: value for name, value
+             in self.represent_row({**blank, **row}).items()
+             if name in output}
+            for row in rows
+        ]
+
+    def represent_row(self, row):
+        raise NotImplementedError('.represent_row() must be overridden')
+
+
+class TitleReader(Reader):
+    """Форма TitlesGetSerializer; жанры — одним запросом на страницу."""
+    fields = ('id', 'name', 'year', 'rating', 'description',
+              'category__name', 'category__slug')
+
+    def represent(self, rows):
+        rows = list(rows)
+        self.genres = defaultdict(list)
+        if rows and self.wants('genre'):
+            # Порядок жанров — Meta.ordering жанра, как у prefetch_related.
+            links = Title.genre.through.objects.filter(
+                title_id__in=[row['id'] for row in rows]
+            ).order_by('-genre__name').values_list(
+                'title_id', 'genre__name', 'genre__slug'
+            )
+            for title_id, name, slug in links:
+                self.genres[title_id].append(pair(name, slug))
+        return super().represent(rows)
+
+    def represent_row(self, row):
+        category = (None if row['category__slug'] is None
+                    else pair(row['category__name'], row['category__slug']))
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': integer(row['rating']),
+            'description': row['description'],
+            'genre': self.genres[row['id']],
+            'category': category,
+        }
+
+
+class ReviewReader(Reader):
+    """Форма ReviewsSerializer."""
+    fields = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    def represent_row(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': datetime_field.to_representation(row['pub_date']),
+        }
+
+
+class CommentReader(Reader):
+    """Форма CommentsSerializer."""
+    fields = ('id', 'text', 'author__username', 'pub_date')
+
+    def represent_row(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': datetime_field.to_representation(row['pub_date']),
+        }
+
+
+class FastReadMixin:
+    """
+    list и retrieve через reader_class вместо сериализатора (без него —
+    через сериализатор). Фильтры, пагинация и права те же; объектные права
+    проверяются на словаре строки, поэтому должны пропускать безопасные
+    методы не глядя на объект, как права вьюсетов API.
+    """
+
+    reader_class = None
+
+    def get_reader(self):
+        # Поля из ?fields= и ?exclude=, если вьюсет их поддерживает.
+        # Колонки сортировки пагинатора читаются всегда: по ним строится
+        # курсор, а из ответа их убирает represent уже после пагинации.
+        return self.reader_class(getattr(self, 'sparse_fields', None),
+                                 keep=ordering_columns(self.paginator))
+
+    def list(self, request, *args, **kwargs):
+        if self.reader_class is None:
+            return super().list(request, *args, **kwargs)
+        reader = self.get_reader()
+        rows = reader.read(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        with timed_serialization(request):
+            data = reader.represent(rows if page is None else page)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.reader_class is None:
+            return super().retrieve(request, *args, **kwargs)
+        reader = self.get_reader()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            reader.read(self.filter_queryset(self.get_queryset())),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, row)
+        with timed_serialization(request):
+            data = reader.represent([row])[0]
+        return Response(data)
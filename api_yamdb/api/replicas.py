@@ -0,0 +1,171 @@
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Реплика, выбранная для текущего запроса; None — читать с основной базы.
+current_replica = ContextVar('current_replica', default=None)
+
+# Реплики, недоступные в этом процессе, и время (monotonic) до повторной
+# попытки.
+unavailable = {}
+
+
+class Choice:
+    """Выбранная реплика; соединение проверяется при первом чтении."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.checked = False
+
+
+def reads_from_replica():
+    choice = current_replica.get()
+    return choice is not None and choice.alias is not None
+
+
+def choose_replica():
+    now = time.monotonic()
+    available = [alias for alias in settings.DATABASE_REPLICAS
+                 if unavailable.get(alias, 0) <= now]
+    return random.choice(available) if available else None
+
+
+def check_replica(alias):
+    """Проверяет соединение с репликой; недоступную исключает на время."""
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        unavailable[alias] = (time.monotonic()
+                              + settings.REPLICA_RETRY_SECONDS)
+        return False
+    return True
+
+
+def client_ident(request):
+    """
+    Клиент запроса: пользователь из действительного токена, без него —
+    адрес из X-Forwarded-For с учётом NUM_PROXIES, как в api.throttling.
+    REMOTE_ADDR за nginx у всех клиентов один. Middleware работает до
+    аутентификации DRF, поэтому токен проверяется здесь: это только
+    подпись, без запроса к БД.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    try:
+        raw_token = header and authentication.get_raw_token(header)
+        if raw_token:
+            token = authentication.get_validated_token(raw_token)
+            return f'user:{token[api_settings.USER_ID_CLAIM]}'
+    except (AuthenticationFailed, KeyError):
+        pass
+    return f'ip:{BaseThrottle().get_ident(request)}'
+
+
+def sticky_key(request):
+    return f'db:primary:{client_ident(request)}'
+
+
+class ReplicaRouter:
+    """
+    Чтения внутри запросов GET/HEAD идут на реплику, выбранную
+    ReplicaMiddleware. Запись, миграции и всё вне запросов — на default.
+    """
+
+    def db_for_read(self, model, **hints):
+        choice = current_replica.get()
+        if choice is None or choice.alias is None:
+            return None
+        if not choice.checked:
+            choice.checked = True
+            if not check_replica(choice.alias):
+                choice.alias = None
+                return None
+        return choice.alias
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware(MiddlewareMixin):
+    """
+    Распределяет чтения GET/HEAD по доступным репликам. Клиент, который
+    успешно писал в последние REPLICA_STICKY_SECONDS, читает с основной
+    базы, чтобы видеть свои изменения несмотря на отставание реплик.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        choice, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_replica.reset(token)
+        return self.finish(request, response, choice)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        choice, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_replica.reset(token)
+        return self.finish(request, response, choice)
+
+    def start(self, request):
+        """Выбор базы: для записи — default, для чтения — реплика."""
+        if request.method not in SAFE_METHODS:
+            choice = None
+        else:
+            cache = caches[settings.API_CACHE_ALIAS]
+            choice = Choice(None if cache.get(sticky_key(request))
+                            else choose_replica())
+        return choice, current_replica.set(choice)
+
+    def finish(self, request, response, choice):
+        if request.method not in SAFE_METHODS:
+            # Отказ ничего не записал: читать с основной базы незачем.
+            if 200 <= response.status_code < 400:
+                caches[settings.API_CACHE_ALIAS].set(
+                    sticky_key(request), True,
+                    settings.REPLICA_STICKY_SECONDS
+                )
+        elif response.streaming:
+            response.streaming_content = self.stream(
+                choice, response.streaming_content
+            )
+        return response
+
+    def stream(self, choice, content):
+        """Потоковый ответ читает из той же реплики, что и представление."""
+        current_replica.set(choice)
+        try:
+            yield from content
+        finally:
+            current_replica.set(None)
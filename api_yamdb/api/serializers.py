@@ -1,10 +1,15 @@
 from datetime import datetime
 
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError
 from rest_framework import serializers
-from reviews.models import Category, Comments, Genre, Review, Title
+from rest_framework.settings import api_settings
+from reviews.models import (Category, Comments, Genre, Review, ScoreHistogram,
+                            Title, TitleRanking)
 from users.models import User
 
+from .fields import BulkSlugRelatedField
+from .sparse import SparseFieldsSerializerMixin
+
 
 class AuthUserSerializer(serializers.ModelSerializer):
     """Сериализатор для регистрации нового пользователя."""
@@ -60,18 +65,18 @@ class GenresSerializer(serializers.ModelSerializer):
 
 class TitlesSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Title, POST."""
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True,
         required=False
     )
-    category = serializers.SlugRelatedField(
+    category = BulkSlugRelatedField(
         queryset=Category.objects.all(),
         many=False,
         slug_field='slug',
     )
-    rating = serializers.IntegerField(required=False)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         fields = ('id', 'name', 'year', 'rating', 'description',
@@ -90,11 +95,12 @@ class TitlesSerializer(serializers.ModelSerializer):
         return data
 
 
-class TitlesGetSerializer(serializers.ModelSerializer):
+class TitlesGetSerializer(SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
     """Сериализатор для модели Title, GET."""
     genre = GenresSerializer(many=True)
     category = CategoriesSerializer()
-    rating = serializers.IntegerField(required=False)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         fields = ('id', 'name', 'year', 'rating', 'description', 'genre',
@@ -104,7 +110,38 @@ class TitlesGetSerializer(serializers.ModelSerializer):
                             'genre', 'category')
 
 
-class ReviewsSerializer(serializers.ModelSerializer):
+class RankedTitleSerializer(serializers.ModelSerializer):
+    """Произведение в рейтинге лучших."""
+    rating = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        fields = ('id', 'name', 'year', 'rating', 'rating_count')
+        model = Title
+
+
+class TitleRankingSerializer(serializers.ModelSerializer):
+    """Место в рейтинге лучших произведений."""
+    title = RankedTitleSerializer(read_only=True)
+
+    class Meta:
+        fields = ('score', 'title')
+        model = TitleRanking
+
+
+class ScoreStatsSerializer(serializers.ModelSerializer):
+    """Распределение оценок произведения."""
+    count = serializers.ReadOnlyField()
+    mean = serializers.ReadOnlyField()
+    median = serializers.ReadOnlyField()
+    histogram = serializers.ReadOnlyField()
+
+    class Meta:
+        fields = ('count', 'mean', 'median', 'histogram')
+        model = ScoreHistogram
+
+
+class ReviewsSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для модели Review."""
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
@@ -114,24 +151,28 @@ class ReviewsSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         model = Review
 
-    def validate(self, data):
-        """Валидация на уникальность и оценки."""
-        if 'POST' in self.context.get('request').method:
-            title_id = self.context['view'].kwargs.get('title_id')
-            title = get_object_or_404(Title, pk=title_id)
-            author = self.context.get('request').user
-            if Review.objects.filter(author=author, title=title).exists():
-                raise serializers.ValidationError(
+    def create(self, validated_data):
+        """
+        Дубль отзыва отсекает ограничение unique_review, поэтому
+        параллельные запросы не проходят мимо проверки.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=validated_data['author'],
+                title_id=validated_data['title_id']
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
                     'Один пользователь, один отзыв!'
-                )
-        if data['score'] > 11 or data['score'] < 0:
-            raise serializers.ValidationError(
-                'Оценка только от 1 до 10!'
-            )
-        return data
+                ]
+            })
 
 
-class CommentsSerializer(serializers.ModelSerializer):
+class CommentsSerializer(SparseFieldsSerializerMixin,
+                         serializers.ModelSerializer):
     """Сериализатор для модели Comment."""
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
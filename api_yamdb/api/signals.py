@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+from .authentication import forget_user
+from .cache import INVALIDATES, invalidate
+from .metrics import install_query_timer
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def catalog_changed(sender, **kwargs):
+    """
+    Сбрасывает кэш ответов, зависящих от изменённой модели, после
+    фиксации транзакции: иначе запрос, прочитавший данные до фиксации,
+    закэшировал бы их под новым поколением.
+    """
+    scopes = INVALIDATES[sender]
+    transaction.on_commit(lambda: invalidate(*scopes))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(lambda: invalidate(*INVALIDATES[Title]))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Роль, активность и удаление действуют на выданные токены сразу."""
+    forget_user(instance.pk)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    """Подключает учёт SQL-запросов в метриках к новому соединению."""
+    install_query_timer(connection)
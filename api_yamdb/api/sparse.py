@@ -0,0 +1,103 @@
+"""
+Выборочные поля ответа: ?fields=id,name,rating и ?exclude=description.
+
+Сериализатор с SparseFieldsSerializerMixin отдаёт только выбранные поля,
+а вьюсет с SparseFieldsMixin сужает запрос: only() по выбранным колонкам,
+а связи, которые не запрошены, не присоединяются и не подгружаются.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from .pagination import ordering_columns
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+def parse_names(request, param, available):
+    value = request.query_params.get(param, '')
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValidationError({param: [
+            f"Неизвестные поля: {', '.join(unknown)}. "
+            f"Доступны: {', '.join(available)}."
+        ]})
+    return names
+
+
+def selected_fields(request, available):
+    """
+    Поля из available, выбранные ?fields= и ?exclude=, в порядке
+    available, или None, если клиент не выбирал поля.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fields = parse_names(request, FIELDS_PARAM, available)
+    exclude = parse_names(request, EXCLUDE_PARAM, available)
+    if not fields and not exclude:
+        return None
+    return tuple(name for name in available
+                 if (not fields or name in fields) and name not in exclude)
+
+
+def narrow_queryset(queryset, fields):
+    """
+    only() по полям модели fields. Внешние ключи присоединяются
+    select_related, многие-ко-многим подгружаются prefetch_related, только
+    если запрошены. Поля не из модели (аннотации) не сужают запрос.
+    """
+    meta = queryset.model._meta
+    columns, related, prefetch = [meta.pk.name], [], []
+    for name in fields:
+        try:
+            field = meta.get_field(name)
+        except FieldDoesNotExist:
+            return queryset
+        if field.many_to_many or field.one_to_many:
+            prefetch.append(name)
+            continue
+        columns.append(name)
+        if field.is_relation:
+            related.append(name)
+    return (queryset.select_related(None).select_related(*related)
+            .prefetch_related(None).prefetch_related(*prefetch)
+            .only(*columns))
+
+
+class SparseFieldsSerializerMixin:
+    """Сериализатор отдаёт поля, выбранные в запросе из контекста."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = selected_fields(self.context.get('request'),
+                                   tuple(fields))
+        if selected is None:
+            return fields
+        return {name: fields[name] for name in selected}
+
+
+class SparseFieldsMixin:
+    """
+    Сужает запрос list и retrieve до полей, выбранных ?fields= и
+    ?exclude=. Поля берутся из Meta.fields сериализатора.
+    """
+
+    sparse_actions = ('list', 'retrieve')
+
+    @property
+    def sparse_fields(self):
+        if getattr(self, 'action', None) not in self.sparse_actions:
+            return None
+        return selected_fields(self.request,
+                               self.get_serializer_class().Meta.fields)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.sparse_fields
+        if fields is None:
+            return queryset
+        # Колонки курсора нужны пагинатору, даже если их нет в ответе.
+        return narrow_queryset(queryset,
+                               fields + ordering_columns(self.paginator))
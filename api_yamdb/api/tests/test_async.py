@@ -0,0 +1,131 @@
+import json
+import threading
+from unittest import mock
+
+from api import async_views
+from api.authentication import RoleAccessToken
+from api.metrics import registry
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Comments, Review, Title
+from users.models import User
+
+PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/{title}/',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/{review}/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+)
+
+
+@override_settings(ROOT_URLCONF='api_yamdb.urls_async')
+class AsyncReadTest(TransactionTestCase):
+    """
+    ASGI-режим: горячие чтения — асинхронные представления, ORM в пуле.
+    Потоки пула работают со своими соединениями, поэтому данные должны
+    быть зафиксированы.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = user = User.objects.create(username='user',
+                                               email='user@yamdb.ru')
+        self.title = Title.objects.create(name='Произведение', year=2000,
+                                          description='Описание')
+        self.review = Review.objects.create(title=self.title, author=user,
+                                            text='Отзыв', score=8)
+        Comments.objects.create(review=self.review, author=user,
+                                text='Комментарий')
+        self.async_client = AsyncClient()
+
+    def get(self, path, **headers):
+        async def request():
+            return await self.async_client.get(path, **headers)
+        return async_to_sync(request)()
+
+    def paths(self):
+        return [path.format(title=self.title.pk, review=self.review.pk)
+                for path in PATHS]
+
+    def test_same_data_as_sync_views(self):
+        for path in self.paths():
+            response = self.get(path)
+            self.assertEqual(response.status_code, 200)
+            cache.clear()
+            with override_settings(ROOT_URLCONF='api_yamdb.urls'):
+                expected = APIClient().get(path)
+            self.assertEqual(response.json(), expected.json(), path)
+            self.assertEqual(response['Content-Type'],
+                             expected['Content-Type'])
+
+    def test_orm_runs_in_pool(self):
+        threads = set()
+        respond = async_views.respond
+
+        def record(*args, **kwargs):
+            threads.add(threading.current_thread().name)
+            return respond(*args, **kwargs)
+
+        with mock.patch('api.async_views.respond', record):
+            response = self.get(self.paths()[2])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads.pop().startswith('yamdb-db'))
+
+    def test_metrics(self):
+        labels = (('route', 'ReviewsViewSet.list'),)
+        before = registry.counters[('yamdb_db_queries_total', labels)]
+        self.get(self.paths()[2])
+        self.assertGreater(
+            registry.counters[('yamdb_db_queries_total', labels)], before
+        )
+
+    def test_missing_title(self):
+        response = self.get('/api/v1/titles/0/reviews/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_streaming_export(self):
+        threads = set()
+        spool = async_views.spool
+
+        def record(content):
+            threads.add(threading.current_thread().name)
+            return spool(content)
+
+        with mock.patch('api.async_views.spool', record):
+            token = RoleAccessToken.for_user(self.user)
+            response = self.get(
+                '/api/v1/export/titles.ndjson',
+                authorization=f'Bearer {token}'
+            )
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in
+                b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.title.pk])
+        # Выгрузка готовится в общем пуле, а не в отдельном потоке.
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads.pop().startswith('yamdb-db'))
+
+    def test_writes_skip_pool(self):
+        threads = set()
+        respond = async_views.respond
+
+        def record(*args, **kwargs):
+            threads.add(threading.current_thread().name)
+            return respond(*args, **kwargs)
+
+        async def request():
+            return await self.async_client.post(
+                f'/api/v1/titles/{self.title.pk}/reviews/',
+                {'text': 'Отзыв', 'score': 5}
+            )
+
+        with mock.patch('api.async_views.respond', record):
+            response = async_to_sync(request)()
+        # Анонимная запись отклоняется, но уже вне пула.
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(len(threads), 1)
+        self.assertFalse(threads.pop().startswith('yamdb-db'))
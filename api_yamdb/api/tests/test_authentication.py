@@ -0,0 +1,104 @@
+import time
+
+from api.authentication import RoleAccessToken
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Title
+from users.models import User, UserRole
+
+
+class ClaimsAuthenticationTest(TestCase):
+    """Аутентификация без загрузки пользователя; права — из БД или кэша."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin',
+                                        email='admin@yamdb.ru',
+                                        role=UserRole.ADMIN)
+        cls.user = User.objects.create(username='user',
+                                       email='user@yamdb.ru')
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание')
+
+    def setUp(self):
+        cache.clear()
+        caches['auth'].clear()
+
+    def client_for(self, user):
+        client = APIClient()
+        token = RoleAccessToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def test_read_needs_no_user_query(self):
+        client = self.client_for(self.user)
+        url = f'/api/v1/titles/{self.title.pk}/reviews/'
+        client.get(url)
+        with self.assertNumQueries(2):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_review_author_from_claims(self):
+        client = self.client_for(self.user)
+        response = client.post(
+            f'/api/v1/titles/{self.title.pk}/reviews/',
+            {'text': 'Отзыв', 'score': 7}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['author'], 'user')
+
+    def test_role_change_revokes_claims(self):
+        client = self.client_for(self.user)
+        self.assertEqual(client.get('/api/v1/users/').status_code, 403)
+        response = self.client_for(self.admin).patch(
+            '/api/v1/users/user/', {'role': UserRole.ADMIN}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.get('/api/v1/users/').status_code, 200)
+
+    def test_deleted_user_is_rejected(self):
+        client = self.client_for(self.user)
+        self.client_for(self.admin).delete('/api/v1/users/user/')
+        self.assertEqual(client.get('/api/v1/users/me/').status_code, 401)
+
+    def test_profile_is_read_from_db(self):
+        response = self.client_for(self.user).get('/api/v1/users/me/')
+        self.assertEqual(response.data['email'], 'user@yamdb.ru')
+
+    def test_demotion_survives_cache_eviction(self):
+        admin = User.objects.create(username='boss', email='boss@yamdb.ru',
+                                    role=UserRole.ADMIN)
+        client = self.client_for(admin)
+        self.assertEqual(client.get('/api/v1/users/').status_code, 200)
+        # Изменение мимо UserViewSet, затем вытеснение и очистка кэша.
+        User.objects.filter(pk=admin.pk).update(role=UserRole.USER)
+        caches['auth'].clear()
+        cache.clear()
+        self.assertEqual(client.get('/api/v1/users/').status_code, 403)
+
+    def test_inactive_user_is_rejected(self):
+        client = self.client_for(self.user)
+        self.assertEqual(client.get('/api/v1/users/me/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(client.get('/api/v1/users/me/').status_code, 401)
+
+    def test_default_cache_is_short_lived(self):
+        # Кэш по умолчанию — в памяти процесса; изменения в других
+        # воркерах он не видит и держит состояние лишь несколько секунд.
+        if settings.CACHES['auth']['BACKEND'].endswith('LocMemCache'):
+            self.assertEqual(settings.AUTH_STATE_TIMEOUT, 5)
+
+    @override_settings(AUTH_STATE_TIMEOUT=1)
+    def test_change_from_other_worker_expires(self):
+        client = self.client_for(self.admin)
+        self.assertEqual(client.get('/api/v1/users/').status_code, 200)
+        # Изменение мимо сигналов — как из другого воркера.
+        User.objects.filter(pk=self.admin.pk).update(role=UserRole.USER)
+        with self.assertNumQueries(2):
+            self.assertEqual(client.get('/api/v1/users/').status_code, 200)
+        time.sleep(1.1)
+        cache.clear()
+        self.assertEqual(client.get('/api/v1/users/').status_code, 403)
@@ -0,0 +1,125 @@
+from django.core.cache import cache
+from django.test import TestCase, skipUnlessDBFeature
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Title
+from users.models import User, UserRole
+
+TITLES_URL = '/api/v1/titles/bulk/'
+
+
+class BulkCatalogTest(TestCase):
+    """Пакетное создание, изменение и удаление каталога."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Фильм', slug='movie')
+        cls.genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(3)
+        ]
+        cls.admin = User.objects.create(
+            username='admin', email='admin@yamdb.ru', role=UserRole.ADMIN
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def titles(self, count):
+        return [{'name': f'Произведение {i}', 'year': 2000,
+                 'description': 'Описание', 'category': 'movie',
+                 'genre': ['genre-0', 'genre-1']} for i in range(count)]
+
+    def test_create_titles(self):
+        response = self.client.post(TITLES_URL, self.titles(3),
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 3)
+        self.assertCountEqual(response.data[0]['genre'],
+                              ['genre-0', 'genre-1'])
+        self.assertEqual(Title.objects.filter(genre=self.genres[1]).count(),
+                         3)
+
+    @skipUnlessDBFeature('can_return_rows_from_bulk_insert')
+    def test_create_queries_do_not_depend_on_size(self):
+        queries = []
+        for count in (1, 50):
+            with self.assertNumQueries(7) as context:
+                response = self.client.post(TITLES_URL, self.titles(count),
+                                            format='json')
+            self.assertEqual(response.status_code, 201)
+            queries.append(len(context.captured_queries))
+        self.assertEqual(queries[0], queries[1])
+
+    def test_per_item_errors(self):
+        data = self.titles(3)
+        data[1]['genre'] = ['genre-0', 'missing']
+        data[2]['year'] = 3000
+        response = self.client.post(TITLES_URL, data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('genre', response.data[1])
+        self.assertIn('year', response.data[2])
+        self.assertFalse(Title.objects.exists())
+
+    def test_update_titles(self):
+        self.client.post(TITLES_URL, self.titles(2), format='json')
+        first, second = Title.objects.order_by('pk')
+        response = self.client.patch(TITLES_URL, [
+            {'id': first.pk, 'genre': ['genre-2']},
+            {'id': second.pk, 'name': 'Новое название'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['genre'], ['genre-2'])
+        second.refresh_from_db()
+        self.assertEqual(second.name, 'Новое название')
+        self.assertEqual(second.genre.count(), 2)
+
+    def test_update_unknown_id(self):
+        response = self.client.patch(TITLES_URL, [{'id': 0, 'name': 'Нет'}],
+                                     format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id', response.data[0])
+
+    def test_delete_titles(self):
+        self.client.post(TITLES_URL, self.titles(3), format='json')
+        ids = list(Title.objects.values_list('pk', flat=True))
+        response = self.client.delete(TITLES_URL, ids[:2], format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(Title.objects.values_list('pk', flat=True)),
+                         ids[2:])
+        response = self.client.delete(TITLES_URL, [ids[2], 0],
+                                      format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], [])
+        self.assertTrue(Title.objects.exists())
+
+    def test_genres_unique_slugs(self):
+        response = self.client.post('/api/v1/genres/bulk/', [
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Ещё комедия', 'slug': 'comedy'},
+            {'name': 'Дубль', 'slug': 'genre-0'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('slug', response.data[1])
+        self.assertIn('slug', response.data[2])
+
+    def test_invalidates_cache(self):
+        self.assertEqual(len(self.client.get('/api/v1/genres/').data
+                             ['results']), 3)
+        response = self.client.post('/api/v1/genres/bulk/', [
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.client.get('/api/v1/genres/').data
+                             ['results']), 4)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(User.objects.create(
+            username='user', email='user@yamdb.ru'
+        ))
+        response = self.client.post(TITLES_URL, self.titles(1),
+                                    format='json')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,95 @@
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Genre, Review, Title
+from users.models import User
+
+
+class CatalogCacheTest(TestCase):
+    """Кэш ответов каталога и его сброс при изменении данных."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.genre = Genre.objects.create(name='Драма', slug='drama')
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание')
+        cls.title.genre.add(cls.genre)
+        cls.author = User.objects.create(username='author',
+                                         email='author@yamdb.ru')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = f'/api/v1/titles/{self.title.pk}/'
+
+    def test_second_read_is_served_from_cache(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_review_invalidates_title(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(text='Отзыв', author=self.author, score=8,
+                                  title=self.title)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['rating'], 8)
+
+    def test_genre_invalidates_titles_and_genres(self):
+        self.client.get(self.url)
+        self.client.get('/api/v1/genres/')
+        self.genre.name = 'Комедия'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.genre.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['genre'][0]['name'], 'Комедия')
+        self.assertEqual(self.client.get('/api/v1/genres/')['X-Cache'],
+                         'MISS')
+
+    def test_invalidated_after_commit(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Review.objects.create(text='Отзыв', author=self.author, score=8,
+                                  title=self.title)
+            # До фиксации поколение прежнее: чтение не закэширует
+            # незафиксированные данные под новым поколением.
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+    def test_query_string_order_does_not_matter(self):
+        self.client.get('/api/v1/titles/?year=2000&name=Про')
+        response = self.client.get('/api/v1/titles/?name=Про&year=2000')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_stats_command_needs_shared_cache(self):
+        local = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        with override_settings(CACHES={**settings.CACHES, 'default': local}):
+            with self.assertRaisesMessage(CommandError, 'CACHE_BACKEND'):
+                call_command('cache_stats')
+
+    def test_stats_command(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        shared = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory,
+        }
+        with override_settings(CACHES={**settings.CACHES,
+                                       'default': shared}):
+            self.client.get(self.url)
+            self.client.get(self.url)
+            stdout = io.StringIO()
+            call_command('cache_stats', stdout=stdout)
+        self.assertIn('попаданий: 1, промахов: 1', stdout.getvalue())
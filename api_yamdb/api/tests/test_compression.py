@@ -0,0 +1,132 @@
+import gzip
+import os
+import re
+import shutil
+import tempfile
+
+from api.compression import ENCODINGS, choose_encoding
+from api.metrics import registry
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Category, Title
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class ChooseEncodingTest(SimpleTestCase):
+    """Выбор кодировки по Accept-Encoding."""
+
+    def test_choose(self):
+        best = ENCODINGS[0]
+        for header, encoding in (
+            ('', None),
+            ('identity', None),
+            ('gzip', 'gzip'),
+            ('GZip;q=0.5, deflate', 'gzip'),
+            ('gzip, br', best),
+            ('gzip;q=1.0, br;q=0.5', 'gzip'),
+            ('*', best),
+            ('*, br;q=0', 'gzip'),
+            ('gzip;q=0', None),
+            ('gzip;q=bad', None),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(choose_encoding(header), encoding)
+
+
+@override_settings(API_COMPRESS_MIN_SIZE=200)
+class CompressionMiddlewareTest(TestCase):
+    """Сжатие JSON-ответов API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {index}', year=2000,
+                  description='Описание', category=category)
+            for index in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.plain = APIClient().get('/api/v1/titles/')
+
+    def test_gzip(self):
+        key = ('yamdb_compression_saved_bytes_total',
+               (('encoding', 'gzip'),))
+        saved = registry.counters[key]
+        response = APIClient().get('/api/v1/titles/',
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(int(response['Content-Length']),
+                         len(response.content))
+        self.assertEqual(gzip.decompress(response.content),
+                         self.plain.content)
+        self.assertEqual(registry.counters[key] - saved,
+                         len(self.plain.content) - len(response.content))
+
+    def test_brotli(self):
+        if brotli is None:
+            self.skipTest('brotli не установлен')
+        response = APIClient().get('/api/v1/titles/',
+                                   HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content),
+                         self.plain.content)
+
+    def test_not_compressed(self):
+        self.assertFalse(self.plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', self.plain['Vary'])
+        for path in ('/api/v1/categories/', '/redoc/'):
+            with self.subTest(path=path):
+                response = APIClient().get(path, HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class CompressedStaticFilesTest(SimpleTestCase):
+    """collectstatic: имена с хешем и сжатые копии."""
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.addCleanup(shutil.rmtree, self.root)
+        with open(os.path.join(self.source, 'spec.yaml'), 'w') as file:
+            file.write('openapi: 3.0.2\n' + 'paths: {}\n' * 200)
+        with open(os.path.join(self.source, 'logo.png'), 'wb') as file:
+            file.write(b'\x89PNG' + bytes(range(256)))
+
+    def test_collectstatic(self):
+        with override_settings(
+            STATIC_ROOT=self.root,
+            STATICFILES_DIRS=[self.source],
+            STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'
+            ],
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        names = set(os.listdir(self.root))
+        hashed = [name for name in names
+                  if re.fullmatch(r'spec\.[0-9a-f]{12}\.yaml', name)]
+        self.assertEqual(len(hashed), 1)
+        with open(os.path.join(self.root, hashed[0]), 'rb') as file:
+            content = file.read()
+        with open(os.path.join(self.root, f'{hashed[0]}.gz'), 'rb') as file:
+            self.assertEqual(gzip.decompress(file.read()), content)
+        if brotli is not None:
+            with open(os.path.join(self.root, f'{hashed[0]}.br'),
+                      'rb') as file:
+                self.assertEqual(brotli.decompress(file.read()), content)
+        # Картинки не сжимаются, а исходные имена остаются для ссылок
+        # без хеша.
+        self.assertFalse(any(name.startswith('logo')
+                             and name.endswith(('.gz', '.br'))
+                             for name in names))
+        self.assertIn('spec.yaml', names)
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+
+class ExportTest(TestCase):
+    """Потоковая выгрузка каталога и отзывов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genres = [Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+                  for i in range(2)]
+        cls.user = User.objects.create(username='user',
+                                       email='user@yamdb.ru')
+        cls.titles = []
+        for i in range(5):
+            title = Title.objects.create(name=f'Произведение {i}', year=2000,
+                                         description='Описание',
+                                         category=category)
+            title.genre.set(genres)
+            cls.titles.append(title)
+        Review.objects.create(title=cls.titles[0], author=cls.user,
+                              text='Отзыв', score=8)
+        Review.objects.create(title=cls.titles[1], author=cls.user,
+                              text='Отзыв', score=4)
+
+    def setUp(self):
+        caches[settings.THROTTLE_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path, params=None):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def ndjson(self, path, params=None):
+        return [json.loads(line)
+                for line in self.get(path, params).splitlines()]
+
+    def test_titles_ndjson(self):
+        rows = self.ndjson('/api/v1/export/titles.ndjson')
+        self.assertEqual(len(rows), 5)
+        row = next(row for row in rows if row['id'] == self.titles[0].pk)
+        self.assertEqual(row['category'], 'movie')
+        self.assertEqual(row['genre'], ['genre-0', 'genre-1'])
+        self.assertEqual((row['rating'], row['rating_count']), (8.0, 1))
+
+    def test_titles_csv(self):
+        rows = list(csv.DictReader(io.StringIO(
+            self.get('/api/v1/export/titles.csv')
+        )))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['genre'], 'genre-0,genre-1')
+        # Формат задаёт путь, Accept не приводит к 406.
+        response = self.client.get('/api/v1/export/titles.csv',
+                                   HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+
+    def test_anonymous(self):
+        for path in ('/api/v1/export/titles.ndjson',
+                     '/api/v1/export/reviews.csv'):
+            with self.subTest(path=path):
+                self.assertEqual(APIClient().get(path).status_code, 401)
+
+    def test_queries_per_chunk(self):
+        with mock.patch('api.export.CHUNK_SIZE', 2):
+            with self.assertNumQueries(4):
+                rows = self.ndjson('/api/v1/export/titles.ndjson')
+        self.assertEqual(len(rows), 5)
+
+    def test_since(self):
+        since = timezone.now()
+        Title.objects.filter(pk=self.titles[2].pk).update(
+            updated=since + timedelta(seconds=1)
+        )
+        rows = self.ndjson('/api/v1/export/titles.ndjson',
+                           {'since': since.isoformat()})
+        self.assertEqual([row['id'] for row in rows], [self.titles[2].pk])
+        response = self.client.get('/api/v1/export/titles.ndjson',
+                                   {'since': 'вчера'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_reviews_of_title(self):
+        rows = self.ndjson('/api/v1/export/reviews.ndjson',
+                           {'title': self.titles[1].pk})
+        self.assertEqual([(row['title'], row['author'], row['score'])
+                          for row in rows],
+                         [(self.titles[1].pk, 'user', 4)])
+        rows = list(csv.DictReader(io.StringIO(
+            self.get('/api/v1/export/reviews.csv')
+        )))
+        self.assertEqual(len(rows), 2)
@@ -0,0 +1,104 @@
+import csv
+import io
+import os
+import re
+import unittest
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from reviews.management.commands.import_csv import TABLES
+from reviews.models import Comments, Review, Title
+from users.models import User
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static/data')
+
+
+def csv_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), newline='',
+              encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+class ImportCsvTest(TestCase):
+    """Загрузка static/data командой import_csv."""
+
+    def run_import(self, *args):
+        stdout = io.StringIO()
+        call_command('import_csv', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def table_report(self, output, filename):
+        match = re.search(
+            rf'{re.escape(filename)}: загружено (\d+) строк, '
+            r'уже в БД (\d+), отклонено ограничениями (\d+), '
+            r'пропущено без связанных строк (\d+)', output
+        )
+        self.assertIsNotNone(match, output)
+        return tuple(int(number) for number in match.groups())
+
+    def test_load(self):
+        output = self.run_import()
+        for table in TABLES:
+            with self.subTest(table=table.filename):
+                count = len(csv_rows(table.filename))
+                self.assertEqual(table.model.objects.count(), count)
+                self.assertEqual(self.table_report(output, table.filename),
+                                 (count, 0, 0, 0))
+        title = Title.objects.get(pk=1)
+        scores = Review.objects.filter(title=title).values_list('score',
+                                                                flat=True)
+        self.assertEqual(title.rating_count, len(scores))
+        self.assertEqual(title.rating_sum, sum(scores))
+
+    def test_rerun_inserts_nothing(self):
+        self.run_import()
+        counts = {table.model: table.model.objects.count()
+                  for table in TABLES}
+        output = self.run_import()
+        for table in TABLES:
+            with self.subTest(table=table.filename):
+                self.assertEqual(table.model.objects.count(),
+                                 counts[table.model])
+                self.assertEqual(self.table_report(output, table.filename),
+                                 (0, counts[table.model], 0, 0))
+        self.assertIn('вставлено 0 строк', output)
+
+    def test_conflict_skips_dependents(self):
+        # Имя первого пользователя из CSV уже занято другим id: его строка
+        # отвергается, а его отзывы и комментарии пропускаются, а не
+        # считаются загруженными.
+        row = csv_rows('users.csv')[0]
+        User.objects.create(id=1, username=row['username'],
+                            email='other@yamdb.ru')
+        author = row['id']
+        reviews = [review for review in csv_rows('review.csv')
+                   if review['author'] == author]
+        review_ids = {review['id'] for review in reviews}
+        comments = [comment for comment in csv_rows('comments.csv')
+                    if comment['author'] == author
+                    or comment['review_id'] in review_ids]
+        output = self.run_import()
+        self.assertEqual(self.table_report(output, 'users.csv'),
+                         (len(csv_rows('users.csv')) - 1, 0, 1, 0))
+        self.assertFalse(User.objects.filter(pk=author).exists())
+        self.assertEqual(
+            self.table_report(output, 'review.csv')[3], len(reviews)
+        )
+        self.assertEqual(Review.objects.count(),
+                         len(csv_rows('review.csv')) - len(reviews))
+        self.assertEqual(Comments.objects.count(),
+                         len(csv_rows('comments.csv')) - len(comments))
+
+    @unittest.skipUnless(connection.vendor == 'postgresql',
+                         'COPY есть только в PostgreSQL')
+    def test_copy(self):
+        self.run_import('--copy')
+        for table in TABLES:
+            with self.subTest(table=table.filename):
+                self.assertEqual(table.model.objects.count(),
+                                 len(csv_rows(table.filename)))
+        # Повторный запуск не пишет существующие строки и не падает.
+        output = self.run_import('--copy')
+        self.assertIn('вставлено 0 строк', output)
@@ -0,0 +1,159 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+from users.models import User, UserRole
+
+URL = '/api/v1/leaderboards/'
+
+
+@override_settings(LEADERBOARD_MIN_REVIEWS=2, LEADERBOARD_PRIOR_MEAN=5.0,
+                   LEADERBOARD_PRIOR_WEIGHT=2)
+class LeaderboardTest(TestCase):
+    """Рейтинги лучших произведений из предрассчитанной таблицы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Category.objects.create(name='Фильм', slug='movie')
+        cls.book = Category.objects.create(name='Книга', slug='book')
+        cls.drama = Genre.objects.create(name='Драма', slug='drama')
+        cls.comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        cls.users = [User.objects.create(username=f'user{i}',
+                                         email=f'user{i}@yamdb.ru')
+                     for i in range(3)]
+        cls.admin = User.objects.create(username='admin',
+                                        email='admin@yamdb.ru',
+                                        role=UserRole.ADMIN)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        # Байесовское среднее (2 * 5 + сумма) / (2 + число оценок).
+        self.best = self.title('Лучшее', (10, 10, 10), self.movie,
+                               [self.drama])
+        self.good = self.title('Хорошее', (9, 9), self.book,
+                               [self.drama, self.comedy])
+        self.single = self.title('Одна оценка', (10,), self.movie,
+                                 [self.comedy])
+
+    def title(self, name, scores, category, genres):
+        title = Title.objects.create(name=name, year=2000,
+                                     description='Описание',
+                                     category=category)
+        title.genre.set(genres)
+        for user, score in zip(self.users, scores):
+            Review.objects.create(title=title, author=user, text='Отзыв',
+                                  score=score)
+        return title
+
+    def board(self, path='', params=None):
+        cache.clear()
+        response = self.client.get(URL + path, params)
+        self.assertEqual(response.status_code, 200)
+        return [(row['rank'], row['title']['name'], row['score'])
+                for row in response.data]
+
+    def test_global(self):
+        self.assertEqual(self.board(), [(1, 'Лучшее', 8.0),
+                                        (2, 'Хорошее', 7.0)])
+
+    def test_genre_and_category(self):
+        self.assertEqual([name for _, name, _ in self.board('genres/drama/')],
+                         ['Лучшее', 'Хорошее'])
+        self.assertEqual(self.board('genres/comedy/'), [(1, 'Хорошее', 7.0)])
+        self.assertEqual(self.board('categories/book/'),
+                         [(1, 'Хорошее', 7.0)])
+        response = self.client.get(URL + 'genres/missing/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_reviews_refresh_scores(self):
+        Review.objects.create(title=self.single, author=self.users[1],
+                              text='Отзыв', score=10)
+        self.assertEqual(self.board('genres/comedy/')[0],
+                         (1, 'Одна оценка', 7.5))
+        review = self.best.title.order_by('pk').first()
+        review.score = 1
+        review.save()
+        self.assertEqual(self.board()[-1], (3, 'Лучшее', 6.2))
+        Review.objects.filter(title=self.good).first().delete()
+        self.assertNotIn('Хорошее', [name for _, name, _ in self.board()])
+
+    def test_title_delete_skips_aggregates(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.best.delete()
+        # Рейтинг, гистограмма и места удаляются вместе с произведением.
+        self.assertFalse([query for query in queries.captured_queries
+                          if query['sql'].startswith('UPDATE')])
+        self.assertEqual(self.board(), [(1, 'Хорошее', 7.0)])
+
+    def test_user_delete_batches_aggregates(self):
+        # user1 оценил «Лучшее» и «Хорошее»: одно остаётся в рейтинге,
+        # другое опускается ниже порога. Рейтинги и гистограммы обоих
+        # сдвигаются одним UPDATE на таблицу.
+        with CaptureQueriesContext(connection) as queries:
+            self.users[1].delete()
+        updates = [query['sql'].split()[1]
+                   for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE')]
+        self.assertEqual(sorted(updates), ['"reviews_scorehistogram"',
+                                           '"reviews_title"'])
+        self.good.refresh_from_db()
+        self.assertEqual((self.good.rating_sum, self.good.rating_count),
+                         (9, 1))
+        self.assertEqual(self.good.score_histogram.score_9, 1)
+        expected = self.board()
+        self.assertEqual(expected, [(1, 'Лучшее', 7.5)])
+        call_command('rebuild_leaderboards', stdout=io.StringIO())
+        self.assertEqual(self.board(), expected)
+        self.assertEqual(self.board('genres/comedy/'), [])
+
+    def test_title_changes(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.patch(
+            f'/api/v1/titles/{self.good.pk}/',
+            {'category': 'movie', 'genre': ['comedy']}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.board('categories/movie/')), 2)
+        self.assertEqual(self.board('categories/book/'), [])
+        self.assertEqual(len(self.board('genres/drama/')), 1)
+        response = self.client.patch('/api/v1/titles/bulk/', [
+            {'id': self.good.pk, 'genre': ['drama']},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.board('genres/drama/')), 2)
+        self.assertEqual(self.board('genres/comedy/'), [])
+        self.drama.delete()
+        self.assertFalse(TitleRanking.objects.filter(genre_id__isnull=False,
+                                                     category=None).exists())
+
+    def test_limit(self):
+        self.assertEqual(len(self.board(params={'limit': 1})), 1)
+        for limit in (0, 101, 'все'):
+            response = self.client.get(URL, {'limit': limit})
+            self.assertEqual(response.status_code, 400)
+
+    def test_top_is_one_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(URL)
+        cache.clear()
+        with self.assertNumQueries(2):
+            self.client.get(URL + 'genres/drama/')
+
+    def test_rebuild(self):
+        expected = self.board('genres/drama/')
+        TitleRanking.objects.update(score=0)
+        TitleRanking.objects.filter(genre=self.comedy).delete()
+        call_command('rebuild_leaderboards', stdout=io.StringIO())
+        self.assertEqual(self.board('genres/drama/'), expected)
+        self.assertEqual(len(self.board('genres/comedy/')), 1)
+
+    @override_settings(LEADERBOARD_MIN_REVIEWS=1)
+    def test_threshold(self):
+        call_command('rebuild_leaderboards', stdout=io.StringIO())
+        self.assertEqual(self.board()[2], (3, 'Одна оценка', 20 / 3))
@@ -0,0 +1,119 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from api.metrics import ARCHIVE, Registry, registry, render_metrics
+from api.readers import TitleReader
+from api.serializers import CategoriesSerializer
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Category, Title
+
+
+class MetricsEndpointTest(TestCase):
+    """Метрики запросов в формате Prometheus."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_route_metrics(self):
+        Title.objects.create(name='Произведение', year=2000,
+                             description='Описание')
+        self.client.get('/api/v1/titles/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('yamdb_http_requests_total{route="TitleViewSet.list",'
+                      'method="GET",status="200"}', text)
+        self.assertIn('yamdb_db_queries_total{route="TitleViewSet.list"}',
+                      text)
+        self.assertIn('yamdb_http_request_duration_seconds_bucket{route='
+                      '"TitleViewSet.list",le="+Inf"}', text)
+        self.assertIn('yamdb_serialization_duration_seconds_count{route='
+                      '"TitleViewSet.list"}', text)
+
+    def serialization_time(self, route):
+        key = ('yamdb_serialization_duration_seconds', (('route', route),))
+        return registry.histograms.get(key, [0.0, 0])[-2]
+
+    def test_serialization_includes_representation(self):
+        Title.objects.create(name='Произведение', year=2000,
+                             description='Описание')
+        Category.objects.create(name='Фильм', slug='movie')
+
+        def slow(represent):
+            def wrapper(*args, **kwargs):
+                time.sleep(0.02)
+                return represent(*args, **kwargs)
+            return wrapper
+
+        for path, route, target, name in (
+            ('/api/v1/titles/', 'TitleViewSet.list', TitleReader,
+             'represent'),
+            ('/api/v1/categories/', 'CategoryViewSet.list',
+             CategoriesSerializer, 'to_representation'),
+        ):
+            with self.subTest(route=route):
+                before = self.serialization_time(route)
+                with mock.patch.object(target, name,
+                                       slow(getattr(target, name))):
+                    self.client.get(path)
+                self.assertGreaterEqual(
+                    self.serialization_time(route) - before, 0.02
+                )
+
+    def test_function_view_route(self):
+        self.client.post('/api/v1/auth/token/', {})
+        text = self.client.get('/metrics').content.decode()
+        self.assertIn('route="get_token_for_user",method="POST",'
+                      'status="400"', text)
+
+
+class MultiprocessMetricsTest(TestCase):
+    """Суммирование метрик воркеров через METRICS_DIR."""
+
+    def test_workers_are_summed(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(METRICS_DIR=directory):
+            first, second = Registry(), Registry()
+            second.filename = 'second.json'
+            labels = (('route', 'TitleViewSet.list'),)
+            for worker in (first, second):
+                worker.inc('yamdb_db_queries_total', labels, 3)
+                worker.observe('yamdb_http_request_duration_seconds',
+                               labels, 0.02)
+            second.maybe_flush(force=True)
+            text = render_metrics(first.collect())
+        self.assertIn(
+            'yamdb_db_queries_total{route="TitleViewSet.list"} 6', text
+        )
+        self.assertIn('yamdb_http_request_duration_seconds_count'
+                      '{route="TitleViewSet.list"} 2', text)
+
+    def test_dead_workers_are_archived(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        labels = (('route', 'TitleViewSet.list'),)
+        with override_settings(METRICS_DIR=directory):
+            live, dead = Registry(), Registry()
+            dead.filename = f'{process.pid}-1.json'
+            for worker in (live, dead):
+                worker.inc('yamdb_db_queries_total', labels, 3)
+            dead.maybe_flush(force=True)
+            for _ in range(2):
+                text = render_metrics(live.collect())
+                self.assertIn(
+                    'yamdb_db_queries_total{route="TitleViewSet.list"} 6',
+                    text
+                )
+        files = set(os.listdir(directory)) - {'archive.lock'}
+        self.assertEqual(files, {ARCHIVE, live.filename})
@@ -0,0 +1,125 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Review, Title
+from users.models import User
+
+
+class ReviewCursorPaginationTest(TestCase):
+    """Курсорная пагинация отзывов по ?pagination=cursor."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание')
+        for i in range(7):
+            author = User.objects.create(username=f'user{i}',
+                                         email=f'user{i}@yamdb.ru')
+            Review.objects.create(text='Отзыв', author=author, score=5,
+                                  title=cls.title)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_cursor_pages_cover_all_reviews(self):
+        url = f'/api/v1/titles/{self.title.pk}/reviews/?pagination=cursor'
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any(
+                'COUNT(' in query['sql'] for query in context.captured_queries
+            ))
+            seen.extend(review['id'] for review in response.data['results'])
+            url = response.data['next']
+        expected = list(Review.objects.order_by('-pub_date', 'id')
+                        .values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_page_number_is_default(self):
+        response = self.client.get(f'/api/v1/titles/{self.title.pk}/reviews/')
+        self.assertEqual(response.data['count'], 7)
+        self.assertFalse(response.data['count_estimated'])
+
+
+class EstimatedCountPaginationTest(TestCase):
+    """Число объектов списков: точное, оценка и кэш."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        for index in range(7):
+            Title.objects.create(name=f'Произведение {index}', year=2000,
+                                 description='', category=category)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            url = response.data['next']
+        ids = [title['id'] for page in pages for title in page['results']]
+        self.assertEqual(sorted(ids),
+                         list(Title.objects.order_by('id')
+                              .values_list('id', flat=True)))
+        return pages
+
+    def test_exact_below_threshold(self):
+        for page in self.walk('/api/v1/titles/?category=movie'):
+            self.assertEqual((page['count'], page['count_estimated']),
+                             (7, False))
+
+    @override_settings(EXACT_COUNT_THRESHOLD=3)
+    def test_above_threshold(self):
+        first, last = self.walk('/api/v1/titles/')
+        if connection.vendor == 'postgresql':
+            self.assertTrue(first['count_estimated'])
+            self.assertGreater(first['count'], 3)
+        else:
+            self.assertEqual((first['count'], first['count_estimated']),
+                             (7, False))
+        # На последней странице число известно точно.
+        self.assertEqual((last['count'], last['count_estimated']), (7, False))
+
+    def test_estimate_too_low(self):
+        with mock.patch('api.pagination.estimate_count',
+                        return_value=(4, True)):
+            first, last = self.walk('/api/v1/titles/?ordering=name')
+        self.assertEqual((first['count'], first['count_estimated']),
+                         (6, True))
+        self.assertEqual((last['count'], last['count_estimated']), (7, False))
+
+    def test_estimate_too_high(self):
+        with mock.patch('api.pagination.estimate_count',
+                        return_value=(100, True)):
+            first, last = self.walk('/api/v1/titles/?ordering=year')
+            self.assertEqual(self.client.get('/api/v1/titles/?page=3')
+                             .status_code, 404)
+        self.assertEqual((first['count'], first['count_estimated']),
+                         (100, True))
+        self.assertIsNone(last['next'])
+        self.assertEqual(last['count'], 7)
+
+    def test_count_cached_per_generation(self):
+        self.client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/v1/titles/?ordering=name')
+        self.assertEqual(response.data['count'], 7)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ))
+        with self.captureOnCommitCallbacks(execute=True):
+            Title.objects.create(name='Новое', year=2001, description='')
+        response = self.client.get('/api/v1/titles/?ordering=year')
+        self.assertEqual(response.data['count'], 8)
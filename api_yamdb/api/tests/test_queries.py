@@ -0,0 +1,156 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Category, Comments, Genre, Review, Title
+from users.models import User, UserRole
+
+
+class TitleQueriesTest(TestCase):
+    """Число запросов на чтение и запись произведений не зависит от объёма."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Фильм', slug='movie')
+        cls.genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(5)
+        ]
+        cls.admin = User.objects.create(
+            username='admin', email='admin@yamdb.ru', role=UserRole.ADMIN
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(self.admin)
+
+    def create_titles(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                title = Title.objects.create(
+                    name=f'Произведение {i}', year=2000,
+                    description='', category=self.category
+                )
+                title.genre.set(self.genres)
+
+    def test_list_queries(self):
+        self.create_titles(1)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/titles/')
+        self.assertEqual(response.status_code, 200)
+        self.create_titles(4)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/titles/')
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_retrieve_queries(self):
+        self.create_titles(1)
+        title = Title.objects.get()
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/v1/titles/{title.pk}/')
+        self.assertEqual(len(response.data['genre']), 5)
+
+    def test_create_queries_do_not_depend_on_genres(self):
+        queries = []
+        for genres in (self.genres[:1], self.genres):
+            data = {
+                'name': 'Новое', 'year': 2000, 'description': 'Описание',
+                'category': 'movie', 'genre': [genre.slug for genre in genres],
+            }
+            # Последний запрос — проверка мест в рейтингах после set().
+            with self.assertNumQueries(8) as context:
+                response = self.admin_client.post(
+                    '/api/v1/titles/', data, format='json'
+                )
+            self.assertEqual(response.status_code, 201)
+            self.assertCountEqual(response.data['genre'], data['genre'])
+            queries.append(len(context.captured_queries))
+        self.assertEqual(queries[0], queries[1])
+
+    def test_partial_update_queries(self):
+        self.create_titles(1)
+        title = Title.objects.get()
+        data = {'genre': [genre.slug for genre in self.genres[:2]]}
+        # Включая проверку мест в рейтингах после сохранения и set().
+        with self.assertNumQueries(9):
+            response = self.admin_client.patch(
+                f'/api/v1/titles/{title.pk}/', data, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertCountEqual(response.data['genre'], data['genre'])
+
+    def test_unknown_genre(self):
+        data = {'name': 'Новое', 'year': 2000, 'category': 'movie',
+                'genre': ['genre-0', 'missing']}
+        response = self.admin_client.post('/api/v1/titles/', data,
+                                          format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('genre', response.data)
+
+
+class NestedQueriesTest(TestCase):
+    """Отзывы и комментарии: родители загружаются один раз за запрос."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание')
+        cls.other_title = Title.objects.create(name='Другое', year=2000,
+                                               description='Описание')
+        cls.users = [
+            User.objects.create(username=f'user{i}',
+                                email=f'user{i}@yamdb.ru')
+            for i in range(5)
+        ]
+        cls.review = Review.objects.create(title=cls.title,
+                                           author=cls.users[0],
+                                           text='Отзыв', score=5)
+        cls.reviews_url = f'/api/v1/titles/{cls.title.pk}/reviews/'
+        cls.comments_url = f'{cls.reviews_url}{cls.review.pk}/comments/'
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_list_queries_do_not_depend_on_authors(self):
+        for user in self.users[1:]:
+            Review.objects.create(title=self.title, author=user,
+                                  text='Отзыв', score=7)
+            Comments.objects.create(review=self.review, author=user,
+                                    text='Комментарий')
+        for url in (self.reviews_url, self.comments_url):
+            with self.subTest(url=url), self.assertNumQueries(3):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_create_review_without_lookups(self):
+        # Сдвиг рейтинга, гистограммы и мест в рейтингах, вставка внутри
+        # точки сохранения.
+        self.client.force_authenticate(self.users[1])
+        with self.assertNumQueries(6):
+            response = self.client.post(self.reviews_url,
+                                        {'text': 'Отзыв', 'score': 8})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['author'], 'user1')
+
+    def test_create_comment_fetches_review_once(self):
+        self.client.force_authenticate(self.users[1])
+        with self.assertNumQueries(2):
+            response = self.client.post(self.comments_url,
+                                        {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_review_of_another_title(self):
+        url = (f'/api/v1/titles/{self.other_title.pk}/reviews/'
+               f'{self.review.pk}/')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_authenticate(self.users[0])
+        response = self.client.post(f'{url}comments/',
+                                    {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(f'{url}comments/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_title(self):
+        response = self.client.get('/api/v1/titles/0/reviews/')
+        self.assertEqual(response.status_code, 404)
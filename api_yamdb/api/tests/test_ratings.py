@@ -0,0 +1,108 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Review, Title
+from users.models import User
+
+
+class StoredRatingTest(TestCase):
+    """Хранимые rating_sum, rating_count и rating произведения."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create(username=f'user{i}',
+                                         email=f'user{i}@yamdb.ru')
+                     for i in range(3)]
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание')
+        cls.other = Title.objects.create(name='Другое', year=2001,
+                                         description='Описание')
+
+    def assert_rating(self, title, rating_sum, rating_count, rating):
+        title.refresh_from_db()
+        self.assertEqual(
+            (title.rating_sum, title.rating_count, title.rating),
+            (rating_sum, rating_count, rating)
+        )
+
+    def review(self, user, score, title=None):
+        return Review.objects.create(title=title or self.title, author=user,
+                                     text='Отзыв', score=score)
+
+    def test_create(self):
+        self.assert_rating(self.title, 0, 0, None)
+        self.review(self.users[0], 8)
+        self.assert_rating(self.title, 8, 1, 8.0)
+        self.review(self.users[1], 5)
+        self.assert_rating(self.title, 13, 2, 6.5)
+        self.assert_rating(self.other, 0, 0, None)
+
+    def test_score_edit(self):
+        review = self.review(self.users[0], 8)
+        self.review(self.users[1], 4)
+        review.score = 10
+        review.save()
+        self.assert_rating(self.title, 14, 2, 7.0)
+        # Сохранение без изменения оценки рейтинг не сдвигает.
+        review.text = 'Исправленный отзыв'
+        review.save()
+        self.assert_rating(self.title, 14, 2, 7.0)
+
+    def test_move_to_other_title(self):
+        review = self.review(self.users[0], 8)
+        self.review(self.users[1], 4)
+        review.title = self.other
+        review.save()
+        self.assert_rating(self.title, 4, 1, 4.0)
+        self.assert_rating(self.other, 8, 1, 8.0)
+
+    def test_delete(self):
+        review = self.review(self.users[0], 8)
+        self.review(self.users[1], 3)
+        review.delete()
+        self.assert_rating(self.title, 3, 1, 3.0)
+        Review.objects.filter(title=self.title).delete()
+        self.assert_rating(self.title, 0, 0, None)
+
+    def test_delete_authors(self):
+        self.review(self.users[0], 8)
+        self.review(self.users[1], 3)
+        self.review(self.users[2], 6)
+        self.review(self.users[0], 2, title=self.other)
+        User.objects.filter(pk__in=[self.users[0].pk,
+                                    self.users[1].pk]).delete()
+        self.assert_rating(self.title, 6, 1, 6.0)
+        self.assert_rating(self.other, 0, 0, None)
+        self.assertEqual(self.title.score_histogram.score_8, 0)
+        self.assertEqual(self.title.score_histogram.score_6, 1)
+
+    def test_through_api(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        url = f'/api/v1/titles/{self.title.pk}/reviews/'
+        review_id = client.post(url, {'text': 'Отзыв', 'score': 9}).data['id']
+        self.assert_rating(self.title, 9, 1, 9.0)
+        client.patch(f'{url}{review_id}/', {'score': 2})
+        self.assert_rating(self.title, 2, 1, 2.0)
+        client.delete(f'{url}{review_id}/')
+        self.assert_rating(self.title, 0, 0, None)
+
+    def test_recalculate_repairs_drift(self):
+        self.review(self.users[0], 8)
+        self.review(self.users[1], 5)
+        self.review(self.users[2], 2, title=self.other)
+        # Расхождение, например, после правки отзывов в обход save().
+        Title.objects.update(rating_sum=100, rating_count=7, rating=1.5)
+        call_command('recalculate_ratings', self.title.pk,
+                     stdout=io.StringIO())
+        self.assert_rating(self.title, 13, 2, 6.5)
+        self.assert_rating(self.other, 100, 7, 1.5)
+        call_command('recalculate_ratings', stdout=io.StringIO())
+        self.assert_rating(self.other, 2, 1, 2.0)
+
+    def test_recalculate_without_reviews(self):
+        Title.objects.update(rating_sum=5, rating_count=1, rating=5.0)
+        call_command('recalculate_ratings', stdout=io.StringIO())
+        self.assert_rating(self.title, 0, 0, None)
@@ -0,0 +1,119 @@
+import datetime
+from unittest import mock
+
+from api.pagination import PubDateCursorPagination
+from api.views import CommentViewSet, ReviewsViewSet, TitleViewSet
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.models import Category, Comments, Genre, Review, Title
+from users.models import User
+
+
+class ReaderContractTest(TestCase):
+    """Быстрый путь чтения отдаёт те же байты, что сериализаторы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create(username=f'user{i}',
+                                     email=f'user{i}@yamdb.ru')
+                 for i in range(3)]
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genres = [Genre.objects.create(name=name, slug=slug) for name, slug
+                  in (('Драма', 'drama'), ('Комедия', 'comedy'),
+                      ('Арт-хаус', 'art'))]
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание «длинное»',
+                                         category=category)
+        cls.title.genre.set(genres)
+        cls.bare = Title.objects.create(name='Без категории', year=1999,
+                                        description='')
+        for index in range(7):
+            title = Title.objects.create(name=f'Произведение {index}',
+                                         year=2001 + index,
+                                         description='Описание',
+                                         category=category)
+            title.genre.set(genres[index % 3:])
+        reviews = [
+            Review.objects.create(title=cls.title, author=user,
+                                  text=f'Отзыв {user}', score=score)
+            for user, score in zip(users, (10, 7, 4))
+        ]
+        Title.objects.filter(pk=cls.bare.pk).update(rating=7.6)
+        # Микросекунды и нулевые микросекунды форматируются по-разному.
+        Review.objects.filter(pk=reviews[0].pk).update(
+            pub_date=datetime.datetime(2020, 1, 2, 3, 4, 5,
+                                       tzinfo=timezone.utc)
+        )
+        cls.review = reviews[1]
+        cls.comments = [
+            Comments.objects.create(review=cls.review, author=user,
+                                    text=f'Комментарий {user}')
+            for user in users
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, path):
+        cache.clear()
+        return self.client.get(path)
+
+    def assert_same(self, viewset, *paths):
+        for path in paths:
+            with self.subTest(path=path):
+                fast = self.get(path)
+                with mock.patch.object(viewset, 'reader_class', None):
+                    expected = self.get(path)
+                self.assertEqual(fast.status_code, expected.status_code)
+                self.assertEqual(fast.content, expected.content)
+
+    def test_titles(self):
+        self.assert_same(
+            TitleViewSet,
+            '/api/v1/titles/',
+            '/api/v1/titles/?page=2',
+            '/api/v1/titles/?genre=comedy&ordering=name',
+            '/api/v1/titles/?category=movie&year=2003',
+            f'/api/v1/titles/{self.title.pk}/',
+            f'/api/v1/titles/{self.bare.pk}/',
+            '/api/v1/titles/0/',
+            '/api/v1/titles/?fields=id,name,rating',
+            '/api/v1/titles/?fields=rating,genre&exclude=genre',
+            '/api/v1/titles/?exclude=description,genre&ordering=name',
+            f'/api/v1/titles/{self.title.pk}/?fields=category,genre',
+            f'/api/v1/titles/{self.bare.pk}/?fields=category',
+            '/api/v1/titles/?fields=votes',
+        )
+
+    def test_reviews(self):
+        path = f'/api/v1/titles/{self.title.pk}/reviews/'
+        self.assert_same(
+            ReviewsViewSet,
+            path,
+            f'{path}?pagination=cursor',
+            f'{path}{self.review.pk}/',
+            f'/api/v1/titles/{self.bare.pk}/reviews/{self.review.pk}/',
+            f'{path}?fields=id,score,author',
+            f'{path}?exclude=author&pagination=cursor',
+            f'{path}{self.review.pk}/?fields=pub_date',
+        )
+
+    def test_comments(self):
+        path = (f'/api/v1/titles/{self.title.pk}/reviews/{self.review.pk}/'
+                'comments/')
+        self.assert_same(
+            CommentViewSet,
+            path,
+            f'{path}?pagination=cursor',
+            f'{path}{self.comments[0].pk}/',
+            f'{path}?fields=text&exclude=text',
+        )
+
+    def test_cursor_pages(self):
+        path = f'/api/v1/titles/{self.title.pk}/reviews/?pagination=cursor'
+        with mock.patch.object(PubDateCursorPagination, 'page_size', 2):
+            following = self.get(path).json()['next']
+            self.assertIsNotNone(following)
+            self.assert_same(ReviewsViewSet, following)
@@ -0,0 +1,125 @@
+import datetime
+import decimal
+import io
+import uuid
+from collections import OrderedDict
+from unittest import mock
+
+from api.renderers import FastJSONParser, FastJSONRenderer
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from reviews.models import Category, Comments, Genre, Review, Title
+from users.models import User
+
+PAYLOADS = (
+    {'id': 1, 'name': 'Произведение', 'rating': None, 'genre': [
+        OrderedDict(name='Драма', slug='drama')
+    ]},
+    [0.1, 7.25, -0.0, 1e15, 1e16, 1.5e300, 1e-4, 1e-5, 5e-324],
+    {'histogram': {1: 0, 10: 3}, 'ok': True, 'tuple': (1, 2)},
+    'управляющие \x01\x1f\b\f\n\r\t"\\/ и разделители \u2028 \u2029 😀',
+    {'error': [ErrorDetail('Обязательное поле.', code='required')],
+     'lazy': gettext_lazy('Not found.')},
+    {'date': datetime.datetime(2023, 1, 2, 3, 4, 5, 678901,
+                               tzinfo=datetime.timezone.utc),
+     'day': datetime.date(2023, 1, 2), 'time': datetime.time(3, 4),
+     'decimal': decimal.Decimal('1.10'),
+     'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678')},
+    {'big': 2 ** 70, 'negative': -2 ** 63 - 1},
+    'e-mail 0.00001',
+    [],
+)
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    """Ответы FastJSONRenderer совпадают с JSONRenderer байт в байт."""
+
+    def test_same_bytes(self):
+        for data in PAYLOADS:
+            with self.subTest(data=data):
+                self.assertEqual(FastJSONRenderer().render(data),
+                                 JSONRenderer().render(data))
+
+    def test_uses_orjson(self):
+        with mock.patch('rest_framework.renderers.json.dumps') as dumps:
+            FastJSONRenderer().render(PAYLOADS[0])
+        dumps.assert_not_called()
+
+    def test_indent(self):
+        data = PAYLOADS[0]
+        media_type = 'application/json; indent=4'
+        self.assertEqual(FastJSONRenderer().render(data, media_type),
+                         JSONRenderer().render(data, media_type))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_without_orjson(self):
+        with mock.patch('api.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(PAYLOADS[0]),
+                             JSONRenderer().render(PAYLOADS[0]))
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(b'[1]')),
+                             [1])
+
+
+class FastJSONParserTest(SimpleTestCase):
+    """Разбор тела запроса как у JSONParser."""
+
+    def parse(self, parser, content):
+        try:
+            return parser.parse(io.BytesIO(content))
+        except ParseError as error:
+            return str(error.detail)
+
+    def test_same_result(self):
+        for content in (
+            '{"name": "Драма", "slug": "drama", "score": 7.5}'.encode(),
+            b'[{"id": 1}, {"id": 2}]',
+            b'{"big": 123456789012345678901234567890}',
+            b'[18446744073709551615, -9223372036854775809, 1e400]',
+            b'"\\ud800"',
+            b'{"score": NaN}',
+            b'{"name": ',
+            b'\xff',
+        ):
+            with self.subTest(content=content):
+                self.assertEqual(self.parse(FastJSONParser(), content),
+                                 self.parse(JSONParser(), content))
+
+
+class RenderedResponsesTest(TestCase):
+    """Ответы API рендерятся быстрым рендерером без изменений."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='user', email='user@yamdb.ru')
+        category = Category.objects.create(name='Фильм', slug='movie')
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание',
+                                         category=category)
+        cls.title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        cls.review = Review.objects.create(title=cls.title, author=user,
+                                           text='Отзыв — «хороший»', score=8)
+        Comments.objects.create(review=cls.review, author=user,
+                                text='Комментарий')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_responses(self):
+        for path in (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{self.title.pk}/',
+            f'/api/v1/titles/{self.title.pk}/stats/',
+            f'/api/v1/titles/{self.title.pk}/reviews/',
+            f'/api/v1/titles/{self.title.pk}/reviews/{self.review.pk}/'
+            'comments/',
+        ):
+            with self.subTest(path=path):
+                response = APIClient().get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content,
+                                 JSONRenderer().render(response.data))
@@ -0,0 +1,199 @@
+import os
+import runpy
+import unittest
+from unittest import mock
+
+from api.authentication import RoleAccessToken
+from api.replicas import (Choice, ReplicaMiddleware, ReplicaRouter,
+                          current_replica, unavailable)
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Title
+from users.models import User
+
+REPLICAS = ['replica1', 'replica2']
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaRoutingTest(SimpleTestCase):
+    """Выбор базы для запроса без обращения к самим базам."""
+
+    def setUp(self):
+        cache.clear()
+        unavailable.clear()
+        self.factory = RequestFactory()
+        self.routes = []
+
+        self.status = 200
+
+        def view(request):
+            choice = current_replica.get()
+            self.routes.append(choice and choice.alias)
+            return HttpResponse(status=self.status)
+
+        self.middleware = ReplicaMiddleware(view)
+
+    def request(self, method, user=1, status=200, **headers):
+        """Запрос от пользователя с id user или, при None, анонима."""
+        if user is not None:
+            token = RoleAccessToken.for_user(
+                User(id=user, username=f'user{user}')
+            )
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        self.status = status
+        self.middleware(self.factory.generic(method, '/api/v1/titles/',
+                                             **headers))
+        return self.routes[-1]
+
+    def test_reads_are_balanced(self):
+        routes = {self.request('GET') for _ in range(50)}
+        self.assertEqual(routes, set(REPLICAS))
+        self.assertIsNone(current_replica.get())
+
+    def test_writer_sticks_to_primary(self):
+        self.assertIsNone(self.request('POST'))
+        self.assertIsNone(self.request('GET'))
+        self.assertIn(self.request('GET', user=2), REPLICAS)
+        with override_settings(REPLICA_STICKY_SECONDS=0):
+            self.request('PATCH')
+        self.assertIn(self.request('GET'), REPLICAS)
+
+    def test_failed_write_does_not_stick(self):
+        self.assertIsNone(self.request('POST', status=400))
+        self.assertIn(self.request('GET'), REPLICAS)
+        self.assertIsNone(self.request('DELETE', status=429))
+        self.assertIn(self.request('GET'), REPLICAS)
+        self.request('PATCH', status=302)
+        self.assertIsNone(self.request('GET'))
+
+    def test_writer_is_keyed_on_user(self):
+        # Новый токен того же пользователя видит его запись.
+        self.request('POST')
+        self.assertIsNone(self.request('GET'))
+        # Недействительный токен не выдаёт себя за пользователя.
+        self.assertIn(self.request('GET', user=None,
+                                   HTTP_AUTHORIZATION='Bearer 1'),
+                      REPLICAS)
+
+    def test_anonymous_writer_is_keyed_on_client_ip(self):
+        # За nginx REMOTE_ADDR у всех один, клиента выдаёт X-Forwarded-For.
+        self.request('POST', user=None, REMOTE_ADDR='172.18.0.5',
+                     HTTP_X_FORWARDED_FOR='203.0.113.1')
+        self.assertIn(self.request('GET', user=None,
+                                   REMOTE_ADDR='172.18.0.5',
+                                   HTTP_X_FORWARDED_FOR='203.0.113.2'),
+                      REPLICAS)
+        self.assertIsNone(self.request('GET', user=None,
+                                       REMOTE_ADDR='172.18.0.5',
+                                       HTTP_X_FORWARDED_FOR='203.0.113.1'))
+
+    def test_unavailable_replica(self):
+        broken = mock.Mock()
+        broken.ensure_connection.side_effect = OperationalError
+        token = current_replica.set(Choice('replica1'))
+        try:
+            with mock.patch('api.replicas.connections',
+                            {'replica1': broken}):
+                self.assertIsNone(ReplicaRouter().db_for_read(Title))
+        finally:
+            current_replica.reset(token)
+        routes = {self.request('GET') for _ in range(20)}
+        self.assertEqual(routes, {'replica2'})
+
+    def test_router_follows_middleware(self):
+        router = ReplicaRouter()
+
+        def view(request):
+            self.routes.append(router.db_for_read(Title))
+            return HttpResponse()
+
+        self.middleware = ReplicaMiddleware(view)
+        with mock.patch('api.replicas.check_replica', return_value=True):
+            self.assertIn(self.request('GET'), REPLICAS)
+            self.request('POST')
+            self.assertIsNone(self.request('GET'))
+            self.assertIn(self.request('GET', user=2), REPLICAS)
+        # Вне запроса чтения идут на default.
+        self.assertIsNone(router.db_for_read(Title))
+
+    def test_writes_go_to_primary(self):
+        token = current_replica.set(Choice('replica1'))
+        try:
+            self.assertEqual(ReplicaRouter().db_for_write(Title), 'default')
+        finally:
+            current_replica.reset(token)
+
+
+class ReplicaSettingsTest(SimpleTestCase):
+    """Реплики без общего кэша не запускаются."""
+
+    def load_settings(self, **env):
+        path = os.path.join(settings.BASE_DIR, 'api_yamdb', 'settings.py')
+        with mock.patch.dict(os.environ):
+            os.environ.pop('CACHE_BACKEND', None)
+            os.environ.update(env)
+            return runpy.run_path(path)
+
+    def test_replicas_need_shared_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.load_settings(DB_REPLICAS='replica:5432')
+        loaded = self.load_settings(
+            DB_REPLICAS='replica:5432',
+            CACHE_BACKEND='django.core.cache.backends.filebased.'
+                          'FileBasedCache',
+        )
+        self.assertEqual(loaded['DATABASE_REPLICAS'], ['replica1'])
+
+
+@unittest.skipUnless(settings.DATABASE_REPLICAS,
+                     'реплики не настроены (DB_REPLICAS)')
+class ReplicaReadsTest(TransactionTestCase):
+    """
+    Чтения API с реплики. В тестах реплика — зеркало default и не видит
+    незафиксированных данных, поэтому запускается отдельно, с общим для
+    процессов кэшем:
+    DB_REPLICAS=<путь или адрес>
+    CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+    CACHE_LOCATION=<каталог> manage.py test api.tests.test_replicas
+    """
+
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='user',
+                                        email='user@yamdb.ru')
+        self.title = Title.objects.create(name='Произведение', year=2000,
+                                          description='Описание')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.replica = connections[settings.DATABASE_REPLICAS[0]]
+
+    def get_reviews(self):
+        with CaptureQueriesContext(self.replica) as replica:
+            with CaptureQueriesContext(connections['default']) as primary:
+                response = self.client.get(
+                    f'/api/v1/titles/{self.title.pk}/reviews/'
+                )
+        self.assertEqual(response.status_code, 200)
+        return len(primary), len(replica), response
+
+    @override_settings(DATABASE_REPLICAS=settings.DATABASE_REPLICAS[:1])
+    def test_read_your_writes(self):
+        primary, replica, _ = self.get_reviews()
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+        response = self.client.post(
+            f'/api/v1/titles/{self.title.pk}/reviews/',
+            {'text': 'Отзыв', 'score': 7}
+        )
+        self.assertEqual(response.status_code, 201)
+        primary, replica, response = self.get_reviews()
+        self.assertEqual(replica, 0)
+        self.assertEqual(response.data['count'], 1)
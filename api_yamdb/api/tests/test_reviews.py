@@ -0,0 +1,51 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Review, Title
+from users.models import User
+
+
+class ReviewConstraintsTest(TestCase):
+    """Создание отзыва опирается на ограничения базы данных."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание')
+        cls.user = User.objects.create(username='user',
+                                       email='user@yamdb.ru')
+        cls.url = f'/api/v1/titles/{cls.title.pk}/reviews/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_duplicate_review(self):
+        response = self.client.post(self.url, {'text': 'Отзыв', 'score': 5})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(self.url, {'text': 'Ещё', 'score': 9})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['non_field_errors'],
+                         ['Один пользователь, один отзыв!'])
+        self.title.refresh_from_db()
+        self.assertEqual((self.title.rating_sum, self.title.rating_count),
+                         (5, 1))
+
+    def test_missing_title(self):
+        response = self.client.post('/api/v1/titles/0/reviews/',
+                                    {'text': 'Отзыв', 'score': 5})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Review.objects.exists())
+
+    def test_score_range(self):
+        for score in (0, 11):
+            with self.subTest(score=score):
+                response = self.client.post(self.url,
+                                            {'text': 'Отзыв', 'score': score})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('score', response.data)
+                with self.assertRaises(IntegrityError), transaction.atomic():
+                    Review.objects.bulk_create([Review(
+                        title=self.title, author=self.user, text='Отзыв',
+                        score=score
+                    )])
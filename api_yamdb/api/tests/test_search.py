@@ -0,0 +1,85 @@
+from unittest import mock
+
+from api.filters import search_titles
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.postgresql.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from reviews.models import Title
+from users.models import User, UserRole
+
+
+class TitleSearchTest(TestCase):
+    """Поиск ?search= по названию произведения."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in ('Побег из Шоушенка', 'Крестный отец', 'Властелин колец'):
+            Title.objects.create(name=name, year=2000, description='Описание')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def search(self, value):
+        response = self.client.get('/api/v1/titles/', {'search': value})
+        self.assertEqual(response.status_code, 200)
+        return [title['name'] for title in response.data['results']]
+
+    def test_case_insensitive_substring(self):
+        self.assertEqual(self.search('ШОУШЕНК'), ['Побег из Шоушенка'])
+
+    def test_typo(self):
+        self.assertEqual(self.search('побек'), ['Побег из Шоушенка'])
+
+    def test_no_match(self):
+        self.assertEqual(self.search('гамбургер'), [])
+
+
+class TitleSearchSqlTest(SimpleTestCase):
+    """SQL поиска для PostgreSQL, без подключения к нему."""
+
+    def test_word_similarity(self):
+        postgres = DatabaseWrapper({
+            **connections['default'].settings_dict,
+            'ENGINE': 'django.db.backends.postgresql',
+        }, 'default')
+        with mock.patch('api.filters.connection', postgres):
+            queryset = search_titles(Title.objects.all(), 'побек')
+        sql, params = queryset.query.get_compiler(
+            connection=postgres
+        ).as_sql()
+        # %% в SQL psycopg2 превращает в один %: оператор %> pg_trgm.
+        self.assertIn('"reviews_title"."name" %%> %s', sql)
+        self.assertIn('WORD_SIMILARITY(%s, "reviews_title"."name") '
+                      'AS "rank"', sql)
+        self.assertIn('ORDER BY "rank" DESC', sql)
+        self.assertEqual(params, ('побек', '%побек%', 'побек'))
+
+
+class UserSearchTest(TestCase):
+    """Поиск ?search= по имени пользователя для администратора."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role=UserRole.ADMIN,
+                                        email='admin@yamdb.ru')
+        for username in ('bingobongo', 'capt_obvious', 'faust'):
+            User.objects.create(username=username,
+                                email=f'{username}@yamdb.ru')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def search(self, value):
+        response = self.client.get('/api/v1/users/', {'search': value})
+        self.assertEqual(response.status_code, 200)
+        return sorted(user['username'] for user in response.data['results'])
+
+    def test_case_insensitive_substring(self):
+        self.assertEqual(self.search('BONGO'), ['bingobongo'])
+        self.assertEqual(self.search('o'),
+                         ['bingobongo', 'capt_obvious'])
+        self.assertEqual(self.search('bin'), ['bingobongo'])
@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Comments, Genre, Review, Title
+from users.models import User
+
+
+class SparseFieldsTest(TestCase):
+    """?fields= и ?exclude= сужают ответ и SQL."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='user', email='u@yamdb.ru')
+        category = Category.objects.create(name='Фильм', slug='movie')
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание',
+                                         category=category)
+        cls.title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        Review.objects.create(title=cls.title, author=cls.user,
+                              text='Отзыв', score=8)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, ' '.join(query['sql'] for query in queries)
+
+    def test_titles(self):
+        response, sql = self.get('/api/v1/titles/?fields=id,name,rating')
+        self.assertEqual(response.json()['results'], [
+            {'id': self.title.pk, 'name': 'Произведение', 'rating': 8}
+        ])
+        self.assertNotIn('description', sql)
+        self.assertNotIn('reviews_category', sql)
+        self.assertNotIn('reviews_genre', sql)
+        response, sql = self.get(
+            f'/api/v1/titles/{self.title.pk}/?exclude=description,genre'
+        )
+        self.assertEqual(list(response.json()),
+                         ['id', 'name', 'year', 'rating', 'category'])
+        self.assertIn('reviews_category', sql)
+        self.assertNotIn('reviews_genre', sql)
+
+    def test_reviews(self):
+        path = f'/api/v1/titles/{self.title.pk}/reviews/'
+        response, sql = self.get(f'{path}?fields=id,score')
+        self.assertEqual([list(row) for row in response.json()['results']],
+                         [['id', 'score']])
+        self.assertNotIn('users_user', sql)
+        response, sql = self.get(f'{path}?fields=id,score,author')
+        self.assertEqual(response.json()['results'][0]['author'], 'user')
+        self.assertIn('users_user', sql)
+
+    def walk_cursor(self, url):
+        """id всех страниц курсорной пагинации, начиная с url."""
+        ids = []
+        while url:
+            response, _ = self.get(url)
+            data = response.json()
+            ids += [row['id'] for row in data['results']]
+            self.assertEqual({field for row in data['results']
+                              for field in row}, {'id'})
+            url = data['next']
+        return ids
+
+    def test_cursor_pages(self):
+        # Курсор строится по pub_date, которого нет в ответе.
+        review = Review.objects.get()
+        for index in range(11):
+            author = User.objects.create(username=f'author{index}',
+                                         email=f'author{index}@yamdb.ru')
+            Review.objects.create(title=self.title, author=author,
+                                  text='Отзыв', score=5)
+            Comments.objects.create(review=review, author=author,
+                                    text='Комментарий')
+        path = f'/api/v1/titles/{self.title.pk}/reviews/'
+        expected = list(Review.objects.order_by('-pub_date', 'id')
+                        .values_list('id', flat=True))
+        self.assertEqual(
+            self.walk_cursor(f'{path}?pagination=cursor&fields=id'), expected
+        )
+        path = f'{path}{review.pk}/comments/'
+        expected = list(Comments.objects.order_by('-pub_date', 'id')
+                        .values_list('id', flat=True))
+        self.assertEqual(self.walk_cursor(
+            f'{path}?pagination=cursor&exclude=text,author,pub_date'
+        ), expected)
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/v1/titles/?exclude=name,votes')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('votes', response.json()['exclude'][0])
+
+    def test_writes_ignore_fields(self):
+        self.client.force_authenticate(
+            User.objects.create(username='other', email='o@yamdb.ru')
+        )
+        response = self.client.post(
+            f'/api/v1/titles/{self.title.pk}/reviews/?fields=id',
+            {'text': 'Ещё', 'score': 5}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(response.json()),
+                         ['id', 'text', 'author', 'score', 'pub_date'])
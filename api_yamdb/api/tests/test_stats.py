@@ -0,0 +1,87 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Review, ScoreHistogram, Title
+from users.models import User
+
+
+class ScoreStatsTest(TestCase):
+    """Распределение оценок произведения из гистограммы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание')
+        cls.users = [User.objects.create(username=f'user{i}',
+                                         email=f'user{i}@yamdb.ru')
+                     for i in range(4)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = f'/api/v1/titles/{self.title.pk}/stats/'
+
+    def review(self, user, score, title=None):
+        return Review.objects.create(title=title or self.title, author=user,
+                                     text='Отзыв', score=score)
+
+    def stats(self):
+        cache.clear()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_stats(self):
+        for user, score in zip(self.users, (3, 8, 8, 10)):
+            self.review(user, score)
+        data = self.stats()
+        self.assertEqual(data['count'], 4)
+        self.assertEqual(data['mean'], 7.25)
+        self.assertEqual(data['median'], 8.0)
+        self.assertEqual(data['histogram'][8], 2)
+        self.assertEqual(sum(data['histogram'].values()), 4)
+        self.assertEqual(len(data['histogram']), 10)
+
+    def test_updates_in_place(self):
+        first = self.review(self.users[0], 2)
+        self.review(self.users[1], 5)
+        first.score = 9
+        first.save()
+        self.assertEqual(self.stats()['median'], 7.0)
+        first.delete()
+        data = self.stats()
+        self.assertEqual((data['count'], data['median']), (1, 5.0))
+        self.assertEqual(data['histogram'][9], 0)
+
+    def test_review_moved_to_other_title(self):
+        other = Title.objects.create(name='Другое', year=2000,
+                                     description='Описание')
+        review = self.review(self.users[0], 6)
+        review.title = other
+        review.save()
+        self.assertEqual(self.stats()['count'], 0)
+        self.assertEqual(other.score_histogram.score_6, 1)
+
+    def test_without_reviews(self):
+        data = self.stats()
+        self.assertEqual((data['count'], data['mean'], data['median']),
+                         (0, None, None))
+        response = self.client.get('/api/v1/titles/0/stats/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_one_query(self):
+        for user, score in zip(self.users, (1, 2, 3)):
+            self.review(user, score)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_rebuild(self):
+        for user, score in zip(self.users, (4, 4, 7)):
+            self.review(user, score)
+        expected = self.stats()
+        ScoreHistogram.objects.update(score_4=0, score_1=5)
+        call_command('rebuild_histograms', stdout=io.StringIO())
+        self.assertEqual(self.stats(), expected)
@@ -0,0 +1,159 @@
+from unittest import mock
+
+from api.metrics import registry
+from api.throttling import take_tokens
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Title
+from users.models import User
+
+RATES = {
+    'write_user': '3/min',
+    'write_ip': '5/min',
+    'auth_ip': '4/min',
+    'auth_username': '2/min',
+    'export': '2/min',
+}
+
+
+class TakeTokensTest(SimpleTestCase):
+    """Расчёт корзины без кэша."""
+
+    def test_refill(self):
+        state, wait = take_tokens(None, 2, 1, now=100)
+        self.assertEqual((state, wait), ((1, 100), 0))
+        state, wait = take_tokens(state, 2, 1, now=100)
+        state, wait = take_tokens(state, 2, 1, now=100.25)
+        self.assertEqual(wait, 0.75)
+        state, wait = take_tokens(state, 2, 1, now=101)
+        self.assertEqual(wait, 0)
+        # Простой не копит токенов сверх ёмкости.
+        state, _ = take_tokens(state, 2, 1, now=1000)
+        self.assertEqual(state, (1, 1000))
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK,
+                                   'DEFAULT_THROTTLE_RATES': RATES})
+class ThrottleTest(TestCase):
+    """Ограничение частоты auth/ и изменяющих запросов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin',
+                                        email='admin@yamdb.ru')
+        cls.title = Title.objects.create(name='Произведение', year=2000,
+                                         description='Описание')
+
+    def setUp(self):
+        cache.clear()
+        caches[settings.THROTTLE_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.now = 1000.0
+        patcher = mock.patch('api.throttling.TokenBucketThrottle.timer',
+                             lambda throttle: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_genre(self, slug, client=None, **extra):
+        return (client or self.client).post(
+            '/api/v1/genres/', {'name': slug, 'slug': slug}, **extra
+        )
+
+    def test_writes_per_user(self):
+        for index in range(3):
+            self.assertEqual(self.create_genre(f'g{index}').status_code, 201)
+        response = self.create_genre('g3')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        # Чтения не ограничены.
+        self.assertEqual(self.client.get('/api/v1/genres/').status_code, 200)
+        self.now += 20
+        self.assertEqual(self.create_genre('g3').status_code, 201)
+
+    def test_exports_per_user(self):
+        path = '/api/v1/export/titles.ndjson'
+        for _ in range(2):
+            self.assertEqual(self.client.get(path).status_code, 200)
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        other = APIClient()
+        other.force_authenticate(User.objects.create(
+            username='other', email='other@yamdb.ru'
+        ))
+        self.assertEqual(other.get(path).status_code, 200)
+
+    def test_writes_per_ip(self):
+        clients = []
+        for name in ('other', 'third'):
+            client = APIClient()
+            client.force_authenticate(User.objects.create(
+                username=name, role='admin', email=f'{name}@yamdb.ru'
+            ))
+            clients.append(client)
+        for index in range(3):
+            self.create_genre(f'a{index}')
+        statuses = [self.create_genre(f'b{index}', clients[0]).status_code
+                    for index in range(3)]
+        self.assertEqual(statuses, [201, 201, 429])
+        self.assertEqual(self.create_genre('c', clients[1]).status_code, 429)
+        response = self.create_genre('c', clients[1], REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 201)
+
+    def test_auth_per_ip(self):
+        client = APIClient()
+        statuses = [
+            client.post('/api/v1/auth/token/',
+                        {'username': f'user{index}',
+                         'confirmation_code': 'code'}).status_code
+            for index in range(5)
+        ]
+        self.assertEqual(statuses, [404, 404, 404, 404, 429])
+
+    def test_auth_per_username(self):
+        data = {'username': 'admin', 'confirmation_code': 'code'}
+        statuses = [
+            APIClient().post('/api/v1/auth/token/', data,
+                             REMOTE_ADDR=f'10.0.0.{index}').status_code
+            for index in range(3)
+        ]
+        self.assertEqual(statuses, [400, 400, 429])
+        response = APIClient().post('/api/v1/auth/signup/', {
+            'username': 'Admin', 'email': 'admin@yamdb.ru'
+        }, REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(response.status_code, 429)
+
+    def test_forwarded_for(self):
+        # NUM_PROXIES=1: адрес клиента — последний в X-Forwarded-For.
+        def token(username, address):
+            return APIClient().post(
+                '/api/v1/auth/token/',
+                {'username': username, 'confirmation_code': 'code'},
+                REMOTE_ADDR='172.18.0.5',
+                HTTP_X_FORWARDED_FOR=f'10.1.0.1, {address}'
+            ).status_code
+
+        for index in range(4):
+            token(f'user{index}', '10.0.0.1')
+        self.assertEqual(token('user5', '10.0.0.1'), 429)
+        self.assertEqual(token('user5', '10.0.0.2'), 404)
+
+    def test_no_queries(self):
+        for index in range(3):
+            self.create_genre(f'g{index}')
+        with self.assertNumQueries(0):
+            response = self.create_genre('g3')
+        self.assertEqual(response.status_code, 429)
+
+    def test_metrics(self):
+        labels = (('scope', 'write_user'), ('result', 'throttled'))
+        before = registry.counters[('yamdb_throttle_requests_total', labels)]
+        for index in range(4):
+            self.create_genre(f'g{index}')
+        self.assertEqual(
+            registry.counters[('yamdb_throttle_requests_total', labels)],
+            before + 1
+        )
@@ -0,0 +1,208 @@
+"""
+Ограничение частоты запросов алгоритмом «корзины токенов».
+
+Корзина вмещает N токенов и пополняется со скоростью N за период из
+правила вида 'N/min'. Запрос забирает токен, без токенов получает 429
+с Retry-After. Состояние корзин хранится в кэше THROTTLE_CACHE_ALIAS,
+поэтому при общем кэше (Redis) пределы действуют на все воркеры gunicorn.
+Проверка не обращается к базе: пользователь уже восстановлен из токена.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import registry
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Тот же расчёт, что в take_tokens, атомарно на стороне Redis.
+REDIS_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(state[1]) or capacity
+local stamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - stamp, 0) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HMSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+def parse_rate(rate):
+    """'20/min' -> (20, 20 / 60): ёмкость и пополнение токенов в секунду."""
+    if rate is None:
+        return None, None
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def take_tokens(state, capacity, rate, now):
+    """
+    Пополняет корзину с момента прошлого запроса и забирает токен.
+    Возвращает новое состояние (токены, время) и ожидание в секундах:
+    0, если токен был.
+    """
+    tokens, stamp = state or (capacity, now)
+    tokens = min(capacity, tokens + max(now - stamp, 0) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class CacheBuckets:
+    """
+    Корзины в любом кэше Django. Чтение и запись идут под блокировкой
+    процесса: для кэша в памяти (тесты, один воркер) это атомарно, для
+    общего кэша без Redis одновременные запросы разных воркеров могут
+    изредка пройти сверх предела.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now):
+        with self.lock:
+            state, wait = take_tokens(self.cache.get(key), capacity, rate,
+                                      now)
+            self.cache.set(key, state, math.ceil(capacity / rate) + 1)
+        return wait
+
+
+class RedisBuckets:
+    """Корзины в Redis (django_redis): один атомарный скрипт на запрос."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.script = cache.client.get_client(write=True).register_script(
+            REDIS_SCRIPT
+        )
+
+    def take(self, key, capacity, rate, now):
+        return float(self.script(keys=[self.cache.make_key(key)],
+                                 args=[capacity, rate, now]))
+
+
+buckets_by_alias = {}
+
+
+def get_buckets():
+    alias = settings.THROTTLE_CACHE_ALIAS
+    if alias not in buckets_by_alias:
+        cache = caches[alias]
+        client = getattr(cache, 'client', None)
+        if hasattr(client, 'get_client'):
+            buckets = RedisBuckets(cache)
+        else:
+            buckets = CacheBuckets(cache)
+        buckets_by_alias.setdefault(alias, buckets)
+    return buckets_by_alias[alias]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Базовый класс: scope задаёт правило в DEFAULT_THROTTLE_RATES,
+    get_key — чью корзину расходует запрос (None — не ограничивать).
+    При unsafe_only ограничиваются только изменяющие запросы.
+    """
+    scope = None
+    unsafe_only = False
+    timer = time.time
+
+    def __init__(self):
+        self.capacity, self.rate = parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        )
+        self.retry_after = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError('.get_key() must be overridden')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        if self.unsafe_only and request.method in SAFE_METHODS:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        wait = get_buckets().take(f'throttle:{self.scope}:{key}',
+                                  self.capacity, self.rate, self.timer())
+        result = 'throttled' if wait else 'allowed'
+        registry.inc('yamdb_throttle_requests_total',
+                     (('scope', self.scope), ('result', result)))
+        if wait:
+            self.retry_after = wait
+            return False
+        return True
+
+    def wait(self):
+        # DRF округляет Retry-After вниз, а 0 не передаёт вовсе.
+        return math.ceil(self.retry_after)
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Корзина на IP-адрес клиента (с учётом NUM_PROXIES)."""
+
+    def get_key(self, request, view):
+        return f'ip:{self.get_ident(request)}'
+
+
+class UserThrottle(TokenBucketThrottle):
+    """Корзина на пользователя, для анонимов — на IP-адрес."""
+
+    def get_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """
+    Корзина на имя пользователя из тела запроса: подбор кода
+    подтверждения с разных адресов упирается в один предел.
+    """
+
+    def get_key(self, request, view):
+        data = request.data
+        username = data.get('username') if isinstance(data, dict) else None
+        if not isinstance(username, str) or not username:
+            return None
+        return f'username:{username.lower()}'
+
+
+class AuthIPThrottle(IPThrottle):
+    scope = 'auth_ip'
+
+
+class AuthUsernameThrottle(UsernameThrottle):
+    scope = 'auth_username'
+
+
+class WriteUserThrottle(UserThrottle):
+    scope = 'write_user'
+    unsafe_only = True
+
+
+class WriteIPThrottle(IPThrottle):
+    scope = 'write_ip'
+    unsafe_only = True
+
+
+class ExportThrottle(UserThrottle):
+    scope = 'export'
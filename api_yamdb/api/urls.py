@@ -1,7 +1,8 @@
+from api.export import export_reviews, export_titles
 from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewsViewSet, TitleViewSet, UserViewSet,
-                       get_token_for_user, user_registration)
-from django.urls import include, path
+                       LeaderboardViewSet, ReviewsViewSet, TitleViewSet,
+                       UserViewSet, get_token_for_user, user_registration)
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 app_name = 'api'
@@ -11,6 +12,7 @@ router.register(r'users', UserViewSet, basename='user')
 router.register(r'titles', TitleViewSet)
 router.register(r'genres', GenreViewSet)
 router.register(r'categories', CategoryViewSet)
+router.register(r'leaderboards', LeaderboardViewSet, basename='leaderboards')
 router.register(r'titles/(?P<title_id>[\d]{1,})/reviews',
                 ReviewsViewSet, basename='reviews'
                 )
@@ -24,4 +26,8 @@ urlpatterns = [
     path('', include(router.urls)),
     path('auth/signup/', user_registration),
     path('auth/token/', get_token_for_user),
+    re_path(r'^export/titles\.(?P<export_format>ndjson|csv)$',
+            export_titles, name='export-titles'),
+    re_path(r'^export/reviews\.(?P<export_format>ndjson|csv)$',
+            export_reviews, name='export-reviews'),
 ]
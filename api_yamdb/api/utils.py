@@ -1,14 +1,15 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from tasks.queue import enqueue
 
 from api_yamdb.settings import DEFAULT_FROM_EMAIL
 
 
 def send_confirmation_code(user):
-    """Функция отправки кода подтверждения."""
+    """Функция постановки письма с кодом подтверждения в очередь."""
     confirmation_code = default_token_generator.make_token(user)
     subject = 'YaMDB: код подтверждения'
     message = f'Ваш код для подтверждения: {confirmation_code}'
     from_mail = DEFAULT_FROM_EMAIL
     to_mail = [user.email]
-    return send_mail(subject, message, from_mail, to_mail)
+    return enqueue('send_mail', subject=subject, message=message,
+                   from_email=from_mail, recipient_list=to_mail)
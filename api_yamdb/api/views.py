@@ -1,31 +1,43 @@
+from api.authentication import RoleAccessToken
+from api.bulk import BulkModelMixin
+from api.cache import CachedReadMixin
+from api.metrics import TimedSerializationMixin
 from api.permissions import (IsAuthOrSuperUserOrModOrAdminOrReadOnly,
                              IsSuperUserOrIsAdmin,
                              IsSuperUserOrIsAdminOrReadOnly)
+from api.readers import CommentReader, FastReadMixin, ReviewReader, TitleReader
 from api.serializers import (AuthUserSerializer, CategoriesSerializer,
                              CommentsSerializer, GenresSerializer,
-                             ReviewsSerializer, TitlesGetSerializer,
+                             ReviewsSerializer, ScoreStatsSerializer,
+                             TitleRankingSerializer, TitlesGetSerializer,
                              TitlesSerializer, TokenUserSerializer,
                              UserSerializer)
+from api.sparse import SparseFieldsMixin
+from api.throttling import AuthIPThrottle, AuthUsernameThrottle
 from api.utils import send_confirmation_code
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (Category, Comments, Genre, Review, ScoreHistogram,
+                            Title, TitleRanking)
 from users.models import User
 
 from .filters import TitleFilter
-from .pagination import PagePaginations
+from .pagination import PageOrCursorPagination
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(TimedSerializationMixin, viewsets.ModelViewSet):
     """Вьюсет модели User."""
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -62,19 +74,21 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def get_profile(self, request):
         """Метод получает/редактирует данные своей учетной записи."""
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'PATCH':
             serializer = UserSerializer(
-                request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save(role=request.user.role)
+            serializer.save(role=user.role)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def user_registration(request):
     """Функция регистрации пользователя."""
     serializer = AuthUserSerializer(data=request.data)
@@ -91,6 +105,7 @@ def user_registration(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, AuthUsernameThrottle])
 def get_token_for_user(request):
     """Функция получения токена."""
     serializer = TokenUserSerializer(data=request.data)
@@ -102,14 +117,18 @@ def get_token_for_user(request):
     if not default_token_generator.check_token(user, confirmation_code):
         message = 'не правильный код подтверждения'
         return Response(message, status=status.HTTP_400_BAD_REQUEST)
-    access_token = AccessToken.for_user(user)
+    access_token = RoleAccessToken.for_user(user)
     message = {'token': str(access_token)}
     return Response(message, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(CachedReadMixin, TimedSerializationMixin, FastReadMixin,
+                   SparseFieldsMixin, BulkModelMixin, viewsets.ModelViewSet):
     """Вьюсет модели Title."""
+    cache_scope = 'titles'
+    reader_class = TitleReader
     queryset = Title.objects.all()
+    lookup_value_regex = r'\d+'
     search_fields = ('name',)
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsSuperUserOrIsAdminOrReadOnly,)
@@ -117,20 +136,91 @@ class TitleViewSet(viewsets.ModelViewSet):
     filterset_class = TitleFilter
 
     def get_queryset(self):
-        return (Title.objects.annotate(rating=Avg('title__score')).
-                order_by('-rating'))
+        return (Title.objects.select_related('category')
+                .prefetch_related('genre').order_by('-rating'))
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitlesGetSerializer
+        if self.action == 'stats':
+            return ScoreStatsSerializer
         return TitlesSerializer
 
+    @action(detail=True, methods=('get',))
+    def stats(self, request, pk=None):
+        """Число оценок, среднее, медиана и гистограмма оценок 1–10."""
+        return self.cached_response(self.score_stats, request, pk)
+
+    def bulk_saved(self, objects):
+        # bulk_update и вставка связей не вызывают сигналов. У новых
+        # произведений оценок нет, и мест в рейтингах тоже.
+        if self.request.method == 'PATCH':
+            TitleRanking.objects.refresh(obj.pk for obj in objects)
+
+    def score_stats(self, request, pk):
+        histogram = ScoreHistogram.objects.filter(title_id=pk).first()
+        if histogram is None:
+            # У произведения без отзывов строки гистограммы нет.
+            histogram = ScoreHistogram(title=get_object_or_404(Title, pk=pk))
+        return Response(self.get_serializer(histogram).data)
+
+
+class LeaderboardViewSet(CachedReadMixin, TimedSerializationMixin,
+                         viewsets.GenericViewSet):
+    """
+    Рейтинги лучших произведений: общий, жанра и категории. Читаются из
+    предрассчитанной таблицы TitleRanking, ?limit= — размер топа.
+    """
+    cache_scope = 'titles'
+    serializer_class = TitleRankingSerializer
+    permission_classes = (AllowAny,)
+
+    def get_queryset(self):
+        return TitleRanking.objects.select_related('title')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(self.top, request)
 
-class CategoryViewSet(viewsets.GenericViewSet,
+    @action(detail=False, url_path=r'genres/(?P<slug>[-\w]+)')
+    def genre(self, request, slug):
+        return self.cached_response(self.top, request, genre=slug)
+
+    @action(detail=False, url_path=r'categories/(?P<slug>[-\w]+)')
+    def category(self, request, slug):
+        return self.cached_response(self.top, request, category=slug)
+
+    def top(self, request, genre=None, category=None):
+        if genre is not None:
+            genre = get_object_or_404(Genre, slug=genre)
+        if category is not None:
+            category = get_object_or_404(Category, slug=category)
+        rankings = self.get_queryset().board(genre, category)
+        data = self.get_serializer(rankings[:self.get_limit()],
+                                   many=True).data
+        return Response([{'rank': rank, **row}
+                         for rank, row in enumerate(data, 1)])
+
+    def get_limit(self):
+        value = self.request.query_params.get('limit')
+        if value is None:
+            return settings.LEADERBOARD_SIZE
+        limit = int(value) if value.isdigit() else 0
+        if not 1 <= limit <= settings.LEADERBOARD_MAX_SIZE:
+            raise ValidationError({'limit': [
+                f'Ожидается число от 1 до {settings.LEADERBOARD_MAX_SIZE}.'
+            ]})
+        return limit
+
+
+class CategoryViewSet(CachedReadMixin,
+                      TimedSerializationMixin,
+                      BulkModelMixin,
+                      viewsets.GenericViewSet,
                       mixins.CreateModelMixin,
                       mixins.ListModelMixin,
                       mixins.DestroyModelMixin):
     """Вьюсет модели Category."""
+    cache_scope = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategoriesSerializer
     filter_backends = (filters.SearchFilter,)
@@ -140,11 +230,15 @@ class CategoryViewSet(viewsets.GenericViewSet,
     lookup_field = 'slug'
 
 
-class GenreViewSet(viewsets.GenericViewSet,
+class GenreViewSet(CachedReadMixin,
+                   TimedSerializationMixin,
+                   BulkModelMixin,
+                   viewsets.GenericViewSet,
                    mixins.CreateModelMixin,
                    mixins.ListModelMixin,
                    mixins.DestroyModelMixin):
     """Вьюсет модели Genre."""
+    cache_scope = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenresSerializer
     filter_backends = (filters.SearchFilter,)
@@ -154,41 +248,62 @@ class GenreViewSet(viewsets.GenericViewSet,
     lookup_field = 'slug'
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(TimedSerializationMixin, FastReadMixin,
+                     SparseFieldsMixin, viewsets.ModelViewSet):
     """Вьюсет модели Review."""
     serializer_class = ReviewsSerializer
-    pagination_class = PagePaginations
+    reader_class = ReviewReader
+    pagination_class = PageOrCursorPagination
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAuthOrSuperUserOrModOrAdminOrReadOnly,)
 
-    def select_objects(self):
-        title_id = self.kwargs.get("title_id")
-        return get_object_or_404(Title, pk=title_id)
+    @cached_property
+    def title(self):
+        """Произведение из URL, загружается не больше раза за запрос."""
+        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        titles = self.select_objects()
-        return titles.title.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author')
+
+    def list(self, request, *args, **kwargs):
+        # Пустой список не отличить от несуществующего произведения.
+        self.title
+        return super().list(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        new = self.select_objects()
-        serializer.save(author=self.request.user, title=new)
+        try:
+            serializer.save(author=self.request.user,
+                            title_id=self.kwargs.get('title_id'))
+        except Title.DoesNotExist:
+            raise Http404('Произведение не найдено.')
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(TimedSerializationMixin, FastReadMixin,
+                     SparseFieldsMixin, viewsets.ModelViewSet):
     """Вьюсет модели Comment."""
     serializer_class = CommentsSerializer
-    pagination_class = PagePaginations
+    reader_class = CommentReader
+    pagination_class = PageOrCursorPagination
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAuthOrSuperUserOrModOrAdminOrReadOnly,)
 
-    def select_objects(self):
-        review_id = self.kwargs.get("review_id")
-        return get_object_or_404(Review, pk=review_id)
+    @cached_property
+    def review(self):
+        """Отзыв из URL, принадлежащий произведению из URL."""
+        return get_object_or_404(Review, pk=self.kwargs.get('review_id'),
+                                 title_id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        rev = self.select_objects()
-        return rev.review.all()
+        return Comments.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        ).select_related('author')
+
+    def list(self, request, *args, **kwargs):
+        self.review
+        return super().list(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        new = self.select_objects()
-        serializer.save(author=self.request.user, review=new)
+        serializer.save(author=self.request.user, review=self.review)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+# Горячие эндпоинты чтения — асинхронные представления (api.async_views).
+os.environ.setdefault('ROOT_URLCONF', 'api_yamdb.urls_async')
 
 application = get_asgi_application()
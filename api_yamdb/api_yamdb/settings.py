@@ -2,6 +2,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management.utils import get_random_secret_key
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,16 +29,21 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'django_filters',
     'reviews.apps.ReviewsConfig',
     'users.apps.UsersConfig',
+    'tasks.apps.TasksConfig',
     'api.apps.ApiConfig',
 ]
 
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.compression.CompressionMiddleware',
+    'api.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -47,7 +53,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'api_yamdb.urls'
+# api_yamdb.asgi подменяет схему на api_yamdb.urls_async.
+ROOT_URLCONF = os.getenv('ROOT_URLCONF', default='api_yamdb.urls')
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
@@ -82,6 +89,119 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: адреса host[:port] через запятую (для SQLite — пути
+# к файлам), остальные параметры как у default. Запросы GET/HEAD читают
+# с реплик, клиент после записи REPLICA_STICKY_SECONDS читает с default.
+
+DATABASE_REPLICAS = []
+for number, address in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(',')), start=1
+):
+    replica = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if replica['ENGINE'].endswith('sqlite3'):
+        replica['NAME'] = address.strip()
+    else:
+        host, _, port = address.strip().partition(':')
+        replica.update(HOST=host, PORT=port or replica['PORT'])
+    DATABASES[f'replica{number}'] = replica
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', default=5))
+REPLICA_RETRY_SECONDS = 30
+
+
+# Cache
+# По умолчанию — ограниченный по размеру кэш в памяти процесса.
+# Для общего кэша всех воркеров gunicorn задайте Redis-совместимый бэкенд,
+# например CACHE_BACKEND=django_redis.cache.RedisCache и
+# CACHE_LOCATION=redis://redis:6379/1.
+
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'
+)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+if CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=1000)),
+    }
+
+# Корзины ограничения частоты запросов (api.throttling) — в отдельном
+# кэше, чтобы их не вытесняли ответы. Для пределов на все воркеры нужен
+# общий кэш: THROTTLE_CACHE_LOCATION или CACHE_LOCATION с Redis.
+CACHES['throttle'] = {
+    'BACKEND': CACHE_BACKEND,
+    'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION',
+                          default=CACHES['default']['LOCATION']),
+    'KEY_PREFIX': 'throttle',
+}
+if CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES['throttle']['LOCATION'] = 'yamdb-throttle'
+    CACHES['throttle']['OPTIONS'] = {'MAX_ENTRIES': 100000}
+
+# Состояние пользователей для JWT-аутентификации (api.authentication):
+# роль, активность. В общем кэше запись живёт минуту: изменения через
+# API сбрасывают её во всех воркерах. Кэш в памяти процесса об изменениях
+# в других воркерах не узнаёт, поэтому там запись живёт несколько секунд
+# — это предел, на который другой воркер может опоздать с новой ролью.
+CACHES['auth'] = {
+    'BACKEND': CACHE_BACKEND,
+    'LOCATION': CACHES['default']['LOCATION'],
+    'KEY_PREFIX': 'auth',
+}
+if CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES['auth']['LOCATION'] = 'yamdb-auth'
+    CACHES['auth']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+AUTH_STATE_TIMEOUT = int(os.getenv(
+    'AUTH_STATE_TIMEOUT',
+    default=5 if CACHE_BACKEND.endswith('LocMemCache') else 60,
+))
+
+# Отметка «клиент недавно писал» (api.replicas) должна быть видна всем
+# воркерам, иначе чтение после записи в другом воркере уйдёт на
+# отстающую реплику.
+if DATABASE_REPLICAS and CACHE_BACKEND.endswith('LocMemCache'):
+    raise ImproperlyConfigured(
+        'DB_REPLICAS требует общего для всех воркеров кэша: задайте '
+        'CACHE_BACKEND, например django_redis.cache.RedisCache'
+    )
+
+API_CACHE_ALIAS = 'default'
+THROTTLE_CACHE_ALIAS = 'throttle'
+AUTH_CACHE_ALIAS = 'auth'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
+# JSON-ответы от этого размера сжимаются (api.compression).
+API_COMPRESS_MIN_SIZE = int(os.getenv('API_COMPRESS_MIN_SIZE', default=1024))
+
+# Списки больше порога считаются по оценке PostgreSQL (api.pagination).
+EXACT_COUNT_THRESHOLD = int(os.getenv('EXACT_COUNT_THRESHOLD',
+                                      default=10000))
+
+# Пакетные эндпоинты /bulk/: предел элементов в запросе и размер INSERT.
+API_BULK_MAX_ITEMS = int(os.getenv('API_BULK_MAX_ITEMS', default=10000))
+API_BULK_BATCH_SIZE = 1000
+
+# Рейтинги лучших произведений: порог числа оценок, байесовское среднее
+# с LEADERBOARD_PRIOR_WEIGHT оценками LEADERBOARD_PRIOR_MEAN, размер топа.
+# После изменения параметров: manage.py rebuild_leaderboards.
+LEADERBOARD_MIN_REVIEWS = int(os.getenv('LEADERBOARD_MIN_REVIEWS',
+                                        default=3))
+LEADERBOARD_PRIOR_MEAN = float(os.getenv('LEADERBOARD_PRIOR_MEAN',
+                                         default=5.5))
+LEADERBOARD_PRIOR_WEIGHT = int(os.getenv('LEADERBOARD_PRIOR_WEIGHT',
+                                         default=5))
+LEADERBOARD_SIZE = 10
+LEADERBOARD_MAX_SIZE = 100
+
+# ASGI: потоков для ORM у асинхронных представлений на один воркер.
+ASYNC_DB_THREADS = int(os.getenv('ASYNC_DB_THREADS', default=8))
+
 
 # Password validation
 
@@ -121,6 +241,8 @@ STATIC_URL = '/static/'
 # STATICFILES_DIRS необходимо закомментировать или удалить
 # STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+# collectstatic пишет файлы с хешем в имени и их копии .gz и .br.
+STATICFILES_STORAGE = 'api.compression.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -131,11 +253,42 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
+    ],
+
+    # JSON через orjson (api.renderers), если он установлен.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.metrics.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.EstimatedCountPagination',
     'PAGE_SIZE': 5,
+
+    # Изменяющие запросы ограничены на пользователя и на IP-адрес,
+    # эндпоинты auth/ — на IP-адрес и на имя пользователя.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.WriteUserThrottle',
+        'api.throttling.WriteIPThrottle',
+    ],
+    # Пустое значение переменной снимает предел.
+    'DEFAULT_THROTTLE_RATES': {
+        'write_user': os.getenv('THROTTLE_WRITE_USER',
+                                default='60/min') or None,
+        'write_ip': os.getenv('THROTTLE_WRITE_IP', default='600/min') or None,
+        'auth_ip': os.getenv('THROTTLE_AUTH_IP', default='20/min') or None,
+        'auth_username': os.getenv('THROTTLE_AUTH_USERNAME',
+                                   default='5/min') or None,
+        'export': os.getenv('THROTTLE_EXPORT', default='10/min') or None,
+    },
+    # Число прокси перед приложением: адрес клиента берётся из
+    # X-Forwarded-For, который выставляет nginx.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
 }
 
 
@@ -148,3 +301,23 @@ SIMPLE_JWT = {
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 DEFAULT_FROM_EMAIL = 'yamdb@ya.com'
+
+
+# Metrics
+# Каталог, через который воркеры gunicorn делятся метриками для /metrics.
+# Без него /metrics показывает только процесс, обработавший запрос.
+
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 5
+
+
+# Background tasks
+
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_DELAY = 10
+TASKS_RETRY_MAX_DELAY = 3600
+# Сколько секунд задача принадлежит забравшему её воркеру; задачи
+# упавшего воркера вернутся в очередь по истечении этого срока.
+TASKS_LEASE = 300
+# Сколько дней purge_tasks хранит выполненные и упавшие задачи.
+TASKS_RETENTION_DAYS = 7
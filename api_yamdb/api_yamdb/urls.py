@@ -1,9 +1,11 @@
+from api.metrics import metrics_view
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/v1/', include('api.urls')),
     path(
         'redoc/',
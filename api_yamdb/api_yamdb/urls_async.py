@@ -0,0 +1,15 @@
+"""
+URL-схема ASGI-режима: горячие эндпоинты чтения обслуживаются
+асинхронными представлениями, остальные маршруты — как в api_yamdb.urls.
+"""
+from api import urls as api_urls
+from api.async_views import pooled_patterns
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/v1/', include(
+        pooled_patterns(api_urls.router.urls + api_urls.urlpatterns)
+    )),
+] + sync_urlpatterns
@@ -18,10 +18,12 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 class TitlesAdmin(admin.ModelAdmin):
-    list_display = ("pk", "category", "name", "year", "description")
+    list_display = ("pk", "category", "name", "year", "description",
+                    "rating")
     empty_value_display = "-пусто-"
     inlines = [GenreshipInline, ]
     exclude = ('genre', )
+    readonly_fields = ('rating', 'rating_sum', 'rating_count')
 
 
 class ReviewAdmin(admin.ModelAdmin):
@@ -1,23 +0,0 @@
-import csv
-
-from django.conf import settings
-from django.core.management.base import BaseCommand
-from reviews.models import Category
-
-
-class Command(BaseCommand):
-    def handle(self, *args, **options):
-        with open(f'{settings.BASE_DIR}/static/data/category.csv', newline='',
-                  encoding='utf-8'
-                  ) as file:
-            reader = csv.reader(file)
-            count = 0
-            for row in reader:
-                if count > 0:
-                    Category.objects.get_or_create(
-                        id=row[0],
-                        name=row[1],
-                        slug=row[2],
-                    )
-                count += 1
-            self.stdout.write(self.style.SUCCESS('Данные загружены в БД'))
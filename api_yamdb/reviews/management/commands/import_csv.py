@@ -0,0 +1,245 @@
+import csv
+import io
+import os
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from reviews.models import (Category, Comments, Genre, Review, ScoreHistogram,
+                            Title, TitleRanking)
+from users.models import User
+
+Table = namedtuple('Table', ('filename', 'model', 'convert'))
+
+
+def convert_user(row, known):
+    return {
+        'id': int(row['id']),
+        'username': row['username'],
+        'email': row['email'],
+        'role': row['role'],
+        'bio': row['bio'],
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+        'password': make_password(None),
+    }
+
+
+def convert_slugged(row, known):
+    return {'id': int(row['id']), 'name': row['name'], 'slug': row['slug']}
+
+
+def convert_title(row, known):
+    category_id = int(row['category']) if row['category'] else None
+    return {
+        'id': int(row['id']),
+        'name': row['name'],
+        'year': int(row['year']),
+        'description': row.get('description', ''),
+        'category_id': (category_id if category_id in known[Category]
+                        else None),
+    }
+
+
+def convert_genre_title(row, known):
+    title_id, genre_id = int(row['title_id']), int(row['genre_id'])
+    if title_id not in known[Title] or genre_id not in known[Genre]:
+        return None
+    return {'id': int(row['id']), 'title_id': title_id, 'genre_id': genre_id}
+
+
+def convert_review(row, known):
+    title_id, author_id = int(row['title_id']), int(row['author'])
+    if title_id not in known[Title] or author_id not in known[User]:
+        return None
+    return {
+        'id': int(row['id']),
+        'title_id': title_id,
+        'text': row['text'],
+        'author_id': author_id,
+        'score': int(row['score']),
+        'pub_date': row['pub_date'],
+    }
+
+
+def convert_comment(row, known):
+    review_id, author_id = int(row['review_id']), int(row['author'])
+    if review_id not in known[Review] or author_id not in known[User]:
+        return None
+    return {
+        'id': int(row['id']),
+        'review_id': review_id,
+        'text': row['text'],
+        'author_id': author_id,
+        'pub_date': row['pub_date'],
+    }
+
+
+# Порядок важен: таблица загружается после всех, на которые ссылается.
+TABLES = (
+    Table('users.csv', User, convert_user),
+    Table('category.csv', Category, convert_slugged),
+    Table('genre.csv', Genre, convert_slugged),
+    Table('titles.csv', Title, convert_title),
+    Table('genre_title.csv', Title.genre.through, convert_genre_title),
+    Table('review.csv', Review, convert_review),
+    Table('comments.csv', Comments, convert_comment),
+)
+
+# Модели, на id которых ссылаются другие таблицы.
+REFERENCED = (User, Category, Genre, Title, Review)
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Не даёт bulk_create затереть даты из CSV текущим временем."""
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    batch = list(islice(rows, size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, size))
+
+
+class Command(BaseCommand):
+    help = ('Загружает CSV из static/data в БД пакетами bulk_create '
+            '(или COPY на PostgreSQL)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=os.path.join(settings.BASE_DIR, 'static/data'),
+            help='каталог с CSV-файлами'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='число строк в одном INSERT/COPY'
+        )
+        parser.add_argument(
+            '--copy', action='store_true',
+            help='писать через COPY FROM STDIN (только PostgreSQL; строки, '
+                 'нарушающие ограничения, прерывают загрузку)'
+        )
+
+    def handle(self, *args, **options):
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy доступен только для PostgreSQL')
+        self.verbosity = options['verbosity']
+        write = self.write_copy if options['copy'] else self.write_bulk
+        known = {
+            model: set(model.objects.values_list('pk', flat=True))
+            for model in REFERENCED
+        }
+        started = time.monotonic()
+        total = 0
+        for table in TABLES:
+            path = os.path.join(options['path'], table.filename)
+            if not os.path.exists(path):
+                self.stdout.write(f'{table.filename}: нет файла, пропущен')
+                continue
+            total += self.load_table(table, path, known, write,
+                                     options['batch_size'])
+        Title.objects.recalculate_rating()
+        ScoreHistogram.objects.rebuild()
+        TitleRanking.objects.refresh()
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [table.model for table in TABLES]
+            ):
+                cursor.execute(sql)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные загружены в БД: вставлено {total} строк '
+            f'за {elapsed:.1f} с ({total / max(elapsed, 1e-9):.0f} строк/с)'
+        ))
+
+    def load_table(self, table, path, known, write, batch_size):
+        """
+        Загружает таблицу и возвращает число вставленных строк. Строки с
+        уже существующим id не пишутся, отвергнутые другими уникальными
+        ограничениями не попадают в known, и зависящие от них строки
+        пропускаются.
+        """
+        started = time.monotonic()
+        loaded = existing = rejected = skipped = 0
+        model = table.model
+        with open(path, newline='', encoding='utf-8') as file:
+            rows = (table.convert(row, known) for row in csv.DictReader(file))
+            with transaction.atomic(), keep_auto_now_add(model):
+                for batch in batches(rows, batch_size):
+                    values = [row for row in batch if row is not None]
+                    skipped += len(batch) - len(values)
+                    present = set(model.objects.filter(
+                        pk__in=[row['id'] for row in values]
+                    ).values_list('pk', flat=True))
+                    fresh = [row for row in values
+                             if row['id'] not in present]
+                    inserted = write(model, fresh)
+                    if model in known:
+                        known[model].update(inserted)
+                    loaded += len(inserted)
+                    existing += len(values) - len(fresh)
+                    rejected += len(fresh) - len(inserted)
+                    if self.verbosity > 1:
+                        self.stdout.write(f'{table.filename}: {loaded}')
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{table.filename}: загружено {loaded} строк, '
+            f'уже в БД {existing}, отклонено ограничениями {rejected}, '
+            f'пропущено без связанных строк {skipped}, '
+            f'{loaded / max(elapsed, 1e-9):.0f} строк/с'
+        )
+        return loaded
+
+    def write_bulk(self, model, values):
+        """Вставляет строки и возвращает id действительно вставленных."""
+        model.objects.bulk_create(
+            [model(**row) for row in values], ignore_conflicts=True
+        )
+        # До вставки этих id в БД не было: есть — значит, вставлены сейчас.
+        return set(model.objects.filter(
+            pk__in=[row['id'] for row in values]
+        ).values_list('pk', flat=True))
+
+    def write_copy(self, model, values):
+        """COPY не пропускает конфликты: любой из них прерывает загрузку."""
+        fields = model._meta.concrete_fields
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in values:
+            obj = model(**row)
+            writer.writerow([
+                r'\N' if value is None else value
+                for value in (
+                    field.get_db_prep_save(field.pre_save(obj, add=True),
+                                           connection)
+                    for field in fields
+                )
+            ])
+        buffer.seek(0)
+        columns = ', '.join(
+            connection.ops.quote_name(field.column) for field in fields
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+                f"({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+        return {row['id'] for row in values}
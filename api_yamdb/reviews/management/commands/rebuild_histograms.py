@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from reviews.models import ScoreHistogram
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает гистограммы оценок произведений по отзывам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'title_ids', nargs='*', type=int,
+            help='id произведений; по умолчанию пересчитываются все'
+        )
+
+    def handle(self, *args, **options):
+        created = ScoreHistogram.objects.rebuild(options['title_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f'Гистограммы пересчитаны: {created} произведений с отзывами'
+        ))
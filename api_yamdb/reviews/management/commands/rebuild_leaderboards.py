@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from reviews.models import TitleRanking
+
+
+class Command(BaseCommand):
+    help = ('Пересобирает рейтинги лучших произведений: общий, по жанрам '
+            'и категориям')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'title_ids', nargs='*', type=int,
+            help='id произведений; по умолчанию пересобираются все'
+        )
+
+    def handle(self, *args, **options):
+        created = TitleRanking.objects.refresh(options['title_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересобраны: {created} мест'
+        ))
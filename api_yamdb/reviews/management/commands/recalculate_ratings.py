@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from reviews.models import Title, TitleRanking
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает хранимый рейтинг произведений по отзывам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'title_ids', nargs='*', type=int,
+            help='id произведений; по умолчанию пересчитываются все'
+        )
+
+    def handle(self, *args, **options):
+        titles = Title.objects.all()
+        if options['title_ids']:
+            titles = titles.filter(pk__in=options['title_ids'])
+        updated = titles.recalculate_rating()
+        TitleRanking.objects.refresh(options['title_ids'] or None)
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинг пересчитан: {updated} произведений')
+        )
@@ -0,0 +1,47 @@
+# Generated by Django 3.2 on 2026-10-18 20:12
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_rating(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    reviews = (Review.objects.filter(title=OuterRef('pk'))
+               .order_by().values('title'))
+    Title.objects.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(value=Sum('score')).values('value')), 0
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(value=Count('pk')).values('value')), 0
+        ),
+        rating=Subquery(reviews.annotate(value=Avg('score')).values('value')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(db_index=True, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
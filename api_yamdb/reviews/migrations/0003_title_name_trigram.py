@@ -0,0 +1,36 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+INDEXES = (
+    ('reviews_title_name_trgm', '"name" gin_trgm_ops'),
+    ('reviews_title_name_upper_trgm', 'UPPER("name") gin_trgm_ops'),
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, expression in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" '
+            f'ON "reviews_title" USING gin ({expression})'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
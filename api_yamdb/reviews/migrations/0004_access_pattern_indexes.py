@@ -0,0 +1,47 @@
+# Generated by Django 3.2 on 2026-10-18 20:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_name_trigram'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comments',
+            name='review',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='review', to='reviews.review', verbose_name='Отзыв'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='title', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='comments',
+            index=models.Index(fields=['review', '-pub_date', 'id'], name='comment_review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', 'id'], name='review_title_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', '-rating'], name='title_year_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-rating'], name='title_category_rating_idx'),
+        ),
+        # Фильтр по жанру идёт от жанра к произведениям, а уникальный
+        # индекс таблицы связи начинается с title_id.
+        migrations.RunSQL(
+            'CREATE INDEX "reviews_title_genre_genre_title_idx" '
+            'ON "reviews_title_genre" ("genre_id", "title_id")',
+            'DROP INDEX "reviews_title_genre_genre_title_idx"',
+        ),
+    ]
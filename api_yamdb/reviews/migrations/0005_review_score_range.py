@@ -0,0 +1,17 @@
+# Generated by Django 3.2 on 2026-10-18 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.CheckConstraint(check=models.Q(('score__gte', 1), ('score__lte', 10)), name='review_score_range'),
+        ),
+    ]
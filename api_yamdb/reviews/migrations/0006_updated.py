@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-18 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_review_score_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['updated', 'id'], name='review_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['updated', 'id'], name='title_updated_idx'),
+        ),
+    ]
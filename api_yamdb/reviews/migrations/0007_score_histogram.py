@@ -0,0 +1,48 @@
+# Generated by Django 3.2 on 2026-10-18 20:48
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def fill_histograms(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    ScoreHistogram = apps.get_model('reviews', 'ScoreHistogram')
+    rows = Review.objects.order_by().values('title_id').annotate(**{
+        f'score_{score}': Count('pk', filter=Q(score=score))
+        for score in range(1, 11)
+    })
+    ScoreHistogram.objects.bulk_create(
+        (ScoreHistogram(**row) for row in rows), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreHistogram',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_histogram', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок 10')),
+            ],
+            options={
+                'verbose_name': 'Гистограмма оценок',
+                'verbose_name_plural': 'Гистограммы оценок',
+            },
+        ),
+        migrations.RunPython(fill_histograms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.2 on 2026-10-18 20:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    prior = weight * settings.LEADERBOARD_PRIOR_MEAN
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+        'title_id', 'genre_id'
+    ):
+        genres.setdefault(title_id, []).append(genre_id)
+    rankings = []
+    for pk, category_id, rating_sum, rating_count in Title.objects.filter(
+        rating_count__gte=settings.LEADERBOARD_MIN_REVIEWS
+    ).values_list('pk', 'category_id', 'rating_sum', 'rating_count'):
+        score = (prior + rating_sum) / (weight + rating_count)
+        rankings.append(TitleRanking(title_id=pk, score=score))
+        if category_id is not None:
+            rankings.append(TitleRanking(title_id=pk, category_id=category_id,
+                                         score=score))
+        rankings += [TitleRanking(title_id=pk, genre_id=genre_id, score=score)
+                     for genre_id in genres.get(pk, ())]
+    TitleRanking.objects.bulk_create(rankings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_score_histogram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Байесовская оценка')),
+                ('category', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.category', verbose_name='Категория')),
+                ('genre', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтингах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(condition=models.Q(('category__isnull', True), ('genre__isnull', True)), fields=['-score', 'title'], name='ranking_global_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(condition=models.Q(genre__isnull=False), fields=['genre', '-score', 'title'], name='ranking_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(condition=models.Q(category__isnull=False), fields=['category', '-score', 'title'], name='ranking_category_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
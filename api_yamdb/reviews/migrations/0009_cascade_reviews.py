@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 21:58
+
+from django.conf import settings
+from django.db import migrations, models
+import reviews.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0008_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='author',
+            field=models.ForeignKey(on_delete=reviews.models.cascade_reviews, related_name='reviews_author', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=reviews.models.cascade_reviews, related_name='title', to='reviews.title', verbose_name='Произведение'),
+        ),
+    ]
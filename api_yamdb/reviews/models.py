@@ -1,8 +1,13 @@
+from collections import defaultdict
 from datetime import datetime
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import (Avg, Case, Count, F, FloatField, OuterRef, Q,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce, Now, NullIf
 from users.models import User
 
 
@@ -48,6 +53,12 @@ class Genre(models.Model):
         return self.name
 
 
+SCORES = range(1, 11)
+
+# Строк в одном запросе при пересчёте производных таблиц.
+BATCH_SIZE = 1000
+
+
 def validate_year(value):
     """Валидация года."""
     if value > datetime.now().year:
@@ -56,6 +67,45 @@ def validate_year(value):
         raise ValidationError('Запрещены отрицательные значения!')
 
 
+class TitleQuerySet(models.QuerySet):
+    """Операции над хранимым рейтингом произведений."""
+
+    def shift_rating(self, score_delta, count_delta):
+        """
+        Сдвигает сумму и число оценок одним UPDATE.
+
+        Значения считаются от текущих в строке через F(), поэтому
+        параллельные отзывы не затирают друг друга.
+        """
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=(Cast(rating_sum, FloatField())
+                    / NullIf(rating_count, 0)),
+            updated=Now(),
+        )
+
+    def recalculate_rating(self):
+        """Пересчитывает хранимый рейтинг по таблице отзывов."""
+        reviews = (Review.objects.filter(title=OuterRef('pk'))
+                   .order_by().values('title'))
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(value=Sum('score'))
+                         .values('value')), 0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(value=Count('pk'))
+                         .values('value')), 0
+            ),
+            rating=Subquery(reviews.annotate(value=Avg('score'))
+                            .values('value')),
+            updated=Now(),
+        )
+
+
 class Title(models.Model):
     """Модель произведений."""
     category = models.ForeignKey(
@@ -72,21 +122,56 @@ class Title(models.Model):
     )
     description = models.TextField(verbose_name='Описание', )
     genre = models.ManyToManyField(Genre, verbose_name='Жанр')
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок', default=0
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок', default=0
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг', null=True, db_index=True
+    )
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения', auto_now=True
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведении"
         ordering = ("-year",)
+        indexes = (
+            models.Index(fields=('year', '-rating'),
+                         name='title_year_rating_idx'),
+            models.Index(fields=('category', '-rating'),
+                         name='title_category_rating_idx'),
+            models.Index(fields=('updated', 'id'),
+                         name='title_updated_idx'),
+        )
 
     def __str__(self):
         return self.name
 
 
+def cascade_reviews(collector, field, sub_objs, using):
+    """
+    CASCADE, который помечает отзывы, удаляемые вместе с произведением
+    или автором, именем поля в deleted_with. По пометке reviews.signals
+    не пересчитывает рейтинг удаляемого произведения, а оценки удаляемого
+    автора снимает пачкой.
+    """
+    reviews = list(sub_objs)
+    for review in reviews:
+        review.deleted_with = field.name
+    models.CASCADE(collector, field, reviews, using)
+
+
 class Review(models.Model):
     """Модель обзоров."""
     text = models.TextField(verbose_name="Текст")
     author = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name='reviews_author',
+        User, on_delete=cascade_reviews, related_name='reviews_author',
         verbose_name="Автор"
     )
     score = models.IntegerField(validators=[MinValueValidator(1),
@@ -96,25 +181,67 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации', auto_now_add=True
     )
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения', auto_now=True
+    )
     title = models.ForeignKey(
-        Title, on_delete=models.CASCADE, related_name='title',
-        verbose_name="Произведение"
+        Title, on_delete=cascade_reviews, related_name='title',
+        verbose_name="Произведение", db_index=False
     )
 
     class Meta:
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
         ordering = ("-pub_date",)
+        indexes = (
+            models.Index(fields=('title', '-pub_date', 'id'),
+                         name='review_title_pub_date_idx'),
+            models.Index(fields=('updated', 'id'),
+                         name='review_updated_idx'),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=['title', 'author'],
                 name='unique_review'
             ),
+            models.CheckConstraint(
+                check=models.Q(score__gte=1, score__lte=10),
+                name='review_score_range'
+            ),
         )
 
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и обновляет рейтинг произведения."""
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (Review.objects.select_for_update()
+                            .filter(pk=self.pk)
+                            .values_list('title_id', 'score').first())
+            if previous is None:
+                # UPDATE до вставки заодно проверяет, что произведение
+                # существует: в PostgreSQL внешний ключ проверяется
+                # только при фиксации транзакции.
+                if not add_score(self.title_id, self.score):
+                    raise Title.DoesNotExist('Произведение не найдено.')
+                super().save(*args, **kwargs)
+                return
+            super().save(*args, **kwargs)
+            title_id, score = previous
+            if title_id != self.title_id:
+                add_score(title_id, score, -1)
+                add_score(self.title_id, self.score)
+            elif score != self.score:
+                Title.objects.filter(pk=title_id).shift_rating(
+                    self.score - score, 0
+                )
+                ScoreHistogram.objects.shift(title_id,
+                                             {score: -1, self.score: 1})
+                TitleRanking.objects.rescore(title_id, grew=False)
+
 
 class Comments(models.Model):
     """Модель комментариев."""
@@ -128,13 +255,319 @@ class Comments(models.Model):
     )
     review = models.ForeignKey(
         Review, on_delete=models.CASCADE,
-        verbose_name="Отзыв", related_name='review',
+        verbose_name="Отзыв", related_name='review', db_index=False
     )
 
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ("-pub_date",)
+        indexes = (
+            models.Index(fields=('review', '-pub_date', 'id'),
+                         name='comment_review_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.text
+
+
+def score_field(score):
+    return models.PositiveIntegerField(
+        verbose_name=f'Оценок {score}', default=0
+    )
+
+
+class ScoreHistogramQuerySet(models.QuerySet):
+    """Операции над гистограммами оценок."""
+
+    def shift(self, title_id, deltas):
+        """
+        Сдвигает счётчики оценок {оценка: изменение} одним UPDATE.
+        Строка создаётся при первой оценке произведения; вычитание
+        строку не создаёт.
+        """
+        changes = {f'score_{score}': F(f'score_{score}') + delta
+                   for score, delta in deltas.items()}
+        if self.filter(title_id=title_id).update(**changes):
+            return
+        if min(deltas.values()) < 0:
+            return
+        counts = {f'score_{score}': delta for score, delta in deltas.items()}
+        try:
+            with transaction.atomic():
+                self.create(title_id=title_id, **counts)
+        except IntegrityError:
+            # Строку успел создать параллельный запрос.
+            self.filter(title_id=title_id).update(**changes)
+
+    def rebuild(self, title_ids=None):
+        """Пересчитывает гистограммы по таблице отзывов."""
+        reviews = Review.objects.order_by()
+        histograms = self.all()
+        if title_ids is not None:
+            reviews = reviews.filter(title_id__in=title_ids)
+            histograms = histograms.filter(title_id__in=title_ids)
+        rows = reviews.values('title_id').annotate(**{
+            f'score_{score}': Count('pk', filter=Q(score=score))
+            for score in SCORES
+        })
+        with transaction.atomic():
+            histograms.delete()
+            return len(self.bulk_create(
+                (ScoreHistogram(**row) for row in rows),
+                batch_size=BATCH_SIZE
+            ))
+
+
+class ScoreHistogram(models.Model):
+    """
+    Число оценок 1–10 у произведения. Обновляется при сохранении
+    и удалении отзывов, у произведений без отзывов строки нет.
+    """
+    title = models.OneToOneField(
+        Title, on_delete=models.CASCADE, primary_key=True,
+        related_name='score_histogram', verbose_name='Произведение'
+    )
+    score_1 = score_field(1)
+    score_2 = score_field(2)
+    score_3 = score_field(3)
+    score_4 = score_field(4)
+    score_5 = score_field(5)
+    score_6 = score_field(6)
+    score_7 = score_field(7)
+    score_8 = score_field(8)
+    score_9 = score_field(9)
+    score_10 = score_field(10)
+
+    objects = ScoreHistogramQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Гистограмма оценок'
+        verbose_name_plural = 'Гистограммы оценок'
+
+    @property
+    def histogram(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        return sum(score * number for score, number
+                   in self.histogram.items()) / count
+
+    def score_at(self, position):
+        """Оценка на месте position (с нуля) среди упорядоченных оценок."""
+        seen = 0
+        for score, number in self.histogram.items():
+            seen += number
+            if seen > position:
+                return score
+        return None
+
+    @property
+    def median(self):
+        count = self.count
+        if not count:
+            return None
+        return (self.score_at((count - 1) // 2)
+                + self.score_at(count // 2)) / 2
+
+
+def add_score(title_id, score, count=1):
+    """
+    Добавляет оценку (count=-1 — убирает) в рейтинг и гистограмму
+    произведения. Возвращает 0, если произведения нет.
+    """
+    updated = Title.objects.filter(pk=title_id).shift_rating(score * count,
+                                                             count)
+    if updated:
+        ScoreHistogram.objects.shift(title_id, {score: count})
+        TitleRanking.objects.rescore(title_id, grew=count > 0)
+    return updated
+
+
+def by_title(field, deltas):
+    """CASE: изменение {id произведения: изменение} для строки, иначе 0."""
+    return Case(
+        *(When(**{field: title_id}, then=Value(delta))
+          for title_id, delta in deltas.items() if delta),
+        default=Value(0), output_field=models.IntegerField()
+    )
+
+
+def remove_scores(titles):
+    """
+    Убирает пачку оценок {id произведения: Counter({оценка: число})},
+    например отзывы удалённого пользователя: одним UPDATE рейтингов и
+    одним — гистограмм на BATCH_SIZE произведений, затем одна пересборка
+    мест.
+    """
+    title_ids = list(titles)
+    for start in range(0, len(title_ids), BATCH_SIZE):
+        batch = {title_id: titles[title_id]
+                 for title_id in title_ids[start:start + BATCH_SIZE]}
+        Title.objects.filter(pk__in=batch).shift_rating(
+            by_title('pk', {
+                title_id: -sum(score * count
+                               for score, count in scores.items())
+                for title_id, scores in batch.items()
+            }),
+            by_title('pk', {title_id: -sum(scores.values())
+                            for title_id, scores in batch.items()})
+        )
+        ScoreHistogram.objects.filter(title_id__in=batch).update(**{
+            f'score_{score}': F(f'score_{score}') + by_title(
+                'title_id', {title_id: -scores[score]
+                             for title_id, scores in batch.items()}
+            )
+            for score in set().union(*batch.values())
+        })
+    TitleRanking.objects.filter(
+        title_id__in=title_ids,
+        title__rating_count__lt=settings.LEADERBOARD_MIN_REVIEWS
+    ).delete()
+    TitleRanking.objects.refresh(title_ids)
+
+
+def bayesian_score(rating_sum, rating_count):
+    """
+    Байесовское среднее: оценки произведения вместе с
+    LEADERBOARD_PRIOR_WEIGHT условными оценками LEADERBOARD_PRIOR_MEAN.
+    Немногие высокие оценки не поднимают произведение на вершину.
+    """
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    return ((weight * settings.LEADERBOARD_PRIOR_MEAN + rating_sum)
+            / (weight + rating_count))
+
+
+class TitleRankingQuerySet(models.QuerySet):
+    """Поддержка таблицы рейтингов в актуальном состоянии."""
+
+    def board(self, genre=None, category=None):
+        """Места одного рейтинга: общего, жанра или категории."""
+        if genre is not None:
+            board = self.filter(genre=genre)
+        elif category is not None:
+            board = self.filter(category=category)
+        else:
+            board = self.filter(genre__isnull=True, category__isnull=True)
+        return board.order_by('-score', 'title_id')
+
+    def rescore(self, title_id, grew):
+        """
+        Обновляет балл произведения после изменения его оценок. Строки
+        пересобираются, только если число оценок выросло до порога
+        LEADERBOARD_MIN_REVIEWS.
+        """
+        rating_sum, rating_count = Title.objects.filter(
+            pk=title_id
+        ).values_list('rating_sum', 'rating_count').get()
+        rankings = self.filter(title_id=title_id)
+        if rating_count < settings.LEADERBOARD_MIN_REVIEWS:
+            # Строки могли быть, только если оценок стало меньше порога.
+            if not grew:
+                rankings.delete()
+        elif not rankings.update(
+            score=bayesian_score(rating_sum, rating_count)
+        ) and grew:
+            self.refresh([title_id])
+
+    def refresh(self, title_ids=None):
+        """
+        Пересобирает места произведений (по умолчанию всех) во всех
+        рейтингах: после смены жанров и категории, порога или априорных
+        параметров. Возвращает число созданных строк.
+        """
+        titles = Title.objects.filter(
+            rating_count__gte=settings.LEADERBOARD_MIN_REVIEWS
+        ).order_by('pk').values_list('pk', 'category_id', 'rating_sum',
+                                     'rating_count')
+        created = 0
+        with transaction.atomic(savepoint=False):
+            if title_ids is None:
+                self.all().delete()
+                last = 0
+                while True:
+                    batch = list(titles.filter(pk__gt=last)[:BATCH_SIZE])
+                    if not batch:
+                        return created
+                    last = batch[-1][0]
+                    created += self.insert(batch)
+            title_ids = list(title_ids)
+            for start in range(0, len(title_ids), BATCH_SIZE):
+                ids = title_ids[start:start + BATCH_SIZE]
+                # Блокировка против параллельной пересборки тех же мест.
+                batch = list(titles.filter(pk__in=ids).select_for_update())
+                # У произведений ниже порога строк нет.
+                if batch:
+                    self.filter(title_id__in=ids).delete()
+                    created += self.insert(batch)
+        return created
+
+    def insert(self, titles):
+        return len(self.bulk_create(self.entries(titles),
+                                    batch_size=BATCH_SIZE))
+
+    def entries(self, titles):
+        genres = defaultdict(list)
+        for title_id, genre_id in Title.genre.through.objects.filter(
+            title_id__in=[pk for pk, *_ in titles]
+        ).values_list('title_id', 'genre_id'):
+            genres[title_id].append(genre_id)
+        for pk, category_id, rating_sum, rating_count in titles:
+            score = bayesian_score(rating_sum, rating_count)
+            yield TitleRanking(title_id=pk, score=score)
+            if category_id is not None:
+                yield TitleRanking(title_id=pk, category_id=category_id,
+                                   score=score)
+            for genre_id in genres[pk]:
+                yield TitleRanking(title_id=pk, genre_id=genre_id,
+                                   score=score)
+
+
+class TitleRanking(models.Model):
+    """
+    Место произведения в общем рейтинге (жанр и категория пусты),
+    рейтинге жанра или категории. Строки есть только у произведений
+    с LEADERBOARD_MIN_REVIEWS оценками и больше.
+    """
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='rankings',
+        verbose_name='Произведение'
+    )
+    genre = models.ForeignKey(
+        Genre, on_delete=models.CASCADE, null=True, related_name='+',
+        verbose_name='Жанр', db_index=False
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, null=True, related_name='+',
+        verbose_name='Категория', db_index=False
+    )
+    score = models.FloatField(verbose_name='Байесовская оценка')
+
+    objects = TitleRankingQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтингах'
+        indexes = (
+            models.Index(
+                fields=('-score', 'title'), name='ranking_global_idx',
+                condition=Q(genre__isnull=True, category__isnull=True)
+            ),
+            models.Index(
+                fields=('genre', '-score', 'title'), name='ranking_genre_idx',
+                condition=Q(genre__isnull=False)
+            ),
+            models.Index(
+                fields=('category', '-score', 'title'),
+                name='ranking_category_idx',
+                condition=Q(category__isnull=False)
+            ),
+        )
@@ -0,0 +1,64 @@
+import threading
+from collections import Counter, defaultdict
+
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from reviews.models import (Review, Title, TitleRanking, add_score,
+                            remove_scores)
+from users.models import User
+
+# Оценки отзывов удаляемых пользователей: копятся, пока удаляются их
+# отзывы, и снимаются в user_deleted.
+removed = threading.local()
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """
+    Вычитает оценку удалённого отзыва из рейтинга и гистограммы. Отзывы
+    удаляемого произведения пропускаются: его рейтинг, гистограмма и
+    места удаляются вместе с ним.
+    """
+    deleted_with = getattr(instance, 'deleted_with', None)
+    if deleted_with == 'title':
+        return
+    if deleted_with == 'author':
+        removed.scores[instance.title_id][instance.score] += 1
+        return
+    add_score(instance.title_id, instance.score, -1)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # Приходит раньше post_delete отзывов пользователя и сбрасывает
+    # оценки, оставшиеся от удаления, откатившегося с ошибкой.
+    removed.scores = defaultdict(Counter)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    scores = getattr(removed, 'scores', None)
+    if scores:
+        remove_scores(scores)
+        scores.clear()
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, **kwargs):
+    """Категория могла измениться: места произведения пересобираются."""
+    if not created:
+        TitleRanking.objects.refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        TitleRanking.objects.refresh([instance.pk])
+    elif action == 'post_clear':
+        TitleRanking.objects.filter(genre=instance).delete()
+    else:
+        TitleRanking.objects.refresh(pk_set)
@@ -0,0 +1,13 @@
+from django.contrib import admin
+from tasks.models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("pk", "name", "status", "attempts", "run_at", "created")
+    list_filter = ("status", "name")
+    # В аргументах бывают секреты, например код подтверждения.
+    exclude = ("payload",)
+    empty_value_display = "-пусто-"
+
+
+admin.site.register(Task, TaskAdmin)
@@ -0,0 +1,23 @@
+from django.core.mail import EmailMessage, get_connection
+from tasks.queue import handler
+
+
+@handler('send_mail')
+def send_mail(payloads):
+    """
+    Отправляет пачку писем через одно соединение с почтовым сервером,
+    каждое письмо отдельно: ошибка одного не отправляет повторно другие.
+    """
+    errors = []
+    with get_connection(fail_silently=False) as connection:
+        for payload in payloads:
+            try:
+                connection.send_messages([EmailMessage(
+                    payload['subject'], payload['message'],
+                    payload['from_email'], payload['recipient_list']
+                )])
+            except Exception as error:
+                errors.append(error)
+            else:
+                errors.append(None)
+    return errors
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tasks.queue import purge
+
+
+class Command(BaseCommand):
+    help = 'Удаляет из очереди выполненные и упавшие задачи старше срока'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=settings.TASKS_RETENTION_DAYS,
+                            help='сколько дней хранить завершённые задачи')
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        self.stdout.write(f'удалено задач: {purge(before)}')
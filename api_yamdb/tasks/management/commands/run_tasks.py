@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from tasks.queue import run_batch
+
+
+class Command(BaseCommand):
+    help = 'Воркер фоновых задач: выполняет задачи из очереди в БД'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='сколько задач брать за один проход')
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help='пауза, когда очередь пуста, секунд')
+        parser.add_argument('--once', action='store_true',
+                            help='выполнить готовые задачи и выйти')
+
+    def handle(self, *args, **options):
+        while True:
+            done = run_batch(options['batch_size'])
+            if done and options['verbosity'] > 1:
+                self.stdout.write(f'выполнено задач: {done}')
+            if options['once'] and not done:
+                return
+            if not done:
+                time.sleep(options['sleep'])
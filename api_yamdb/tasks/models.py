@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils import timezone
+
+
+class TaskStatus(models.TextChoices):
+    """Статусы фоновой задачи."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+
+class Task(models.Model):
+    """Фоновая задача в очереди."""
+    name = models.CharField(verbose_name='Обработчик', max_length=100)
+    payload = models.JSONField(verbose_name='Аргументы', default=dict)
+    status = models.CharField(verbose_name='Статус',
+                              max_length=7,
+                              choices=TaskStatus.choices,
+                              default=TaskStatus.PENDING
+                              )
+    attempts = models.PositiveSmallIntegerField(verbose_name='Попытки',
+                                                default=0)
+    run_at = models.DateTimeField(verbose_name='Запустить не раньше',
+                                  default=timezone.now)
+    last_error = models.TextField(verbose_name='Последняя ошибка',
+                                  blank=True)
+    created = models.DateTimeField(verbose_name='Создана',
+                                   auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ('run_at',)
+        indexes = (
+            models.Index(fields=('status', 'run_at'),
+                         name='task_status_run_at'),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from tasks.models import Task, TaskStatus
+
+HANDLERS = {}
+
+
+def handler(name):
+    """
+    Регистрирует обработчик задач name. Обработчик получает список
+    payload пачки и возвращает список той же длины: None для выполненной
+    задачи или ошибку для упавшей. Исключение из обработчика означает,
+    что упала вся пачка.
+    """
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, **payload):
+    """Ставит задачу в очередь и сразу возвращает управление."""
+    if name not in HANDLERS:
+        raise ValueError(f'Нет обработчика задач {name!r}')
+    return Task.objects.create(name=name, payload=payload)
+
+
+def backoff(attempts):
+    """Задержка перед повтором: растёт вдвое с каждой попыткой."""
+    delay = settings.TASKS_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.TASKS_RETRY_MAX_DELAY))
+
+
+def claim(batch_size):
+    """
+    Забирает пачку готовых задач: переводит их в RUNNING и откладывает
+    run_at на TASKS_LEASE секунд. Транзакция короткая (SKIP LOCKED на
+    PostgreSQL), поэтому несколько воркеров не возьмут одну задачу, а
+    задачи упавшего воркера вернутся в работу, когда истечёт аренда.
+    Задача, аренда которой истекла на последней попытке, помечается
+    FAILED: иначе задача, роняющая воркер, повторялась бы бесконечно.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status__in=(TaskStatus.PENDING, TaskStatus.RUNNING),
+                    run_at__lte=now)
+            .order_by('run_at')[:batch_size]
+        )
+        for task in tasks:
+            if (task.status == TaskStatus.RUNNING
+                    and task.attempts >= settings.TASKS_MAX_ATTEMPTS):
+                task.status = TaskStatus.FAILED
+                task.last_error = 'Истекла аренда последней попытки'
+                continue
+            task.status = TaskStatus.RUNNING
+            task.attempts += 1
+            task.run_at = now + timedelta(seconds=settings.TASKS_LEASE)
+        Task.objects.bulk_update(
+            tasks, ('status', 'attempts', 'run_at', 'last_error')
+        )
+    return [task for task in tasks if task.status == TaskStatus.RUNNING]
+
+
+def run_batch(batch_size):
+    """
+    Выполняет одну пачку готовых задач и возвращает их число. Обработчики
+    работают вне транзакции: сеть не держит блокировок строк.
+    """
+    tasks = claim(batch_size)
+    groups = defaultdict(list)
+    for task in tasks:
+        groups[task.name].append(task)
+    for name, group in groups.items():
+        run_group(name, group)
+    Task.objects.bulk_update(
+        tasks, ('status', 'attempts', 'run_at', 'last_error', 'payload')
+    )
+    return len(tasks)
+
+
+def purge(before):
+    """
+    Удаляет выполненные и окончательно упавшие задачи, созданные раньше
+    before, и возвращает их число.
+    """
+    deleted, _ = Task.objects.filter(
+        status__in=(TaskStatus.DONE, TaskStatus.FAILED), created__lt=before
+    ).delete()
+    return deleted
+
+
+def run_group(name, tasks):
+    try:
+        errors = HANDLERS[name]([task.payload for task in tasks])
+    except Exception as error:
+        errors = [error] * len(tasks)
+    now = timezone.now()
+    for task, error in zip(tasks, errors):
+        if error is None:
+            # Аргументы выполненной задачи больше не нужны, а в них
+            # бывают секреты, например код подтверждения.
+            task.status = TaskStatus.DONE
+            task.payload = {}
+            task.last_error = ''
+            continue
+        task.last_error = repr(error)
+        if task.attempts >= settings.TASKS_MAX_ATTEMPTS:
+            task.status = TaskStatus.FAILED
+        else:
+            task.status = TaskStatus.PENDING
+            task.run_at = now + backoff(task.attempts)
@@ -0,0 +1,145 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from tasks.models import Task, TaskStatus
+from tasks.queue import enqueue, run_batch
+
+
+class ConfirmationMailTest(TestCase):
+    """Письмо с кодом подтверждения уходит из воркера, а не из запроса."""
+
+    def test_signup_enqueues_mail(self):
+        response = APIClient().post(
+            '/api/v1/auth/signup/',
+            {'username': 'user', 'email': 'user@yamdb.ru'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        call_command('run_tasks', '--once')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@yamdb.ru'])
+        task = Task.objects.get()
+        self.assertEqual(task.status, TaskStatus.DONE)
+        # Код подтверждения не остаётся в очереди.
+        self.assertEqual(task.payload, {})
+
+    def test_batch_uses_one_connection(self):
+        for i in range(3):
+            enqueue('send_mail', subject='Тема', message='Текст',
+                    from_email='yamdb@ya.com',
+                    recipient_list=[f'user{i}@yamdb.ru'])
+        with mock.patch('tasks.handlers.get_connection',
+                        wraps=mail.get_connection) as get_connection:
+            self.assertEqual(run_batch(10), 3)
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+
+
+@override_settings(TASKS_MAX_ATTEMPTS=2, TASKS_RETRY_DELAY=60)
+class RetryTest(TestCase):
+    """Повтор упавших задач с растущей задержкой."""
+
+    def test_failed_task_is_retried_then_marked_failed(self):
+        task = enqueue('send_mail', subject='Тема', message='Текст',
+                       from_email='yamdb@ya.com',
+                       recipient_list=['user@yamdb.ru'])
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.'
+                        'send_messages', side_effect=OSError('smtp')):
+            run_batch(10)
+            task.refresh_from_db()
+            self.assertEqual(task.status, TaskStatus.PENDING)
+            self.assertEqual(task.attempts, 1)
+            self.assertGreater(task.run_at, timezone.now())
+            self.assertEqual(run_batch(10), 0)
+            Task.objects.update(run_at=timezone.now())
+            run_batch(10)
+        task.refresh_from_db()
+        self.assertEqual(task.status, TaskStatus.FAILED)
+        self.assertIn('smtp', task.last_error)
+
+    def test_only_failed_messages_are_retried(self):
+        tasks = [
+            enqueue('send_mail', subject='Тема', message='Текст',
+                    from_email='yamdb@ya.com',
+                    recipient_list=[f'user{i}@yamdb.ru'])
+            for i in range(3)
+        ]
+        send_messages = mail.get_connection().send_messages.__func__
+
+        def flaky(backend, messages):
+            if messages[0].to == ['user1@yamdb.ru']:
+                raise OSError('550 mailbox unavailable')
+            return send_messages(backend, messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.'
+                        'send_messages', flaky):
+            self.assertEqual(run_batch(10), 3)
+            self.assertEqual([message.to for message in mail.outbox],
+                             [['user0@yamdb.ru'], ['user2@yamdb.ru']])
+            Task.objects.update(run_at=timezone.now())
+            self.assertEqual(run_batch(10), 1)
+        statuses = [Task.objects.get(pk=task.pk).status for task in tasks]
+        self.assertEqual(statuses, [TaskStatus.DONE, TaskStatus.FAILED,
+                                    TaskStatus.DONE])
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_expired_lease_is_reclaimed(self):
+        task = enqueue('send_mail', subject='Тема', message='Текст',
+                       from_email='yamdb@ya.com',
+                       recipient_list=['user@yamdb.ru'])
+        # Воркер забрал задачу и упал, не записав результат.
+        Task.objects.filter(pk=task.pk).update(
+            status=TaskStatus.RUNNING, attempts=1,
+            run_at=timezone.now() + timedelta(minutes=5)
+        )
+        self.assertEqual(run_batch(10), 0)
+        Task.objects.update(run_at=timezone.now())
+        self.assertEqual(run_batch(10), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (TaskStatus.DONE, 2))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_expired_last_lease_fails(self):
+        task = enqueue('send_mail', subject='Тема', message='Текст',
+                       from_email='yamdb@ya.com',
+                       recipient_list=['user@yamdb.ru'])
+        # Последняя попытка уронила воркер.
+        Task.objects.filter(pk=task.pk).update(
+            status=TaskStatus.RUNNING, attempts=2, run_at=timezone.now()
+        )
+        self.assertEqual(run_batch(10), 0)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (TaskStatus.FAILED, 2))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(run_batch(10), 0)
+
+
+class PurgeTest(TestCase):
+    """Удаление завершённых задач командой purge_tasks."""
+
+    def test_purge(self):
+        old = timezone.now() - timedelta(days=8)
+        done, failed, pending = (
+            enqueue('send_mail', subject='Тема', message='Текст',
+                    from_email='yamdb@ya.com',
+                    recipient_list=[f'user{i}@yamdb.ru'])
+            for i in range(3)
+        )
+        Task.objects.filter(pk=done.pk).update(status=TaskStatus.DONE)
+        Task.objects.filter(pk=failed.pk).update(status=TaskStatus.FAILED)
+        Task.objects.update(created=old)
+        recent = enqueue('send_mail', subject='Тема', message='Текст',
+                         from_email='yamdb@ya.com',
+                         recipient_list=['user@yamdb.ru'])
+        Task.objects.filter(pk=recent.pk).update(status=TaskStatus.DONE)
+        stdout = io.StringIO()
+        call_command('purge_tasks', '--days', '7', stdout=stdout)
+        self.assertIn('удалено задач: 2', stdout.getvalue())
+        self.assertEqual(set(Task.objects.values_list('pk', flat=True)),
+                         {pending.pk, recent.pk})
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Поиск пользователей по началу имени (search=^username) строит
+# UPPER("username"::text) LIKE 'ABC%'. text_pattern_ops позволяет
+# использовать индекс для LIKE при любой локали базы.
+INDEX = 'users_user_username_upper_prefix'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS "{INDEX}" '
+        f'ON "users_user" (UPPER("username"::text) text_pattern_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{INDEX}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,40 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Поиск пользователей по подстроке имени (search=username) строит
+# UPPER("username"::text) LIKE '%ABC%'. Такой LIKE ускоряет только
+# триграммный индекс; индекс по началу имени больше не нужен.
+INDEX = 'users_user_username_upper_trgm'
+PREFIX_INDEX = 'users_user_username_upper_prefix'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{PREFIX_INDEX}"')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS "{INDEX}" '
+        f'ON "users_user" USING gin (UPPER("username"::text) gin_trgm_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{INDEX}"')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS "{PREFIX_INDEX}" '
+        f'ON "users_user" (UPPER("username"::text) text_pattern_ops)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_username_prefix_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_index, drop_index),
+    ]